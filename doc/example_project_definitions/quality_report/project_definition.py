@@ -25,6 +25,9 @@ PROJECT = Project('Organization name', name='Quality Report',
                       metric_source.JaCoCo: JACOCO,
                       metric_source.ZAPScanReport: ZAP_SCAN_REPORT,
                       metric_source.History: HISTORY},
+                  # Don't evaluate more than two Jenkins metrics at the same time:
+                  metric_source_settings={
+                      metric_source.Jenkins: dict(max_workers=2)},
                   # Override the total loc metric targets:
                   metric_options={
                       metric.TotalLOC: dict(target=1000000, low_target=2000000)},
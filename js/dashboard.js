@@ -62,9 +62,10 @@ function create_metrics_table(metrics_data) {
     color_metrics(BG_COLOR_GREEN, BG_COLOR_YELLOW, BG_COLOR_RED, BG_COLOR_GREY, BG_COLOR_MISSING);
 }
 
-function create_dashboard(metrics_data, history_data) {
+function create_dashboard(metrics_data, history_data, section_summaries) {
     /*jshint loopfunc: true */
     read_settings_from_cookies();
+    window.section_summaries = section_summaries;
     create_metrics_table(metrics_data);
     var sections = window.metrics.getDistinctValues(METRICS_COLUMN_SECTION);
 
@@ -266,8 +267,9 @@ function draw_section_summary_chart(section) {
 }
 
 function status_count(section, color) {
-   return window.metrics.getFilteredRows([{column: METRICS_COLUMN_SECTION, value: section},
-                                          {column: METRICS_COLUMN_STATUS_TEXT, value: color}]).length;
+   // The number of metrics per status per section is counted when the report is created.
+   var summary = window.section_summaries[section] || {};
+   return summary[color] || 0;
 }
 
 function draw_pie_chart(section) {
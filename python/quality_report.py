@@ -19,15 +19,18 @@ limitations under the License.
 
 
 import logging
+import multiprocessing
 import os
 import socket
 import sys
+import threading
+import time
 import urllib2
 import xmlrpclib
 
 import pkg_resources
 
-from qualitylib import formatting, commandlineargs, report, metric_source, log, filesystem, VERSION
+from qualitylib import formatting, commandlineargs, report, metric_source, domain, log, filesystem, VERSION
 
 
 class Reporter(object):  # pylint: disable=too-few-public-methods
@@ -35,14 +38,27 @@ class Reporter(object):  # pylint: disable=too-few-public-methods
 
     PROJECT_DEFINITION_FILENAME = 'project_definition.py'
     HISTORY_FILENAME = 'history.json'
+    RESPONSE_CACHE_FILENAME = 'response_cache.pickle'
+    SNAPSHOTS_FILENAME = 'metric_snapshots.pickle'
+    LATENCIES_FILENAME = 'latencies.json'
+    URL_MANIFEST_FILENAME = 'url_manifest.json'
     EMPTY_HISTORY_PNG = "\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00d\x00\x00\x00\x19\x08\x06\x00\x00\x00" \
                         "\xc7^\x8bK\x00\x00\x00\x06bKGD\x00\xff\x00\xff\x00\xff\xa0\xbd\xa7\x93\x00\x00\x00 " \
                         "IDATh\x81\xed\xc1\x01\r\x00\x00\x00\xc2\xa0\xf7Om\x0f\x07\x14\x00\x00\x00\x00\x00\x00" \
                         "\x00\x00\x00\x1c\x1b')\x00\x01\xbca\xfe\x1a\x00\x00\x00\x00IEND\xaeB`\x82"
 
-    def __init__(self, project_folder):
+    def __init__(self, project_folder, serve_stale=False, url_open=urllib2.urlopen,
+                 server_proxy=xmlrpclib.ServerProxy):
         self.__project = self.__import_project(project_folder, self.PROJECT_DEFINITION_FILENAME)
+        self.__serve_stale = serve_stale
+        self.__url_open = url_open
+        self.__server_proxy = server_proxy
+        self.__revalidation = None
         self.__history_filename = os.path.join(project_folder, self.HISTORY_FILENAME)
+        self.__response_cache_filename = os.path.join(project_folder, self.RESPONSE_CACHE_FILENAME)
+        self.__snapshot_store = report.SnapshotStore(os.path.join(project_folder, self.SNAPSHOTS_FILENAME))
+        self.__latency_stats = metric_source.LatencyStats(os.path.join(project_folder, self.LATENCIES_FILENAME))
+        self.__url_manifest_filename = os.path.join(project_folder, self.URL_MANIFEST_FILENAME)
 
     @staticmethod
     def __import_project(project_folder, project_definition_filename):
@@ -52,34 +68,273 @@ class Reporter(object):  # pylint: disable=too-few-public-methods
         sys.path.insert(0, os.path.abspath(os.path.join(project_folder, '..')))
         # Add the project folder itself to the python path so that we can import the project definition itself.
         sys.path.insert(0, project_folder)
-        # Import the project definition and get the project from it.
+        # Import the project definition and get the project from it. Remove a previously imported project definition
+        # first, in case multiple projects are created in one process.
         module_name = project_definition_filename[:-len('.py')]
+        sys.modules.pop(module_name, None)
         project_definition_module = __import__(module_name)
         return project_definition_module.PROJECT
 
-    def create_report(self, report_folder):
-        """ Create, format, and write the quality report. """
-        quality_report = report.QualityReport(self.__project)
-        self.__format_and_write_report(quality_report, formatting.JSONFormatter, self.__history_filename, 'a', 'ascii',
-                                       sonar=self.__project.metric_source(metric_source.Sonar))
-        self.__create_report(quality_report, report_folder)
-        metric_source.History(self.__history_filename).clean_history()
+    def create_report(self, report_folder, response_cache=None, section_ids=None):
+        """ Create, format, and write the quality report. If no response cache is passed, the response cache of the
+            project is used. If section ids are passed, only the metrics in those sections are evaluated; the other
+            metrics reuse their snapshots of the previous report. The urls opened during the previous complete report
+            are prefetched before the metrics are created. When serving stale values, metrics whose metric source ran
+            out of time show their last known value, marked as stale, and are evaluated again after the report has
+            been written, so the next report can show their current value. Such a report doesn't add a record to
+            the history, because the stale values weren't measured now. The response cache of the project is saved
+            after the evaluation of the stale metrics, so it keeps the responses retrieved for it. """
+        self.wait_for_revalidation()
+        save_response_cache = response_cache is None
+        if save_response_cache:
+            response_cache = metric_source.ResponseCache(self.__response_cache_filename)
+        quality_report, metrics = self.__retrieve_data(response_cache, section_ids)
+        stale_metrics = self.__restore_stale_snapshots(metrics) if self.__serve_stale else []
+        self.__write_report(quality_report, report_folder, metrics, write_history=not (section_ids or stale_metrics))
+        if stale_metrics:
+            # Lift the time budget here rather than in the background thread, so it can't interfere with the next
+            # report, which waits for the revalidation before it sets its own budget.
+            metric_source.set_default_run_budget(None)
+            response_cache_to_save = response_cache if save_response_cache else None
+            self.__revalidation = threading.Thread(target=self.__revalidate,
+                                                   args=(stale_metrics, response_cache_to_save))
+            self.__revalidation.start()
+        elif save_response_cache:
+            response_cache.save()
 
-    @classmethod
-    def __create_report(cls, quality_report, report_dir):
+    def collect(self, snapshot_folder, report_folder=None):
+        """ Retrieve the data for the quality report and store the raw responses and shell command outputs of the
+            metric sources as a new run in the snapshot folder. If a report folder is passed, the report is created
+            as well, so the run is recorded; otherwise the report isn't created. The report and its history record
+            are dated by the start of the run. """
+        source_snapshot = metric_source.SourceSnapshot(snapshot_folder)
+        metric_source.set_default_source_snapshot(source_snapshot)
+        try:
+            if report_folder:
+                self.create_report(report_folder)
+            else:
+                response_cache = metric_source.ResponseCache(self.__response_cache_filename)
+                self.__retrieve_data(response_cache)
+                response_cache.save()
+        finally:
+            metric_source.set_default_source_snapshot(None)
+        logging.info('Collected %d responses in run %s of %s', source_snapshot.save(), source_snapshot.run_id(),
+                     snapshot_folder)
+
+    def render(self, snapshot_folder, report_folder, latency=False):
+        """ Create, format, and write the quality report from the most recent run in the snapshot folder. The metric
+            sources read their responses and shell command outputs from the snapshot instead of opening urls and
+            running shell commands. With latency, each response takes as long as it took when it was collected, so
+            the run can be used as benchmark. Existing trend images are kept and missing trend images are left empty,
+            and the latest released version of the software isn't looked up, so rendering doesn't use the network.
+            The report and its history record are dated by the start of the run. The history record is added once
+            per run: rendering a run whose record is in the history already doesn't add another record. """
+        source_snapshot = metric_source.SourceSnapshot(snapshot_folder, replay=True, latency=latency)
+        logging.info('Rendering the quality report from run %s of %s', source_snapshot.run_id(), snapshot_folder)
+        metric_source.set_default_source_snapshot(source_snapshot)
+        try:
+            quality_report, metrics = self.__retrieve_data(metric_source.ResponseCache(), live=False)
+            write_history = not self.__in_history(quality_report.date())
+            if not write_history:
+                logging.info('Not adding a history record, because run %s is in the history already',
+                             source_snapshot.run_id())
+            self.__write_report(quality_report, report_folder, metrics, live=False, write_history=write_history)
+        finally:
+            metric_source.set_default_source_snapshot(None)
+
+    def plan(self):
+        """ Create the quality report and its metrics without retrieving data and return, as text, the calls the
+            metric sources would make, with their estimated duration. Responses cached by previous runs are used to
+            find calls that depend on earlier responses. """
+        fetch_plan = metric_source.FetchPlan(metric_source.ResponseCache(self.__response_cache_filename),
+                                             self.__latency_stats)
+        metric_source.set_default_fetch_plan(fetch_plan)
+        try:
+            self.__retrieve_data(metric_source.ResponseCache(), live=False)
+        finally:
+            metric_source.set_default_fetch_plan(None)
+        return fetch_plan.report()
+
+    def __retrieve_data(self, response_cache, section_ids=None, live=True):
+        """ Create the quality report and retrieve the data of the metrics. Return the report and the metrics that
+            were evaluated. Unless the data is retrieved live from the metric sources, the health probe, the warm
+            start, and the latencies are skipped. If a source snapshot is recorded or replayed, the report is dated
+            by the start of its run. """
+        metric_source.set_default_response_cache(response_cache)
+        if self.__project.fetch_workers():
+            metric_source.default_fetcher().set_nr_workers(self.__project.fetch_workers())
+        metric_source.set_default_run_budget(self.__run_budget())
+        metric_source.set_default_cache_policy(self.__cache_policy())
+        metric_source.set_default_request_policy(self.__request_policy())
+        metric_source.set_default_latency_stats(self.__latency_stats if live else None)
+        metric_source.set_default_health_probe(self.__health_probe() if live else None)
+        url_manifest = metric_source.UrlManifest(self.__url_manifest_filename) if live and not section_ids else None
+        metric_source.set_default_url_manifest(url_manifest)
+        if url_manifest:
+            nr_urls = url_manifest.warm_up(self.__url_openers())
+            logging.info('Prefetching %d urls opened by the previous report', nr_urls)
+        repository_synchronizer = report.RepositorySynchronizer(self.__project)
+        repository_synchronizer.start()
+        source_snapshot = metric_source.default_source_snapshot()
+        quality_report = report.QualityReport(self.__project,
+                                              date=source_snapshot.run_date() if source_snapshot else None)
+        quality_report.sections()  # Create the sections so the report knows its metrics
+        metrics = self.__metrics_to_evaluate(quality_report, section_ids)
+        report.DataRequirementPlanner(metrics).execute()
+        report.Prefetcher(self.__project).prefetch(metrics)
+        repository_synchronizer.wait()
+        if live:
+            self.__latency_stats.save()
+        if url_manifest:
+            url_manifest.save()
+        return quality_report, metrics
+
+    def __in_history(self, date):
+        """ Return whether the history has a record of the date. """
+        date_string = date.strftime('%Y-%m-%d %H:%M:%S')
+        return any(record.get('date') == date_string
+                   for record in metric_source.History(self.__history_filename).complete_history())
+
+    def __restore_stale_snapshots(self, metrics):
+        """ Let the metrics that are missing because their metric source ran out of time show their last known
+            snapshot. Return the metrics that show a stale snapshot. """
+        run_budget = metric_source.default_run_budget()
+        over_budget = [metric for metric in metrics if metric.metric_source_classes and
+                       run_budget.exceeded(metric.metric_source_classes[0]) and metric.snapshot().status() == 'missing']
+        stale_metrics = self.__snapshot_store.restore_stale(over_budget)
+        if stale_metrics:
+            logging.warning('Showing the last known value of %d metrics whose metric sources ran out of time',
+                            len(stale_metrics))
+        return stale_metrics
+
+    def __revalidate(self, metrics, response_cache=None):
+        """ Evaluate the metrics again and store their snapshots for the next report. The time budget has been lifted
+            before this method is called. Save the response cache afterwards, if one is passed. """
+        try:
+            for metric_source_class in set(metric.metric_source_classes[0] for metric in metrics):
+                instances = self.__project.metric_source(metric_source_class)
+                for instance in instances if isinstance(instances, list) else [instances]:
+                    instance.refresh()
+            for metric in metrics:
+                metric.restore_snapshot(None)
+            report.Prefetcher(self.__project).prefetch(metrics)
+            self.__snapshot_store.update(metrics)
+            logging.info('Stored the current value of %d metrics that were shown stale', len(metrics))
+        finally:
+            if response_cache:
+                response_cache.save()
+
+    def wait_for_revalidation(self):
+        """ Wait until the metrics shown stale in the previous report have been evaluated again. """
+        if self.__revalidation:
+            self.__revalidation.join()
+            self.__revalidation = None
+
+    def __write_report(self, quality_report, report_folder, metrics, live=True, write_history=True):
+        """ Format and write the history record and the HTML report, and store the snapshots of the metrics. The
+            caller decides whether the history record is written, because reports of which only some sections were
+            created again, or that show stale values, contain values that weren't measured now. Unless the report is
+            created live, nothing is retrieved from the network while writing the report. """
+        # pylint: disable=too-many-arguments
+        if write_history:
+            self.__format_and_write_report(quality_report, formatting.JSONFormatter, self.__history_filename, 'a',
+                                           'ascii', sonar=self.__project.metric_source(metric_source.Sonar))
+        self.__create_report(quality_report, report_folder, metrics if live else [], live)
+        if write_history:
+            metric_source.History(self.__history_filename).clean_history()
+        self.__snapshot_store.save(quality_report.metrics())
+
+    def __health_probe(self):
+        """ Return a health probe that has checked which metric sources of the project can be reached. """
+        health_probe = metric_source.HealthProbe()
+        health_probe.probe(self.__url_openers())
+        return health_probe
+
+    def __url_openers(self):
+        """ Return the metric sources of the project that open urls. """
+        url_openers, seen = [], set()
+        for metric_source_class in self.__project.metric_source_classes():
+            instances = self.__project.metric_source(metric_source_class)
+            for instance in instances if isinstance(instances, list) else [instances]:
+                if isinstance(instance, metric_source.UrlOpener) and id(instance) not in seen:
+                    seen.add(id(instance))
+                    url_openers.append(instance)
+        return url_openers
+
+    def __run_budget(self):
+        """ Return the time budgets for retrieving the data for the report, as configured in the project with the
+            deadline for the run as a whole and the budget setting for metric source classes. """
+        budgets = dict()
+        for metric_source_class in self.__project.metric_source_classes():
+            budget = self.__project.metric_source_settings(metric_source_class).get('budget')
+            if budget is not None:
+                budgets[metric_source_class] = budget
+        return metric_source.RunBudget(self.__project.deadline(), budgets)
+
+    def __cache_policy(self):
+        """ Return the time to live of cached responses, as configured in the project with the ttl and url_ttls
+            settings for metric source classes. """
+        ttls, url_ttls = dict(), dict()
+        for metric_source_class in self.__project.metric_source_classes():
+            settings = self.__project.metric_source_settings(metric_source_class)
+            if settings.get('ttl'):
+                ttls[metric_source_class] = settings['ttl']
+            if settings.get('url_ttls'):
+                url_ttls[metric_source_class] = settings['url_ttls']
+        return metric_source.CachePolicy(ttls, url_ttls)
+
+    def __request_policy(self):
+        """ Return the timeouts, retries, circuit breakers and load limits for opening urls, as configured in the
+            project with the connect_timeout, read_timeout, retries, failure_threshold, max_connections and
+            requests_per_second settings for metric source classes. """
+        settings = dict((metric_source_class, self.__project.metric_source_settings(metric_source_class))
+                        for metric_source_class in self.__project.metric_source_classes())
+        return metric_source.RequestPolicy(settings)
+
+    def __metrics_to_evaluate(self, quality_report, section_ids):
+        """ Return the metrics to evaluate. If section ids are passed, the metrics outside those sections show their
+            stored snapshots and aren't created at all. The meta metrics are always evaluated because they summarize
+            all metrics. """
+        if not section_ids:
+            return quality_report.metrics()
+        unknown_section_ids = set(section_ids) - set(section.id_prefix() for section in quality_report.sections())
+        if unknown_section_ids:
+            logging.warning('Unknown section ids: %s', ', '.join(sorted(unknown_section_ids)))
+        quality_report.restore_snapshots(self.__snapshot_store, section_ids)
+        metrics = [metric for metric in quality_report.metrics() if not isinstance(metric, report.RestoredMetric)]
+        nr_selected_metrics = len(quality_report.section_metrics(section_ids) +
+                                  quality_report.get_meta_section().metrics())
+        logging.info('Evaluating %d metrics in sections %s and %d metrics without stored snapshot',
+                     nr_selected_metrics, ', '.join(section_ids), len(metrics) - nr_selected_metrics)
+        return metrics
+
+    def run_daemon(self, report_folder, interval, sleep=time.sleep, clock=time.time):
+        """ Keep creating the quality report every interval seconds. The project and its metric sources are kept
+            alive between reports, so data is only retrieved again when it has expired. """
+        schedule = report.RefreshSchedule(self.__project, interval, clock=clock)
+        while True:
+            start = clock()
+            try:
+                self.create_report(report_folder)
+            except Exception as reason:  # pylint: disable=broad-except
+                logging.exception('Creating the quality report failed: %s', reason)
+            sleep(max(0, start + interval - clock()))
+            schedule.refresh_expired_metric_sources()
+
+    def __create_report(self, quality_report, report_dir, evaluated_metrics, live=True):
         """ Format the quality report to HTML and write the files in the report folder. """
         report_dir = report_dir or '.'
         filesystem.create_dir(report_dir)
-        cls.__create_html_file(quality_report, report_dir)
-        cls.__create_resources(report_dir)
-        cls.__create_trend_images(quality_report, report_dir)
+        self.__create_html_file(quality_report, report_dir, live)
+        self.__create_resources(report_dir)
+        self.__create_trend_images(quality_report, report_dir, evaluated_metrics, fetch_trend_images=live)
 
-    @classmethod
-    def __create_html_file(cls, quality_report, report_dir):
-        """ Create the html file with the report. """
+    def __create_html_file(self, quality_report, report_dir, live=True):
+        """ Create the html file with the report. Unless the report is created live, the latest released version of
+            the software isn't looked up. """
         tmp_filename = os.path.join(report_dir, 'tmp.html')
-        latest_software_version = cls.__latest_software_version()
-        cls.__format_and_write_report(quality_report, formatting.HTMLFormatter, tmp_filename, 'w', 'utf-8',
+        latest_software_version = self.__latest_software_version() if live else '0'
+        self.__format_and_write_report(quality_report, formatting.HTMLFormatter, tmp_filename, 'w', 'utf-8',
                                       latest_software_version=latest_software_version,
                                       current_software_version=VERSION)
         html_filename = os.path.join(report_dir, 'index.html')
@@ -102,24 +357,29 @@ class Reporter(object):  # pylint: disable=too-few-public-methods
                 mode = 'w' if encoding else 'wb'
                 filesystem.write_file(contents, filename, mode, encoding)
 
-    @classmethod
-    def __create_trend_images(cls, quality_report, report_dir):
-        """ Retrieve and write the trend images. """
+    def __create_trend_images(self, quality_report, report_dir, evaluated_metrics, fetch_trend_images=True):
+        """ Retrieve and write the trend images of the evaluated metrics. The trend images of metrics that reuse
+            their stored snapshot are kept, unless they are missing. If trend images aren't fetched, missing trend
+            images are left empty. """
+        evaluated_metric_ids = set(id(metric) for metric in evaluated_metrics)
         for metric in quality_report.metrics():
-            try:
-                history = ','.join([str(value) for value in metric.recent_history()])
-            except ValueError:
-                history = ''
-            y_axis_range = cls.__format_y_axis_range(metric.y_axis_range())
+            filename = os.path.join(report_dir, 'img', '%s.png' % metric.id_string())
+            if id(metric) not in evaluated_metric_ids and os.path.exists(filename):
+                continue
+            if not fetch_trend_images:
+                filesystem.write_file(self.EMPTY_HISTORY_PNG, filename, mode='wb', encoding=None)
+                continue
+            metric = metric.snapshot()
+            history = ','.join([str(value) for value in metric.recent_history()])
+            y_axis_range = self.__format_y_axis_range(metric.y_axis_range())
             url = "http://chart.apis.google.com/chart?" \
                   "chs=100x25&cht=ls&chf=bg,s,00000000&chd=t:{history}&" \
                   "chds={y_axis_range}".format(history=history, y_axis_range=y_axis_range)
             try:
-                image = urllib2.urlopen(url).read()
+                image = self.__url_open(url).read()
             except metric_source.UrlOpener.url_open_exceptions as reason:
                 logging.warn("Couldn't open %s history chart at %s: %s", metric.id_string(), url, reason)
-                image = cls.EMPTY_HISTORY_PNG
-            filename = os.path.join(report_dir, 'img', '%s.png' % metric.id_string())
+                image = self.EMPTY_HISTORY_PNG
             filesystem.write_file(image, filename, mode='wb', encoding=None)
 
     @staticmethod
@@ -128,11 +388,10 @@ class Reporter(object):  # pylint: disable=too-few-public-methods
         formatted_report = report_formatter(**kwargs).process(quality_report)
         filesystem.write_file(formatted_report, filename, mode, encoding)
 
-    @staticmethod
-    def __latest_software_version():
+    def __latest_software_version(self):
         """ Return the latest released version of the quality report software. """
         python_package_index_url = 'https://pypi.python.org/pypi'
-        client = xmlrpclib.ServerProxy(python_package_index_url)
+        client = self.__server_proxy(python_package_index_url)
         try:
             latest_version = max(client.package_releases('quality_report'))
         except (socket.gaierror, xmlrpclib.ProtocolError) as reason:
@@ -148,8 +407,111 @@ class Reporter(object):  # pylint: disable=too-few-public-methods
         return '%d,%d' % y_axis_range if y_axis_range else 'a'
 
 
+class BatchReporter(object):  # pylint: disable=too-few-public-methods
+    """ Class for creating the quality reports for multiple projects in one process. Metric sources that are
+        defined with the same arguments in multiple project definitions are shared between the projects, as is the
+        response cache, so data that multiple projects need is retrieved once per batch. """
+
+    def __init__(self, project_folders, reporter_class=Reporter):
+        with domain.shared_metric_sources():
+            self.__reporters = [(project_folder, reporter_class(project_folder)) for project_folder in project_folders]
+        self.__response_cache_filename = shared_response_cache_filename(project_folders)
+
+    def create_reports(self, report_folder):
+        """ Create the quality report of each project in a subfolder of the report folder, named after the project
+            folder. Return the project folders for which creating the report failed. """
+        filesystem.create_dir(report_folder)
+        response_cache = metric_source.ResponseCache(self.__response_cache_filename)
+        failed = []
+        for project_folder, reporter in self.__reporters:
+            try:
+                reporter.create_report(project_report_folder(report_folder, project_folder), response_cache)
+            except Exception as reason:  # pylint: disable=broad-except
+                logging.exception('Creating the quality report for %s failed: %s', project_folder, reason)
+                failed.append(project_folder)
+        response_cache.save()
+        return failed
+
+
+def create_project_report(job):
+    """ Create the quality report for one project of a portfolio. Return the project folder, whether creating the
+        report succeeded, and how long it took. """
+    project_folder, report_folder, response_cache_filename = job
+    start = time.time()
+    try:
+        response_cache = metric_source.ResponseCache(response_cache_filename, shared=True)
+        Reporter(project_folder).create_report(report_folder, response_cache)
+        response_cache.save()
+    except Exception as reason:  # pylint: disable=broad-except
+        logging.exception('Creating the quality report for %s failed: %s', project_folder, reason)
+        return project_folder, False, time.time() - start
+    return project_folder, True, time.time() - start
+
+
+class PortfolioReporter(object):  # pylint: disable=too-few-public-methods
+    """ Class for creating the quality reports for a portfolio of projects using a pool of processes, so that
+        the reports are created in parallel on all cores. The processes share the response cache file. """
+
+    def __init__(self, project_folders, processes=None, pool=multiprocessing.Pool,
+                 report_creator=create_project_report):
+        self.__project_folders = project_folders
+        self.__processes = processes or multiprocessing.cpu_count()
+        self.__pool = pool
+        self.__report_creator = report_creator
+
+    def create_reports(self, report_folder):
+        """ Create the quality report of each project in a subfolder of the report folder, named after the project
+            folder. Return the project folders for which creating the report failed. """
+        filesystem.create_dir(report_folder)
+        response_cache_filename = shared_response_cache_filename(self.__project_folders)
+        jobs = [(project_folder, project_report_folder(report_folder, project_folder), response_cache_filename)
+                for project_folder in self.__project_folders]
+        pool = self.__pool(min(self.__processes, len(jobs)))
+        try:
+            results = pool.map(self.__report_creator, jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+        for project_folder, succeeded, duration in results:
+            logging.info('Creating the quality report for %s %s after %.1f seconds', project_folder,
+                         'succeeded' if succeeded else 'failed', duration)
+        failed = [project_folder for project_folder, succeeded, _ in results if not succeeded]
+        logging.info('Created %d of %d quality reports using %d processes', len(results) - len(failed), len(results),
+                     min(self.__processes, len(jobs)))
+        return failed
+
+
+def project_report_folder(report_folder, project_folder):
+    """ Return the folder for the report of the project when creating reports for multiple projects. """
+    return os.path.join(report_folder, os.path.basename(os.path.normpath(project_folder)))
+
+
+def shared_response_cache_filename(project_folders):
+    """ Return the filename of the response cache shared by multiple projects. The response cache is kept in the
+        folder that contains the project folders. """
+    parent_folder = os.path.dirname(os.path.commonprefix([os.path.abspath(project_folder) + os.sep
+                                                          for project_folder in project_folders]))
+    return os.path.join(parent_folder, Reporter.RESPONSE_CACHE_FILENAME)
+
+
 if __name__ == '__main__':
     # pylint: disable=invalid-name
     args = commandlineargs.parse()
     log.init_logging(args.log)
-    Reporter(args.project).create_report(args.report)
+    if len(args.project) > 1:
+        portfolio_reporter = BatchReporter(args.project) if args.processes == 1 else \
+            PortfolioReporter(args.project, args.processes)
+        sys.exit(1 if portfolio_reporter.create_reports(args.report) else 0)
+    reporter = Reporter(args.project[0], serve_stale=args.serve_stale)
+    if args.plan:
+        sys.stdout.write(reporter.plan())
+    elif args.collect:
+        reporter.collect(args.collect)
+    elif args.record:
+        reporter.collect(args.record, args.report)
+    elif args.render:
+        reporter.render(args.render, args.report, latency=args.replay_latency)
+    elif args.daemon:
+        reporter.run_daemon(args.report, args.interval)
+    else:
+        reporter.create_report(args.report, section_ids=args.only)
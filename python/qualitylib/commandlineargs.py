@@ -23,14 +23,67 @@ import qualitylib
 def parse():
     """ Parse the command line arguments. """
     parser = ArgumentParser(description='Generate a quality report.')
-    parser.add_argument('--project', help='folder with project definition file and history')
-    parser.add_argument('--report', help='folder to write the HTML report in')
+    parser.add_argument('--project', nargs='+',
+                        help='folder with project definition file and history; pass multiple folders to create the '
+                             'reports of multiple projects in one process')
+    parser.add_argument('--report', help='folder to write the HTML report in; with multiple projects, each report is '
+                                         'written to a subfolder named after the project folder')
     parser.add_argument('--log', default="WARNING", choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
                         help="log level (WARNING by default)")
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and create the report every interval, reusing retrieved data until it '
+                             'expires')
+    parser.add_argument('--interval', default=900, type=int,
+                        help='number of seconds between the start of consecutive reports in daemon mode '
+                             '(900 by default)')
+    parser.add_argument('--processes', default=1, type=int,
+                        help='number of processes for creating the reports of multiple projects; 0 means one process '
+                             'per core (1 by default, in which case the projects share metric sources)')
+    parser.add_argument('--only', type=lambda section_ids: section_ids.split(','),
+                        help='comma separated ids of the sections to create again, for example product short names, '
+                             'team ids or PE; the other sections reuse the metrics of the previous report')
+    parser.add_argument('--serve-stale', action='store_true',
+                        help='show the last known value of metrics whose metric source runs out of its time budget, '
+                             'marked as stale, and retrieve their current value for the next report')
+    parser.add_argument('--collect', metavar='SNAPSHOT_FOLDER',
+                        help='retrieve the data for the report and store the raw responses of the metric sources in '
+                             'the snapshot folder, without creating the report')
+    parser.add_argument('--record', metavar='SNAPSHOT_FOLDER',
+                        help='create the report and store the raw responses of the metric sources in the snapshot '
+                             'folder')
+    parser.add_argument('--render', '--replay', metavar='SNAPSHOT_FOLDER',
+                        help='create the report from the most recent data collected or recorded in the snapshot '
+                             'folder, without retrieving data from the metric sources')
+    parser.add_argument('--replay-latency', action='store_true',
+                        help='when rendering, let each response take as long as it took when it was collected')
+    parser.add_argument('--plan', action='store_true',
+                        help='print the calls the metric sources would make to create the report, grouped by metric '
+                             'source and with estimated duration, without retrieving data or creating the report')
     parser.add_argument('--version', action='version', version=qualitylib.VERSION)
     args = parser.parse_args()
     if not args.project:
         parser.error('Need a project folder')
-    if not args.report:
+    if not args.report and not args.collect and not args.plan:
         parser.error('Need a report folder')
+    if len([mode for mode in (args.collect, args.record, args.render) if mode]) > 1:
+        parser.error('Either collect, record or render, not more than one')
+    if (args.collect or args.record or args.render) and (args.daemon or args.only or len(args.project) > 1):
+        parser.error('Collecting, recording and rendering support one project folder, without daemon mode or '
+                     'selected sections')
+    if args.replay_latency and not args.render:
+        parser.error('Replaying latency needs a snapshot folder to render from')
+    if args.plan and (args.collect or args.record or args.render or args.daemon or args.only or
+                      len(args.project) > 1):
+        parser.error('Planning supports one project folder, without other modes or selected sections')
+    if args.serve_stale and (args.collect or args.record or args.render or args.plan or len(args.project) > 1):
+        parser.error('Serving stale values supports one project folder, without collecting, recording, rendering or '
+                     'planning')
+    if args.interval <= 0:
+        parser.error('Need a positive interval')
+    if args.processes < 0:
+        parser.error('Need zero or more processes')
+    if args.daemon and len(args.project) > 1:
+        parser.error('Daemon mode supports one project folder')
+    if args.only and (args.daemon or len(args.project) > 1):
+        parser.error('Selecting sections supports one project folder and no daemon mode')
     return args
@@ -23,7 +23,7 @@ from .base import DomainObject
 
 from .measurement.metric import Metric, HigherIsBetterMetric, HigherPercentageIsBetterMetric, \
     LowerPercentageIsBetterMetric, LowerIsBetterMetric
-from .measurement.metric_source import MetricSource, MissingMetricSource
+from .measurement.metric_source import MetricSource, MissingMetricSource, shared_metric_sources
 from .measurement.metric_mixin import MetaMetricMixin
 
 from .measurement.target import TechnicalDebtTarget, DynamicTechnicalDebtTarget
@@ -19,6 +19,7 @@ import datetime
 import logging
 
 from . import metric_mixin
+from .metric_snapshot import MetricSnapshot
 from ... import utils
 
 
@@ -38,6 +39,7 @@ class Metric(object):
     old_age = datetime.timedelta.max
     max_old_age = datetime.timedelta.max
     metric_source_classes = []
+    metric_source_calls = ()  # Names of the metric source methods the metric calls with the id of its subject
 
     @classmethod
     def should_be_measured(cls, requirement_subject):
@@ -81,15 +83,34 @@ class Metric(object):
             except AttributeError:
                 self._metric_source_id = None
         self.__id_string = self.stable_id()
+        self.__restored_snapshot = None
         from qualitylib import metric_source
         self.__history = self._project.metric_source(metric_source.History)
 
+    def data_requirements(self):
+        """ Return the data the metric needs from its metric source as a set of (metric source, method name,
+            metric source id) tuples, so that the data can be retrieved before the metric is evaluated. """
+        metric_source_id = self._data_requirement_id()
+        if not (self.metric_source_calls and self._metric_source and metric_source_id) or \
+                isinstance(self._metric_source, list):
+            return set()
+        return {(self._metric_source, call, metric_source_id) for call in self.metric_source_calls}
+
+    def _data_requirement_id(self):
+        """ Return the id of the subject to pass to the metric source calls. """
+        return self._metric_source_id
+
     def stable_id(self):
         """ Return an id that doesn't depend on numbering/order of metrics. """
-        stable_id = self.__class__.__name__
-        if not isinstance(self._subject, list):
+        return self.subject_stable_id(self._subject)
+
+    @classmethod
+    def subject_stable_id(cls, subject):
+        """ Return the stable id of the metric of this class for the subject, without creating the metric. """
+        stable_id = cls.__name__
+        if not isinstance(subject, list):
             # Add the product or team to the id:
-            stable_id += self._subject.name() if self._subject else str(self._subject)
+            stable_id += subject.name() if subject else str(subject)
         return stable_id
 
     def set_id_string(self, id_string):
@@ -189,7 +210,11 @@ class Metric(object):
         if len(name) > max_subject_length:
             name = name[:max_subject_length] + '...'
         logging.info('Reporting %s on %s', self.__class__.__name__, name)
-        return self._get_template().format(**self._parameters())
+        return self.__format_report(self._parameters())
+
+    def __format_report(self, parameters):
+        """ Return the report of the metric, formatted using the parameters. """
+        return self._get_template().format(**parameters)
 
     def _get_template(self):
         """ Return the template for the metric report. """
@@ -221,10 +246,14 @@ class Metric(object):
 
     def norm(self):
         """ Return a description of the norm for the metric. """
+        return self.__format_norm(self._parameters())
+
+    def __format_norm(self, parameters):
+        """ Return the description of the norm for the metric, formatted using the parameters. """
         try:
-            return self.norm_template.format(**self._parameters())
+            return self.norm_template.format(**parameters)
         except KeyError:
-            logging.error('Key missing in parameters of %s: %s', self.__class__.__name__, self._parameters())
+            logging.error('Key missing in parameters of %s: %s', self.__class__.__name__, parameters)
             raise
 
     def url(self):
@@ -326,6 +355,30 @@ class Metric(object):
         minimum, maximum = min(history), max(history)
         return (minimum - 1, maximum + 1) if minimum == maximum else (minimum, maximum)
 
+    @utils.memoized
+    def snapshot(self):
+        """ Return an immutable snapshot of the metric. The values needed to render the metric are derived once, so
+            formatters, trend images and meta metrics can use the snapshot without evaluating the metric again. """
+        if self.__restored_snapshot:
+            return self.__restored_snapshot
+        parameters = self._parameters()
+        try:
+            recent_history, y_axis_range = self.recent_history(), self.y_axis_range()
+        except ValueError:
+            recent_history, y_axis_range = [], (0, 100)
+        return MetricSnapshot(stable_id=self.stable_id(), id_string=self.id_string(), status=self.status(),
+                              numerical_value=self.numerical_value(), status_start_date=self.status_start_date(),
+                              report=self.__format_report(parameters), norm=self.__format_norm(parameters),
+                              url=self.url(), url_label=self.url_label(), comment=self.comment(),
+                              comment_urls=self.comment_urls(), comment_url_label=self.comment_url_label(),
+                              recent_history=recent_history, y_axis_range=y_axis_range)
+
+    def restore_snapshot(self, snapshot):
+        """ Use the snapshot of a previous report instead of evaluating the metric. Pass None to evaluate the
+            metric again. """
+        utils.clear_memoized(self)
+        self.__restored_snapshot = snapshot
+
     def numerical_value(self):
         """ Return a numerical version of the metric value for use in graphs. By default this simply returns the
             regular value, assuming it is already numerical. Metrics that don't have a numerical value by default
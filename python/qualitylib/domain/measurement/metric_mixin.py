@@ -58,12 +58,19 @@ class PercentageMixin(object):
 
 class MetaMetricMixin(object):  # pylint: disable=too-few-public-methods
     """ Mixin class for meta metrics. Assumes that meta metrics are percentage metrics and that the subclass
-        specifies the metric statuses (colors) that the meta metric is measuring. """
+        specifies the metric statuses (colors) that the meta metric is measuring. If a status index of the metrics
+        is passed, the meta metric counts the statuses using the index. """
     metric_statuses = []  # Subclass responsibility
 
+    def __init__(self, *args, **kwargs):
+        self.__status_index = kwargs.pop('status_index', None)
+        super(MetaMetricMixin, self).__init__(*args, **kwargs)
+
     def _numerator(self):
         """ Return the numerator (the number above the divider) for the meta metric. """
-        return len([metric for metric in self._subject if metric.status() in self.metric_statuses])
+        if self.__status_index:
+            return self.__status_index.count(self.metric_statuses)
+        return len([metric for metric in self._subject if metric.snapshot().status() in self.metric_statuses])
 
     def _denominator(self):
         """ Return the denominator (the number below the divider) for the meta metric. """
@@ -0,0 +1,113 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+
+class MetricSnapshot(object):
+    """ Immutable snapshot of everything needed to render a metric. The snapshot has the same query methods as the
+        metric, but the values have been derived once, so rendering a snapshot doesn't evaluate the metric again.
+        A snapshot of a previous report that is shown because the metric couldn't be evaluated in time is stale. """
+
+    __slots__ = ('__stable_id', '__id_string', '__status', '__numerical_value', '__status_start_date', '__report',
+                 '__norm', '__url', '__url_label', '__comment', '__comment_urls', '__comment_url_label',
+                 '__recent_history', '__y_axis_range', '__stale_since')
+
+    def __init__(self, stable_id, id_string, status, numerical_value, status_start_date, report, norm, url, url_label,
+                 comment, comment_urls, comment_url_label, recent_history, y_axis_range, stale_since=None):
+        # pylint: disable=too-many-arguments
+        self.__stable_id = stable_id
+        self.__id_string = id_string
+        self.__status = status
+        self.__numerical_value = numerical_value
+        self.__status_start_date = status_start_date
+        self.__report = report
+        self.__norm = norm
+        self.__url = dict(url)
+        self.__url_label = url_label
+        self.__comment = comment
+        self.__comment_urls = dict(comment_urls)
+        self.__comment_url_label = comment_url_label
+        self.__recent_history = tuple(recent_history)
+        self.__y_axis_range = tuple(y_axis_range)
+        self.__stale_since = stale_since
+
+    def stale(self, measurement_date):
+        """ Return a copy of the snapshot that is marked as stale, because it was measured at the measurement date
+            instead of for the current report. """
+        return MetricSnapshot(self.__stable_id, self.__id_string, self.__status, self.__numerical_value,
+                              self.__status_start_date, self.__report, self.__norm, self.__url, self.__url_label,
+                              self.__comment, self.__comment_urls, self.__comment_url_label, self.__recent_history,
+                              self.__y_axis_range, stale_since=measurement_date)
+
+    def stale_since(self):
+        """ Return the date the snapshot was measured if the snapshot is stale, otherwise None. """
+        return self.__stale_since
+
+    def stable_id(self):
+        """ Return the id of the metric that doesn't depend on the order of the metrics. """
+        return self.__stable_id
+
+    def id_string(self):
+        """ Return the identification string of the metric. """
+        return self.__id_string
+
+    def status(self):
+        """ Return the status/color of the metric. """
+        return self.__status
+
+    def numerical_value(self):
+        """ Return the numerical value of the metric. """
+        return self.__numerical_value
+
+    def status_start_date(self):
+        """ Return since when the metric has the current status. """
+        return self.__status_start_date
+
+    def report(self):
+        """ Return the report of the metric. """
+        return self.__report
+
+    def norm(self):
+        """ Return the description of the norm for the metric. """
+        return self.__norm
+
+    def url(self):
+        """ Return a dictionary of urls for the metric. """
+        return dict(self.__url)
+
+    def url_label(self):
+        """ Return the label to be used to explain the urls. """
+        return self.__url_label
+
+    def comment(self):
+        """ Return the comment on the metric. """
+        return self.__comment
+
+    def comment_urls(self):
+        """ Return a dictionary of urls for the comment. """
+        return dict(self.__comment_urls)
+
+    def comment_url_label(self):
+        """ Return the label for the comment urls. """
+        return self.__comment_url_label
+
+    def recent_history(self):
+        """ Return a list of recent values of the metric. """
+        return list(self.__recent_history)
+
+    def y_axis_range(self):
+        """ Return a two-tuple (min, max) for use in graphs. """
+        return self.__y_axis_range
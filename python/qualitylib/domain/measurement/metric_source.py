@@ -15,11 +15,67 @@ limitations under the License.
 """
 from __future__ import absolute_import
 
+import contextlib
+import threading
+
 from ..base import DomainObject
+from ... import utils
+
+
+class SharedInstances(type):
+    """ Metaclass for metric sources. While sharing is enabled, metric sources that are created with the same
+        class and the same arguments are the same instance, so that projects that use the same metric source share
+        the data retrieved from it. Arguments are compared by value; objects that don't define their own equality,
+        such as other metric sources, are the same argument only if they are the same object. Metric sources
+        created with arguments that can't be compared aren't shared. """
+
+    __instances = None
+    __lock = threading.Lock()
+
+    def __call__(cls, *args, **kwargs):
+        instances = SharedInstances.__instances
+        if instances is None:
+            return super(SharedInstances, cls).__call__(*args, **kwargs)
+        try:
+            key = (cls, SharedInstances.__key(args), SharedInstances.__key(kwargs))
+            hash(key)
+        except TypeError:
+            return super(SharedInstances, cls).__call__(*args, **kwargs)
+        with SharedInstances.__lock:
+            if key not in instances:
+                instances[key] = super(SharedInstances, cls).__call__(*args, **kwargs)
+            return instances[key]
+
+    @staticmethod
+    def __key(value):
+        """ Return a hashable key for the constructor argument value. """
+        if isinstance(value, (list, tuple)):
+            return type(value), tuple(SharedInstances.__key(item) for item in value)
+        if isinstance(value, dict):
+            return dict, tuple(sorted((key, SharedInstances.__key(item)) for key, item in value.items()))
+        if isinstance(value, (set, frozenset)):
+            return type(value), frozenset(SharedInstances.__key(item) for item in value)
+        return value
+
+    @staticmethod
+    def enable(instances):
+        """ Share metric source instances using the dictionary, or stop sharing if instances is None. """
+        SharedInstances.__instances = instances
+
+
+@contextlib.contextmanager
+def shared_metric_sources(instances=None):
+    """ Context manager that shares metric source instances created with the same class and arguments. """
+    SharedInstances.enable(dict() if instances is None else instances)
+    try:
+        yield
+    finally:
+        SharedInstances.enable(None)
 
 
 class MetricSource(DomainObject):  # pylint: disable=too-few-public-methods
     """ Base class for metric sources. """
+    __metaclass__ = SharedInstances
     metric_source_name = ''
     needs_metric_source_id = False
     needs_values_as_list = False
@@ -33,6 +89,18 @@ class MetricSource(DomainObject):  # pylint: disable=too-few-public-methods
         """ Return the url(s) to the metric source for the metric source id. """
         return list(metric_source_ids)  # Default implementation assumes the metric source ids as urls.
 
+    def fulfil(self, calls):
+        """ Retrieve the data for a batch of (method name, metric source id) calls. The default implementation
+            simply makes the calls, so that their results are memoized. Metric sources that can retrieve data in bulk
+            should override this method. """
+        for method_name, metric_source_id in calls:
+            getattr(self, method_name)(metric_source_id)
+
+    def refresh(self):
+        """ Forget the data retrieved so far, so it will be retrieved again. Metric sources that keep data in other
+            ways than by memoizing should override this method. """
+        utils.clear_memoized(self)
+
 
 class MissingMetricSource(MetricSource):
     """ Class that represents a missing metric source. """
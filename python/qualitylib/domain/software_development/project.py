@@ -25,10 +25,15 @@ from .requirement import RequirementSubject
 class Project(RequirementSubject, measurable.MeasurableObject):
     """ Class representing a software development/maintenance project. """
 
-    def __init__(self, organization='Unnamed organization', metric_sources=None, *args, **kwargs):
+    def __init__(self, organization='Unnamed organization', metric_sources=None, metric_source_settings=None,
+                 deadline=None, fetch_workers=None, *args, **kwargs):
+        # pylint: disable=too-many-arguments
         self.__short_section_names = {'MM', 'PC', 'PD', 'PE'}  # Two letter abbreviations used, must be unique
         self.__organization = organization
         self.__metric_sources = MetricSources(metric_sources or dict())
+        self.__metric_source_settings = metric_source_settings or dict()
+        self.__deadline = deadline
+        self.__fetch_workers = fetch_workers
         self.__products = []
         self.__teams = []
         self.__documents = []
@@ -56,6 +61,19 @@ class Project(RequirementSubject, measurable.MeasurableObject):
         """ Return a set of all metric source classes. """
         return self.__metric_sources.keys()
 
+    def metric_source_settings(self, metric_source_class):
+        """ Return the settings that determine how the metric sources of the metric source class are used when
+            creating the report, e.g. how many metrics may be evaluated concurrently. """
+        return self.__metric_source_settings.get(metric_source_class, dict())
+
+    def deadline(self):
+        """ Return the maximum number of seconds that retrieving the data for the report may take, if any. """
+        return self.__deadline
+
+    def fetch_workers(self):
+        """ Return the number of threads that retrieve data from the metric sources simultaneously, if specified. """
+        return self.__fetch_workers
+
     def domain_object_classes(self):
         return {domain_object.__class__ for domain_object in self.products() + self.teams() + self.documents()}
 
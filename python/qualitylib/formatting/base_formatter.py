@@ -52,11 +52,11 @@ class Formatter(object):
         """ Return a formatted version of the section. """
         metrics = []
         for metric in section:
-            metrics.append(self.metric(metric))
+            metrics.append(self.metric(metric.snapshot()))
         return self.sep.join(metrics)
 
     def metric(self, metric):  # pylint: disable=W0613
-        """ Return a formatted version of the metric. """
+        """ Return a formatted version of the metric snapshot. """
         raise NotImplementedError  # pragma: no cover
 
     @staticmethod
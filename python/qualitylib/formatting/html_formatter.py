@@ -17,6 +17,7 @@ from __future__ import absolute_import
 
 import codecs
 import datetime
+import json
 import logging
 import os
 import re
@@ -61,10 +62,11 @@ class HTMLFormatter(base_formatter.Formatter):
         parameters['metric_sources'] = self.__metric_sources(report)
         parameters['requirements'] = self.__requirements(report)
         parameters['history'] = self.__trend_data(report.get_meta_section())
+        parameters['section_summaries'] = self.__section_summaries(report)
 
         metrics = []
         for metric in report.metrics():
-            data = self.__metric_data(metric)
+            data = self.__metric_data(metric.snapshot())
             metric_number = int(data['metric_id'].split('-')[1])
             data['metric_number'] = '{sec}-{num:02d}'.format(sec=data['section'], num=metric_number)
             metrics.append(self.columns.format(**data))
@@ -94,6 +96,13 @@ class HTMLFormatter(base_formatter.Formatter):
         """ Return a HTML formatted version of the metric. """
         return ''  # pragma: no cover
 
+    @staticmethod
+    def __section_summaries(report):
+        """ Return a JSON representation of the number of metrics per status per section, for the dashboard. """
+        status_index = report.status_index()
+        return json.dumps(dict((section.id_prefix(), status_index.statuses(section.id_prefix()))
+                               for section in report.sections()), sort_keys=True)
+
     @staticmethod
     def __section_navigation_menu(report):
         """ Return the menu for jumping to specific sections. """
@@ -174,7 +183,7 @@ class HTMLFormatter(base_formatter.Formatter):
         return percentage_green, percentage_yellow, percentage_red, percentage_grey, percentage_missing
 
     def __metric_data(self, metric):
-        """ Return the metric data as a dictionary, so it can be used in string templates. """
+        """ Return the data of the metric snapshot as a dictionary, so it can be used in string templates. """
         status = metric.status()
         kwargs_by_status = dict(
             red=dict(image='sad', alt=':-(', status_nr=0,
@@ -190,10 +199,10 @@ class HTMLFormatter(base_formatter.Formatter):
         qualifier = 'tenminste ' if metric.status_start_date() <= datetime.datetime(2013, 3, 19, 23, 59, 59) else ''
         kwargs['hover'] += ' (sinds {qual}{date})'.format(qual=qualifier,
                                                           date=utils.format_date(metric.status_start_date(), year=True))
-        kwargs['status'] = metric.status()
+        kwargs['status'] = status
         kwargs['metric_id'] = metric.id_string()
         kwargs['section'] = metric.id_string().split('-')[0]
-        kwargs['text'] = self.__format_metric_text(metric)
+        kwargs['text'] = self.__format_metric_text(metric) + self.__format_staleness(metric)
         kwargs['norm'] = metric.norm()
         kwargs['comment'] = self.__format_metric_comment(metric)
         return kwargs
@@ -209,6 +218,15 @@ class HTMLFormatter(base_formatter.Formatter):
             or more links to the metric source(s) if available. """
         return cls.__format_text_with_links(metric.report(), metric.url(), metric.url_label())
 
+    @staticmethod
+    def __format_staleness(metric):
+        """ Return a marker for stale metrics that says how old the shown value is. """
+        stale_since = metric.stale_since()
+        if not stale_since:
+            return ''
+        age = utils.format_timedelta(datetime.datetime.now() - stale_since)
+        return ' [Verouderd: gemeten {age} geleden, omdat de bron niet op tijd reageerde.]'.format(age=age)
+
     @classmethod
     def __format_metric_comment(cls, metric):
         """ Return a HTML formatted version of the metric comment, including links if appropriate. """
@@ -43,7 +43,7 @@ class JSONFormatter(base_formatter.Formatter):
         return '{' + ', '.join(prefix_elements) + ', '
 
     def metric(self, metric):
-        """ Return a JSON formatted version of the metric. """
+        """ Return a JSON formatted version of the metric snapshot. """
         # Write numerical values without decimals.
         logging.info('Formatting metric %s.', metric.stable_id())
         try:
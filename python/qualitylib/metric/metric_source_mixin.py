@@ -34,6 +34,10 @@ class SonarMetricMixin(object):
         """ Return the id of the subject in Sonar. """
         return self.__sonar_product_info.sonar_id()
 
+    def _data_requirement_id(self):
+        """ Return the Sonar id of the subject as id to pass to the Sonar calls. """
+        return self._sonar_id()
+
 
 class SonarDashboardMetricMixin(SonarMetricMixin):
     """ Mixin class for metrics that use the Sonar dashboard. """
@@ -28,6 +28,7 @@ class CyclicDependencies(SonarDashboardMetricMixin, LowerIsBetterMetric):
     template = '{name} heeft {value} {unit}.'
     target_value = 0
     low_target_value = 10
+    metric_source_calls = ('package_cycles',)
 
     def value(self):
         cycles = self._metric_source.package_cycles(self._sonar_id())
@@ -24,6 +24,7 @@ class Duplication(SonarDashboardMetricMixin, LowerPercentageIsBetterMetric):
 
     norm_template = 'Maximaal {target}% gedupliceerde regels code. Meer dan {low_target}% is rood.'
     template = '{name} heeft {value}% ({numerator} op {denominator}) duplicatie.'
+    metric_source_calls = ('duplicated_lines', 'lines')
 
     def _numerator(self):
         return self._metric_source.duplicated_lines(self._sonar_id())
@@ -55,6 +55,7 @@ class IntegrationtestLineCoverage(IntegrationtestCoverage):
     template = '{name} integratietest line coverage is {value:.0f}{unit}.'
     target_value = 98
     low_target_value = 90
+    metric_source_calls = ('integration_test_line_coverage',)
 
     def value(self):
         coverage = self._metric_source.integration_test_line_coverage(self._sonar_id())
@@ -70,6 +71,7 @@ class IntegrationtestBranchCoverage(IntegrationtestCoverage):
     template = '{name} integratietest branch coverage is {value:.0f}{unit}.'
     target_value = 80
     low_target_value = 60
+    metric_source_calls = ('integration_test_branch_coverage',)
 
     def value(self):
         coverage = self._metric_source.integration_test_branch_coverage(self._sonar_id())
@@ -29,6 +29,7 @@ class ProductLOC(SonarDashboardMetricMixin, LowerIsBetterMetric):
     template = '{name} heeft {value} {unit}.'
     target_value = 50000
     low_target_value = 100000
+    metric_source_calls = ('ncloc',)
 
     def value(self):
         loc = self._metric_source.ncloc(self._sonar_id())
@@ -28,6 +28,7 @@ class CommentedLOC(SonarDashboardMetricMixin, LowerPercentageIsBetterMetric):
     template = '{name} heeft {value}{unit} ({numerator} van {denominator}) uitgecommentarieerde regels code.'
     target_value = 1
     low_target_value = 5
+    metric_source_calls = ('commented_loc', 'ncloc')
 
     def _numerator(self):
         return self._metric_source.commented_loc(self._sonar_id())
@@ -70,6 +71,7 @@ class CyclomaticComplexity(MethodQualityMetric):
 
     name = 'Cyclomatische complexiteit'
     attribute = 'een cyclomatische complexiteit van 10 of hoger'
+    metric_source_calls = ('complex_methods', 'methods')
 
     def _numerator(self):
         return self._metric_source.complex_methods(self._sonar_id())
@@ -81,6 +83,7 @@ class LongMethods(MethodQualityMetric):
 
     name = 'Lengte van methoden'
     attribute = 'een lengte van meer dan 20 NCSS (Non-Comment Source Statements)'
+    metric_source_calls = ('long_methods', 'methods')
 
     def _numerator(self):
         return self._metric_source.long_methods(self._sonar_id())
@@ -92,6 +95,7 @@ class ManyParameters(MethodQualityMetric):
 
     name = 'Hoeveelheid methoden met te veel parameters'
     attribute = 'meer dan 5 parameters'
+    metric_source_calls = ('many_parameters_methods', 'methods')
 
     def _numerator(self):
         return self._metric_source.many_parameters_methods(self._sonar_id())
@@ -48,6 +48,7 @@ class UnitAndIntegrationTestLineCoverage(UnitAndIntegrationTestCoverage):
     template = '{name} gecombineerde unit- en integratietest line coverage is {value:.0f}{unit}.'
     target_value = 98
     low_target_value = 90
+    metric_source_calls = ('overall_test_line_coverage',)
 
     def value(self):
         coverage = self._metric_source.overall_test_line_coverage(self._sonar_id())
@@ -63,6 +64,7 @@ class UnitAndIntegrationTestBranchCoverage(UnitAndIntegrationTestCoverage):
     template = '{name} gecombineerde unit- en integratietest branch coverage is {value:.0f}{unit}.'
     target_value = 80
     low_target_value = 60
+    metric_source_calls = ('overall_test_branch_coverage',)
 
     def value(self):
         coverage = self._metric_source.overall_test_branch_coverage(self._sonar_id())
@@ -53,6 +53,7 @@ class FailingUnittests(UnittestMetricMixin, LowerIsBetterMetric):
     no_tests_template = 'Er zijn geen {unit}.'
     target_value = 0
     low_target_value = 0
+    metric_source_calls = ('failing_unittests', 'unittests')
 
     def value(self):
         value = self._metric_source.failing_unittests(self._sonar_id())
@@ -88,6 +89,7 @@ class UnittestLineCoverage(UnittestCoverage):
     template = '{name} unittest line coverage is {value:.0f}{unit} ({tests} unittests).'
     target_value = 98
     low_target_value = 90
+    metric_source_calls = ('unittest_line_coverage', 'unittests')
 
     def value(self):
         coverage = self._metric_source.unittest_line_coverage(self._sonar_id())
@@ -103,6 +105,7 @@ class UnittestBranchCoverage(UnittestCoverage):
     template = '{name} unittest branch coverage is {value:.0f}{unit} ({tests} unittests).'
     target_value = 80
     low_target_value = 60
+    metric_source_calls = ('unittest_branch_coverage', 'unittests')
 
     def value(self):
         coverage = self._metric_source.unittest_branch_coverage(self._sonar_id())
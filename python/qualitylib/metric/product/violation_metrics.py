@@ -51,6 +51,7 @@ class BlockerViolations(Violations):
     violation_type = 'blocker'
     target_value = 0
     low_target_value = 0
+    metric_source_calls = ('blocker_violations',)
 
 
 class CriticalViolations(Violations):
@@ -60,6 +61,7 @@ class CriticalViolations(Violations):
     violation_type = 'critical'
     target_value = 0
     low_target_value = 1
+    metric_source_calls = ('critical_violations',)
 
 
 class MajorViolations(Violations):
@@ -69,6 +71,7 @@ class MajorViolations(Violations):
     violation_type = 'major'
     target_value = 25
     low_target_value = 50
+    metric_source_calls = ('major_violations',)
 
 
 class NoSonar(SonarViolationsMetricMixin, LowerIsBetterMetric):
@@ -80,6 +83,7 @@ class NoSonar(SonarViolationsMetricMixin, LowerIsBetterMetric):
     template = '{name} bevat {value} {unit}.'
     target_value = 25
     low_target_value = 50
+    metric_source_calls = ('no_sonar',)
 
     def value(self):
         no_sonar = self._metric_source.no_sonar(self._sonar_id())
@@ -95,6 +99,7 @@ class FalsePositives(SonarMetricMixin, LowerIsBetterMetric):
     template = '{name} bevat {value} violations die zijn gemarkeerd als false positive.'
     target_value = 25
     low_target_value = 50
+    metric_source_calls = ('false_positives',)
 
     def value(self):
         false_positives = self._metric_source.false_positives(self._sonar_id())
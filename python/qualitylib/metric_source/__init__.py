@@ -26,13 +26,23 @@ from .abstract.version_control_system import VersionControlSystem
 from .ansible_config_report import AnsibleConfigReport
 from .archive_system.nexus import Nexus
 from .birt import Birt
+from .cache_policy import CachePolicy, set_default_cache_policy
 from .coverage_report.jacoco import JaCoCo
 from .coverage_report.ncover import NCover
+from .fetch_plan import FetchPlan, set_default_fetch_plan
+from .fetcher import default_fetcher
+from .health_probe import HealthProbe, set_default_health_probe
 from .history import History
 from .holiday_planner import HolidayPlanner
 from .jenkins import Jenkins
 from .jira import Jira
+from .latency_stats import LatencyStats, default_latency_stats, set_default_latency_stats
 from .open_vas_scan_report import OpenVASScanReport
+from .request_policy import RequestPolicy, set_default_request_policy
+from .response_cache import ResponseCache, set_default_response_cache
+from .run_budget import RunBudget, default_run_budget, set_default_run_budget
+from .source_snapshot import SourceSnapshot, default_source_snapshot, set_default_source_snapshot
+from .url_manifest import UrlManifest, set_default_url_manifest
 from .owasp_dependency_report.jenkins_owasp_dependency_plugin import JenkinsOWASPDependencyReport
 from .owasp_dependency_report.owasp_dependency_xml_report import OWASPDependencyXMLReport
 from .performance_report.jmeter import JMeterPerformanceLoadTestReport, JMeterPerformanceEnduranceTestReport, \
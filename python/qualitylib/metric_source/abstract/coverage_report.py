@@ -18,6 +18,7 @@ from __future__ import absolute_import
 import datetime
 import bs4
 
+from .. import response_cache
 from ..url_opener import UrlOpener
 from ... import utils, domain
 
@@ -35,11 +36,11 @@ class CoverageReport(domain.MetricSource):
     def statement_coverage(self, coverage_url):
         """ Return the ART statement coverage for a specific product. """
         try:
-            soup = self.__get_soup(coverage_url)
+            contents = self.__get_contents(coverage_url)
         except UrlOpener.url_open_exceptions:
             coverage = -1
         else:
-            coverage = self._parse_statement_coverage_percentage(soup)
+            coverage = self.__parse(contents, self._parse_statement_coverage_percentage)
         return coverage
 
     def _parse_statement_coverage_percentage(self, soup):
@@ -50,11 +51,11 @@ class CoverageReport(domain.MetricSource):
     def branch_coverage(self, coverage_url):
         """ Return the ART branch coverage for a specific product. """
         try:
-            soup = self.__get_soup(coverage_url)
+            contents = self.__get_contents(coverage_url)
         except UrlOpener.url_open_exceptions:
             coverage = -1
         else:
-            coverage = self._parse_branch_coverage_percentage(soup)
+            coverage = self.__parse(contents, self._parse_branch_coverage_percentage)
         return coverage
 
     def _parse_branch_coverage_percentage(self, soup):
@@ -66,11 +67,11 @@ class CoverageReport(domain.MetricSource):
         """ Return the date when the ART coverage for a specific product was last successfully measured. """
         coverage_date_url = self._get_coverage_date_url(coverage_url)
         try:
-            soup = self.__get_soup(coverage_date_url)
+            contents = self.__get_contents(coverage_date_url)
         except UrlOpener.url_open_exceptions:
             coverage_date = now()
         else:
-            coverage_date = self._parse_coverage_date(soup)
+            coverage_date = self.__parse(contents, self._parse_coverage_date)
         return coverage_date
 
     def _parse_coverage_date(self, soup):
@@ -82,7 +83,18 @@ class CoverageReport(domain.MetricSource):
         """ Return the url for the date when the coverage of the product was last measured. """
         return coverage_url
 
+    def __parse(self, contents, parse_soup):
+        """ Parse the HTML contents with the parse function. If the contents were parsed before, possibly during a
+            previous run, the earlier result is reused. """
+        return response_cache.parse((self.__class__.__name__, parse_soup.__name__), contents,
+                                    lambda: parse_soup(self.__get_soup(contents)))
+
+    @utils.memoized
+    def __get_contents(self, url):
+        """ Get the HTML at the url. """
+        return response_cache.read(self.__url_open(url))
+
     @utils.memoized
-    def __get_soup(self, url):
-        """ Get a beautiful soup of the HTML at the url. """
-        return bs4.BeautifulSoup(self.__url_open(url), "html.parser")
+    def __get_soup(self, contents):
+        """ Get a beautiful soup of the HTML contents. """
+        return bs4.BeautifulSoup(contents, "html.parser")
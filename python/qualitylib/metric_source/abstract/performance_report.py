@@ -17,7 +17,7 @@ from __future__ import absolute_import
 
 import datetime
 
-from .. import beautifulsoup
+from .. import beautifulsoup, response_cache
 from ... import domain, utils
 from ..url_opener import UrlOpener
 
@@ -38,21 +38,23 @@ class PerformanceReport(domain.MetricSource, beautifulsoup.BeautifulSoupOpener):
     def queries(self, product):
         """ Return the number of performance queries. """
         try:
-            return len(self._query_rows(product))
+            return self.__parse(product, self.urls(product), 'queries', lambda: len(self._query_rows(product)))
         except UrlOpener.url_open_exceptions:
             return -1
 
     def queries_violating_max_responsetime(self, product):
         """ Return the number of performance queries that violate the maximum response time. """
         try:
-            return self.__queries_violating_response_time(product, 'red')
+            return self.__parse(product, self.urls(product), 'queries_violating_max_responsetime',
+                                lambda: self.__queries_violating_response_time(product, 'red'))
         except UrlOpener.url_open_exceptions:
             return -1
 
     def queries_violating_wished_responsetime(self, product):
         """ Return the number of performance queries that violate the maximum response time we'd like to meet. """
         try:
-            return self.__queries_violating_response_time(product, 'yellow')
+            return self.__parse(product, self.urls(product), 'queries_violating_wished_responsetime',
+                                lambda: self.__queries_violating_response_time(product, 'yellow'))
         except UrlOpener.url_open_exceptions:
             return -1
 
@@ -63,10 +65,9 @@ class PerformanceReport(domain.MetricSource, beautifulsoup.BeautifulSoupOpener):
         if urls:
             url = list(urls)[0]  # Any url is fine
             try:
-                soup = self.soup(url)
+                return self.__parse(product, [url], 'date', lambda: self._date_from_soup(self.soup(url)))
             except UrlOpener.url_open_exceptions:
                 return datetime.datetime.min
-            return self._date_from_soup(soup)
         else:
             return datetime.datetime.min
 
@@ -74,6 +75,12 @@ class PerformanceReport(domain.MetricSource, beautifulsoup.BeautifulSoupOpener):
         """ Return the queries for the specified product. """
         raise NotImplementedError  # pragma: no cover
 
+    def __parse(self, product, urls, key, parse):
+        """ Return the result of the parse function for the product. If the reports at the urls are unchanged
+            since a previous run, the earlier result is reused. """
+        contents = ''.join(self.contents(url) for url in sorted(urls))
+        return response_cache.parse((self.__class__.__name__, key, repr(product)), contents, parse)
+
     def __queries_violating_response_time(self, product, color):
         """ Return the number of queries that are violating either the maximum or the desired response time. """
         return len([row for row in self._query_rows(product)
@@ -17,11 +17,40 @@ from __future__ import absolute_import
 
 import subprocess
 import logging
-import os
 import re
+import threading
+import time
 
 from ... import utils
 from . import archive_system
+from ..fetch_plan import default_fetch_plan
+from ..run_budget import BudgetExhausted, default_run_budget
+from ..source_snapshot import default_source_snapshot
+
+
+def check_output(shell_command, timeout=None, **kwargs):
+    """ Run the shell command and return its output, like subprocess.check_output. If the command doesn't finish
+        within the timeout (in seconds), it's killed and fails. """
+    process = subprocess.Popen(shell_command, stdout=subprocess.PIPE, **kwargs)
+    timer = None if timeout is None else threading.Timer(timeout, _kill, args=(process,))
+    if timer:
+        timer.start()
+    try:
+        output = process.communicate()[0]
+    finally:
+        if timer:
+            timer.cancel()
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, shell_command, output=output)
+    return output
+
+
+def _kill(process):
+    """ Kill the process, unless it has finished already. """
+    try:
+        process.kill()
+    except OSError:
+        pass
 
 
 class VersionControlSystem(archive_system.ArchiveSystem):
@@ -31,7 +60,7 @@ class VersionControlSystem(archive_system.ArchiveSystem):
     needs_values_as_list = True
     needs_metric_source_id = True
 
-    def __init__(self, username=None, password=None, url=None, run_shell_command=subprocess.check_output):
+    def __init__(self, username=None, password=None, url=None, run_shell_command=check_output):
         self._username = username
         self._password = password
         self._shell_command = run_shell_command
@@ -71,19 +100,49 @@ class VersionControlSystem(archive_system.ArchiveSystem):
         return ''  # pragma: no cover
 
     def _run_shell_command(self, shell_command, folder=None, log_level=logging.WARNING):
-        """ Invoke a shell and run the command. If a folder is specified, run the command in that folder. """
-        original_working_dir = os.getcwd()
-        if folder:
-            os.chdir(folder)
+        """ Invoke a shell and run the command. If a folder is specified, run the command in that folder. If a source
+            snapshot is being replayed, the output is read from the snapshot instead; if a source snapshot is being
+            recorded, the output is stored in it. Commands that are run count against the time budget of the
+            version control system: they aren't started when the budget has run out and are killed when it runs
+            out while they're running. """
+        fetch_plan = default_fetch_plan()
+        source_snapshot = default_source_snapshot()
         try:
-            return self._shell_command(shell_command)
-        except subprocess.CalledProcessError as reason:
+            if fetch_plan:
+                fetch_plan.shell_command(self, shell_command)
+            if source_snapshot is None:
+                return self.__run_shell_command(shell_command, folder)
+            if source_snapshot.replaying():
+                return source_snapshot.command_output(shell_command, folder)
+            return self.__run_and_record_shell_command(source_snapshot, shell_command, folder)
+        except (subprocess.CalledProcessError, BudgetExhausted) as reason:
             # No need to include the shell command in the log, because the reason contains the shell command.
             logging.log(log_level, 'Shell command failed: %s', reason)
             if log_level > logging.WARNING:
                 raise
-        finally:
-            os.chdir(original_working_dir)
+
+    def __run_and_record_shell_command(self, source_snapshot, shell_command, folder):
+        """ Run the shell command in the folder and store its output or failure in the source snapshot. """
+        start = time.time()
+        try:
+            output = self.__run_shell_command(shell_command, folder)
+        except subprocess.CalledProcessError as reason:
+            source_snapshot.record_command_error(shell_command, folder, reason, time.time() - start)
+            raise
+        return source_snapshot.record_command(shell_command, folder, output, time.time() - start)
+
+    def __run_shell_command(self, shell_command, folder):
+        """ Run the shell command in the folder, within the remaining time budget. """
+        run_budget = default_run_budget()
+        remaining = run_budget.remaining(self) if run_budget else None
+        if remaining == 0:
+            raise BudgetExhausted('the time budget of {0} has run out'.format(self.__class__.__name__))
+        # Pass the folder as working directory of the command instead of changing the working directory of the
+        # process, so that shell commands can safely be run from multiple threads.
+        kwargs = dict(cwd=folder) if folder else dict()
+        if remaining is not None:
+            kwargs['timeout'] = remaining
+        return self._shell_command(shell_command, **kwargs)
 
     @staticmethod
     def _parse_version(tag):
@@ -18,14 +18,19 @@ from __future__ import absolute_import
 
 from bs4 import BeautifulSoup
 
-from . import url_opener
+from . import url_opener, response_cache
 from .. import utils
 
 
 class BeautifulSoupOpener(url_opener.UrlOpener):
     """ Class for opening urls with BeautifulSoup. """
 
+    @utils.memoized
+    def contents(self, url):
+        """ Return the contents of the url. """
+        return response_cache.read(self.url_open(url))
+
     @utils.memoized
     def soup(self, url):
         """ Return a BeautifulSoup version of the url. """
-        return BeautifulSoup(self.url_open(url), "html.parser")
+        return BeautifulSoup(self.contents(url), "html.parser")
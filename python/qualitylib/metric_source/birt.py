@@ -158,6 +158,12 @@ class Birt(domain.MetricSource, beautifulsoup.BeautifulSoupOpener):
         # Forward method calls that this class doesn't support to the sprint progress report.
         return getattr(self.__sprint_progress_report, attribute)
 
+    def refresh(self):
+        """ Override to also forget the test design report and the sprint progress report. """
+        super(Birt, self).refresh()
+        utils.clear_memoized(self.__sprint_progress_report)
+        self.__test_design_report = None
+
     # Urls to reports
 
     def test_design_url(self):
@@ -0,0 +1,55 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import re
+
+
+class CachePolicy(object):
+    """ Time to live of cached responses: the number of seconds a cached response can be used without asking the
+        server whether it was modified. The time to live can be set per metric source class and, for urls matching a
+        regular expression, per url pattern of a metric source class. """
+
+    def __init__(self, ttls=None, url_ttls=None):
+        self.__ttls = ttls or dict()
+        self.__url_ttls = dict((metric_source_class, [(re.compile(pattern), ttl) for pattern, ttl in patterns.items()])
+                               for metric_source_class, patterns in (url_ttls or dict()).items())
+
+    def ttl(self, url_opener, url):
+        """ Return the time to live of the cached response to the url opened by the url opener. The url patterns
+            take precedence over the time to live of the metric source class. Without time to live, return 0. """
+        metric_source_classes = url_opener.__class__.__mro__
+        for metric_source_class in metric_source_classes:
+            for pattern, ttl in self.__url_ttls.get(metric_source_class, []):
+                if pattern.search(url):
+                    return ttl
+        for metric_source_class in metric_source_classes:
+            if metric_source_class in self.__ttls:
+                return self.__ttls[metric_source_class]
+        return 0
+
+
+_DEFAULT_CACHE_POLICY = [None]
+
+
+def default_cache_policy():
+    """ Return the cache policy used by all url openers, if any. """
+    return _DEFAULT_CACHE_POLICY[0]
+
+
+def set_default_cache_policy(cache_policy):
+    """ Set the cache policy used by all url openers. """
+    _DEFAULT_CACHE_POLICY[0] = cache_policy
@@ -0,0 +1,197 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import httplib
+import socket
+import StringIO
+import threading
+import urllib
+import urllib2
+import zlib
+
+
+class ConnectionPool(object):
+    """ Pool of open HTTP connections, keyed by connection class and host. Connections are kept open after a
+        request so the next request to the same host doesn't have to set up a new (TLS) connection. The pool
+        doesn't limit the number of connections per host itself; the request policy does that with the
+        max_connections setting, so the pool keeps at most as many idle connections per host as were in use at the
+        same time. """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__idle_connections = dict()
+
+    def acquire(self, key, create_connection):
+        """ Return an idle connection for the key, or a new connection created with the create connection function
+            if there's no idle connection. Also return whether the connection was used before. """
+        with self.__lock:
+            idle_connections = self.__idle_connections.get(key)
+            if idle_connections:
+                return idle_connections.pop(), True
+        return create_connection(), False
+
+    def release(self, key, connection, reusable=True):
+        """ Give the connection back to the pool. Connections that can't be reused are closed. """
+        if reusable:
+            with self.__lock:
+                self.__idle_connections.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+
+    def close(self):
+        """ Close the idle connections. """
+        with self.__lock:
+            idle_connections, self.__idle_connections = self.__idle_connections, dict()
+        for connections in idle_connections.values():
+            for connection in connections:
+                connection.close()
+
+
+class KeepAliveHandler(urllib2.HTTPHandler, urllib2.HTTPSHandler):
+    """ Url handler for HTTP and HTTPS that reuses connections from a connection pool. The response is read
+        completely before the connection is given back to the pool. Unless the request asks for a specific encoding,
+        the server is told it may compress the response with gzip or deflate; compressed responses are
+        decompressed while they are read. Requests can have a connect_timeout and a
+        read_timeout attribute to use separate timeouts for connecting and reading; otherwise the timeout of the
+        request is used for both. """
+
+    def __init__(self, connection_pool):
+        urllib2.HTTPHandler.__init__(self)
+        urllib2.HTTPSHandler.__init__(self)
+        self.__connection_pool = connection_pool
+
+    def http_open(self, request):
+        """ Open the HTTP request using a pooled connection. """
+        return self.__open(httplib.HTTPConnection, request)
+
+    def https_open(self, request):
+        """ Open the HTTPS request using a pooled connection. Requests tunneled through a proxy aren't pooled. """
+        if getattr(request, '_tunnel_host', None):
+            return urllib2.HTTPSHandler.https_open(self, request)
+        return self.__open(httplib.HTTPSConnection, request)
+
+    def __open(self, connection_class, request):
+        """ Send the request and read the response. If a reused connection turns out to be closed by the server,
+            the request is sent again, until a new connection is used. The connection is always given back to the
+            pool; it's only kept open if the response was read completely and the server doesn't close it. """
+        host = request.get_host()
+        if not host:
+            raise urllib2.URLError('no host given')
+        key = (connection_class, host)
+        while True:
+            try:
+                connection, reused = self.__connection_pool.acquire(key, lambda: self.__connect(connection_class,
+                                                                                                request))
+            except (socket.error, httplib.HTTPException) as reason:
+                raise urllib2.URLError(reason)
+            reusable = False
+            try:
+                response = self.__send(connection, request)
+                reusable = not response.will_close
+                return response
+            except (socket.error, httplib.HTTPException) as reason:
+                if not (reused and self.__can_resend(request, reason)):
+                    raise urllib2.URLError(reason)
+            finally:
+                self.__connection_pool.release(key, connection, reusable)
+
+    @staticmethod
+    def __can_resend(request, reason):
+        """ Return whether the request can safely be sent again after it failed on a reused connection. Requests
+            that change data and requests that timed out aren't sent again. """
+        return request.get_method() in ('GET', 'HEAD') and not isinstance(reason, socket.timeout)
+
+    def __connect(self, connection_class, request):
+        """ Create a new connection for the request and connect it within the connect timeout. """
+        timeout = getattr(request, 'connect_timeout', request.timeout)
+        if connection_class is httplib.HTTPSConnection and getattr(self, '_context', None):
+            connection = connection_class(request.get_host(), timeout=timeout, context=self._context)
+        else:
+            connection = connection_class(request.get_host(), timeout=timeout)
+        connection.connect()
+        return connection
+
+    @staticmethod
+    def __send(connection, request):
+        """ Send the request over the connection and return the response, read completely within the read
+            timeout. """
+        if getattr(connection, 'sock', None) and hasattr(request, 'read_timeout'):
+            connection.sock.settimeout(request.read_timeout)
+        headers = dict(request.unredirected_hdrs)
+        headers.update(request.headers)
+        headers['Connection'] = 'keep-alive'
+        headers = dict((name.title(), value) for name, value in headers.items())
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        connection.request(request.get_method(), request.get_selector(), request.data, headers)
+        http_response = connection.getresponse()
+        contents = read_decompressed(http_response)
+        response = urllib.addinfourl(StringIO.StringIO(contents), http_response.msg, request.get_full_url(),
+                                     http_response.status)
+        response.msg = http_response.reason
+        response.will_close = http_response.will_close
+        return response
+
+
+def read_decompressed(http_response, chunk_size=64 * 1024):
+    """ Read the HTTP response in chunks and decompress the chunks if the response is gzip or deflate encoded. The
+        headers of a decompressed response no longer mention the encoding and the compressed length. """
+    encoding = (http_response.getheader('Content-Encoding') or '').strip().lower()
+    if encoding not in ('gzip', 'deflate'):
+        return http_response.read()
+    chunks, decompressor = [], None
+    chunk = http_response.read(chunk_size)
+    while chunk:
+        if decompressor is None:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS if encoding == 'gzip' else
+                                              zlib.MAX_WBITS if is_zlib_stream(chunk) else -zlib.MAX_WBITS)
+        try:
+            chunks.append(decompressor.decompress(chunk))
+        except zlib.error as reason:
+            raise httplib.HTTPException('invalid {0} encoded contents: {1}'.format(encoding, reason))
+        chunk = http_response.read(chunk_size)
+    if decompressor:
+        chunks.append(decompressor.flush())
+    for header in ('Content-Encoding', 'Content-Length'):
+        if header in http_response.msg:
+            del http_response.msg[header]
+    return ''.join(chunks)
+
+
+def is_zlib_stream(contents):
+    """ Return whether the deflate encoded contents have a zlib header. Some servers send raw deflate data instead. """
+    return len(contents) >= 2 and ord(contents[0]) & 0x0f == 8 and (ord(contents[0]) * 256 + ord(contents[1])) % 31 == 0
+
+
+_DEFAULT_CONNECTION_POOL = ConnectionPool()
+
+
+def default_connection_pool():
+    """ Return the connection pool shared by all url openers. """
+    return _DEFAULT_CONNECTION_POOL
+
+
+def build_opener(*handlers):
+    """ Return a url opener with the handlers that reuses connections from the default connection pool. """
+    return urllib2.build_opener(KeepAliveHandler(default_connection_pool()), *handlers)
+
+
+_DEFAULT_OPENER = build_opener()
+
+
+def url_open(url):
+    """ Open the url, reusing connections from the default connection pool. """
+    return _DEFAULT_OPENER.open(url)
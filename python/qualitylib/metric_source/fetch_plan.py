@@ -0,0 +1,103 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import subprocess
+import threading
+import urllib2
+
+from .latency_stats import url_pattern
+
+
+class PlannedRequest(urllib2.URLError):
+    """ Raised instead of opening a url while planning, when no cached response to the url is available. """
+    pass
+
+
+class FetchPlan(object):
+    """ The calls the metric sources would make to create the report, recorded instead of made. Responses cached
+        by previous runs are returned, so calls that depend on earlier responses, such as a call per job, show up
+        as well; other calls fail without network I/O. The duration of the calls is estimated with the latencies
+        measured during previous runs. """
+
+    def __init__(self, response_cache=None, latency_stats=None):
+        self.__response_cache = response_cache
+        self.__latency_stats = latency_stats
+        self.__lock = threading.Lock()
+        self.__calls = dict()  # Number of calls per metric source class name and url or shell command
+
+    def response(self, metric_source, url):
+        """ Record the call to the url and return the cached response, if any. Otherwise raise an exception. """
+        url = url.get_full_url() if isinstance(url, urllib2.Request) else url
+        self.__record(metric_source, url)
+        response = self.__response_cache.cached(url) if self.__response_cache else None
+        if response is None:
+            raise PlannedRequest('{0} is not opened while planning'.format(url))
+        return response
+
+    def shell_command(self, metric_source, shell_command):
+        """ Record the shell command and fail as if the command failed, without running it. """
+        shell_command = ' '.join(shell_command) if isinstance(shell_command, (list, tuple)) else shell_command
+        self.__record(metric_source, shell_command)
+        raise subprocess.CalledProcessError(-1, shell_command, 'not run while planning')
+
+    def report(self):
+        """ Return the plan as text. Per metric source class, the calls are grouped by url pattern, with the
+            patterns that are called most often first, so calls per item, such as per card or per job, stand out. """
+        with self.__lock:
+            calls = dict((class_name, dict(calls_of_class)) for class_name, calls_of_class in self.__calls.items())
+        lines = []
+        for class_name in sorted(calls):
+            calls_of_class = calls[class_name]
+            lines.append('{0}: {1} calls to {2} urls or commands, estimated {3:.1f} seconds'.format(
+                class_name, sum(calls_of_class.values()), len(calls_of_class), self.__duration(calls_of_class)))
+            patterns = dict()
+            for call in calls_of_class:
+                patterns.setdefault(url_pattern(call), []).append(call)
+            for pattern, pattern_calls in sorted(patterns.items(), key=lambda item: (-len(item[1]), item[0])):
+                lines.append('{0:6d} x {1}'.format(len(pattern_calls), pattern))
+                if len(pattern_calls) > 1:
+                    lines.extend('           ' + call for call in sorted(pattern_calls))
+        lines.append('Total: {0} calls, estimated {1:.1f} seconds'.format(
+            sum(sum(calls_of_class.values()) for calls_of_class in calls.values()),
+            sum(self.__duration(calls_of_class) for calls_of_class in calls.values())))
+        return '\n'.join(lines) + '\n'
+
+    def __record(self, metric_source, call):
+        """ Record the call by the metric source. """
+        with self.__lock:
+            calls_of_class = self.__calls.setdefault(metric_source.__class__.__name__, dict())
+            calls_of_class[call] = calls_of_class.get(call, 0) + 1
+
+    def __duration(self, calls):
+        """ Return the expected duration of the calls, if they were made one after the other. Repeated calls are
+            counted once, because metric sources memoize their responses. """
+        if self.__latency_stats is None:
+            return 0.
+        return sum(self.__latency_stats.expected('urls', url_pattern(call)) for call in calls)
+
+
+_DEFAULT_FETCH_PLAN = [None]
+
+
+def default_fetch_plan():
+    """ Return the fetch plan that records the calls of all metric sources, if planning. """
+    return _DEFAULT_FETCH_PLAN[0]
+
+
+def set_default_fetch_plan(fetch_plan):
+    """ Set the fetch plan that records the calls of all metric sources. """
+    _DEFAULT_FETCH_PLAN[0] = fetch_plan
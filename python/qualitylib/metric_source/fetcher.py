@@ -0,0 +1,160 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import itertools
+import Queue
+import socket
+import StringIO
+import sys
+import threading
+import urllib
+
+
+class PendingResult(object):
+    """ The result of a function that is being run by the fetcher. The result is available when the run is done. """
+
+    def __init__(self):
+        self.__done = threading.Event()
+        self.__result = None
+        self.__exc_info = None
+
+    def done(self):
+        """ Return whether the run is done. """
+        return self.__done.is_set()
+
+    def set_result(self, result):
+        """ Set the result and signal that the run is done. """
+        self.__result = result
+        self.__done.set()
+
+    def set_exception(self, exc_info):
+        """ Set the exception raised by the function and signal that the run is done. """
+        self.__exc_info = exc_info
+        self.__done.set()
+
+    def result(self, timeout=None):
+        """ Wait for the run to be done and return the result or raise the exception of the function. If the run
+            isn't done within the timeout (in seconds), raise a timeout exception. """
+        if not self.__done.wait(timeout):
+            raise socket.timeout('gave up waiting after {0:.0f} seconds'.format(timeout))
+        if self.__exc_info:
+            raise self.__exc_info[0], self.__exc_info[1], self.__exc_info[2]
+        return self.__result
+
+
+class Fetcher(object):
+    """ Run url fetches using a fixed number of worker threads. Any number of fetches can be submitted; they are
+        queued and served as soon as a worker is available, so callers don't start a thread per request, while the
+        number of simultaneous requests stays bounded. Each worker still blocks on one request at a time, so the
+        number of requests in flight is at most the number of workers; the project definition can raise that number
+        with the fetch_workers argument. Queued functions with the highest expected latency are run first, so slow
+        requests don't end up at the tail of the run. """
+
+    def __init__(self, nr_workers=16):
+        self.__queue = Queue.PriorityQueue()
+        self.__sequence = itertools.count()  # Keeps functions with the same expected latency in submission order
+        self.__nr_workers = nr_workers
+        self.__workers = []
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    def nr_workers(self):
+        """ Return the number of worker threads. """
+        return self.__nr_workers
+
+    def set_nr_workers(self, nr_workers):
+        """ Change the number of worker threads. Extra workers are started when the next function is submitted;
+            superfluous workers stop when they are idle. """
+        with self.__lock:
+            nr_superfluous_workers = len(self.__workers) - nr_workers
+            self.__nr_workers = nr_workers
+        for _ in range(nr_superfluous_workers):
+            # Tell an idle worker to stop, before it runs other queued functions
+            self.__queue.put((float('-inf'), next(self.__sequence), None, None, None))
+
+    def submit(self, function, *args, **kwargs):
+        """ Queue the function to be run with the arguments and return the pending result. The expected_latency
+            keyword argument (in seconds) determines the order in which queued functions are run, slowest first.
+            Functions submitted by the worker threads themselves are run immediately, to prevent the workers from
+            waiting on each other. """
+        expected_latency = kwargs.pop('expected_latency', 0.)
+        pending_result = PendingResult()
+        if getattr(self.__local, 'is_worker', False):
+            self.__run(pending_result, function, args)
+        else:
+            self.__start_workers()
+            self.__queue.put((-expected_latency, next(self.__sequence), pending_result, function, args))
+        return pending_result
+
+    def run(self, function, *args):
+        """ Run the function with the arguments, wait for it to be done and return the result. """
+        return self.submit(function, *args).result()
+
+    def __start_workers(self):
+        """ Start the worker threads if they haven't been started yet. """
+        with self.__lock:
+            while len(self.__workers) < self.__nr_workers:
+                worker = threading.Thread(target=self.__work)
+                worker.daemon = True
+                worker.start()
+                self.__workers.append(worker)
+
+    def __work(self):
+        """ Run functions from the queue until the process ends. """
+        self.__local.is_worker = True
+        while True:
+            pending_result, function, args = self.__queue.get()[2:]
+            if function is None:
+                with self.__lock:
+                    self.__workers.remove(threading.current_thread())
+                self.__queue.task_done()
+                return
+            self.__run(pending_result, function, args)
+            self.__queue.task_done()
+
+    @staticmethod
+    def __run(pending_result, function, args):
+        """ Run the function and store its result or exception in the pending result. """
+        try:
+            pending_result.set_result(function(*args))
+        except Exception:  # pylint: disable=broad-except
+            pending_result.set_exception(sys.exc_info())
+
+
+def buffered(response):
+    """ Read the response completely and return a response that serves the contents from memory, so that callers
+        don't block on the network while reading. Responses without a read method are returned as is. """
+    if not hasattr(response, 'read'):
+        return response
+    contents = StringIO.StringIO(response.read())
+    if hasattr(response, 'info'):
+        return urllib.addinfourl(contents, response.info(), response.geturl(), response.getcode())
+    return contents
+
+
+def size(response):
+    """ Return the number of bytes of a buffered response, or None if unknown. """
+    contents = getattr(response, 'fp', response)
+    return len(contents.getvalue()) if hasattr(contents, 'getvalue') else None
+
+
+_DEFAULT_FETCHER = Fetcher()
+
+
+def default_fetcher():
+    """ Return the fetcher shared by all url openers. """
+    return _DEFAULT_FETCHER
@@ -0,0 +1,92 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import logging
+import socket
+import threading
+import time
+import urllib2
+
+from .fetcher import default_fetcher
+
+
+class SourceUnavailable(urllib2.URLError):
+    """ Raised when a url is not opened because the metric source couldn't be reached when the run started. """
+    pass
+
+
+class HealthProbe(object):
+    """ Check once, at the start of a run, whether the servers of the metric sources can be reached. Calls to metric
+        sources that can't be reached fail immediately, so an outage costs one timeout instead of one per call. """
+
+    def __init__(self, timeout=10, fetcher=None, clock=time.time):
+        self.__timeout = timeout
+        self.__fetcher = fetcher or default_fetcher()
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__unavailable = dict()
+
+    def probe(self, url_openers):
+        """ Check concurrently whether the urls of the url openers can be reached within the timeout. The url openers
+            give up after the timeout too, so probes of servers that don't answer don't keep fetcher workers busy.
+            Url openers without url aren't checked. Return the url openers that can't be reached. """
+        probes = [(url_opener, url, self.__fetcher.submit(url_opener.is_reachable, url, self.__timeout))
+                  for url_opener, url in self.__urls(url_openers)]
+        deadline = self.__clock() + self.__timeout
+        unavailable = []
+        for url_opener, url, pending_result in probes:
+            try:
+                reachable = pending_result.result(timeout=max(0, deadline - self.__clock()))
+            except socket.timeout:
+                reachable = False
+            if not reachable:
+                logging.warning("Can't reach %s at %s; its metrics will be reported as missing",
+                                url_opener.__class__.__name__, url)
+                with self.__lock:
+                    self.__unavailable[id(url_opener)] = url
+                unavailable.append(url_opener)
+        return unavailable
+
+    def check(self, url_opener):
+        """ Raise an exception if the url opener couldn't be reached. """
+        with self.__lock:
+            url = self.__unavailable.get(id(url_opener))
+        if url:
+            raise SourceUnavailable("{0} couldn't be reached at the start of the run".format(url))
+
+    @staticmethod
+    def __urls(url_openers):
+        """ Return the url openers that have a url, together with their url. """
+        urls = []
+        for url_opener in url_openers:
+            url = url_opener.url() if hasattr(url_opener, 'url') else None
+            if url and isinstance(url, basestring):
+                urls.append((url_opener, url))
+        return urls
+
+
+_DEFAULT_HEALTH_PROBE = [None]
+
+
+def default_health_probe():
+    """ Return the health probe used by all url openers, if any. """
+    return _DEFAULT_HEALTH_PROBE[0]
+
+
+def set_default_health_probe(health_probe):
+    """ Set the health probe used by all url openers. """
+    _DEFAULT_HEALTH_PROBE[0] = health_probe
@@ -0,0 +1,122 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import contextlib
+import logging
+import threading
+import time
+
+
+class TokenBucket(object):
+    """ Token bucket that allows a number of requests per second on average, with bursts of at most one second worth
+        of requests. Requests that exceed the rate reserve a token from the future and wait until it is available,
+        so waiting requests are served in order. """
+
+    def __init__(self, requests_per_second, clock=time.time):
+        self.__rate = float(requests_per_second)
+        self.__capacity = max(1., self.__rate)
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__tokens = self.__capacity
+        self.__last = clock()
+
+    def rate(self):
+        """ Return the number of requests per second. """
+        return self.__rate
+
+    def delay(self):
+        """ Take a token and return the number of seconds to wait before using it. """
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__last) * self.__rate)
+            self.__last = now
+            self.__tokens -= 1
+            return max(0., -self.__tokens / self.__rate)
+
+
+class HostLimiter(object):
+    """ Limit the load on hosts: the number of concurrent requests per host, the number of requests per second per
+        host, and pauses requested by hosts with a Retry-After header. Metric sources of different classes can open
+        urls of the same host, so the most restrictive limits used for a host apply to all requests to the host, from
+        the moment they are first used. Hosts for which no maximum number of connections is used get the default
+        maximum number of connections, if any. """
+
+    def __init__(self, clock=time.time, sleep=time.sleep, default_max_connections=None):
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__default_max_connections = default_max_connections
+        self.__condition = threading.Condition()
+        self.__connections = dict()  # Number of requests in progress per host
+        self.__max_connections = dict()
+        self.__token_buckets = dict()
+        self.__paused_until = dict()
+
+    @contextlib.contextmanager
+    def limit(self, host, max_connections=None, requests_per_second=None):
+        """ Wait until a request to the host is allowed and keep the request counted as in progress while the
+            context is active. Requests wait for the pause and the rate limit of the host before they take one of
+            its connections, so waiting requests don't keep other requests from using the connections. """
+        token_bucket = self.__update_limits(host, max_connections, requests_per_second)
+        self.__wait(host, token_bucket)
+        self.__acquire_connection(host)
+        try:
+            yield
+        finally:
+            self.__release_connection(host)
+
+    def pause(self, host, seconds):
+        """ Don't start requests to the host for the number of seconds. """
+        logging.info('Pausing requests to %s for %.1f seconds', host, seconds)
+        with self.__condition:
+            self.__paused_until[host] = max(self.__paused_until.get(host, 0), self.__clock() + seconds)
+
+    def __wait(self, host, token_bucket):
+        """ Wait until the pause of the host, if any, is over and a token is available. """
+        with self.__condition:
+            pause = self.__paused_until.get(host, 0) - self.__clock()
+        if pause > 0:
+            self.__sleep(pause)
+        delay = token_bucket.delay() if token_bucket else 0
+        if delay > 0:
+            self.__sleep(delay)
+
+    def __update_limits(self, host, max_connections, requests_per_second):
+        """ Tighten the limits of the host if the limits passed are more restrictive and return the token bucket of
+            the host, if any. """
+        with self.__condition:
+            if max_connections and max_connections < self.__max_connections.get(host, float('inf')):
+                self.__max_connections[host] = max_connections
+            token_bucket = self.__token_buckets.get(host)
+            if requests_per_second and (token_bucket is None or requests_per_second < token_bucket.rate()):
+                token_bucket = self.__token_buckets[host] = TokenBucket(requests_per_second, self.__clock)
+            return token_bucket
+
+    def __acquire_connection(self, host):
+        """ Wait until the number of requests in progress to the host is below its maximum number of connections and
+            count the request as in progress. """
+        with self.__condition:
+            max_connections = self.__max_connections.get(host, self.__default_max_connections)
+            while max_connections and self.__connections.get(host, 0) >= max_connections:
+                self.__condition.wait()
+                max_connections = self.__max_connections.get(host, self.__default_max_connections)
+            self.__connections[host] = self.__connections.get(host, 0) + 1
+
+    def __release_connection(self, host):
+        """ Count the request to the host as no longer in progress. """
+        with self.__condition:
+            self.__connections[host] -= 1
+            self.__condition.notify_all()
@@ -96,7 +96,10 @@ class Jenkins(domain.MetricSource, url_opener.UrlOpener):
             """ Return whether the build age of the job is considered to be long ago. """
             return self.__age_of_last_stable_build(job) > datetime.timedelta(days=1)
 
-        return [job for job in self.__active_jobs() if self.__has_builds(job) and failing(job) and old(job)]
+        active_jobs = self.__active_jobs()
+        self.prefetch(self._api, [self.__builds_api_url.format(job=job['name']) for job in active_jobs] +
+                      [self.__build_api_url(self.__last_stable_build_url, job) for job in active_jobs if failing(job)])
+        return [job for job in active_jobs if self.__has_builds(job) and failing(job) and old(job)]
 
     @utils.memoized
     def __unused_jobs(self):
@@ -109,7 +112,9 @@ class Jenkins(domain.MetricSource, url_opener.UrlOpener):
             days = int(match.group(1)) if match else default
             return datetime.timedelta(days=days)
 
-        return [job for job in self.__active_jobs() if self.__age_of_last_completed_build(job) > grace_time(job)]
+        active_jobs = self.__active_jobs()
+        self.prefetch(self._api, [self.__build_api_url(self.__last_completed_build_url, job) for job in active_jobs])
+        return [job for job in active_jobs if self.__age_of_last_completed_build(job) > grace_time(job)]
 
     def __active_jobs(self):
         """ Return all active Jenkins jobs. """
@@ -146,7 +151,7 @@ class Jenkins(domain.MetricSource, url_opener.UrlOpener):
 
     def __age_of_build(self, job, url):
         """ Return the age of the last completed or stable build of the job. """
-        builds_url = url.format(job=job['name']) + self.api_postfix
+        builds_url = self.__build_api_url(url, job)
         try:
             timestamp = self._api(builds_url)['timestamp']
         except (KeyError, urllib2.HTTPError):
@@ -158,6 +163,10 @@ class Jenkins(domain.MetricSource, url_opener.UrlOpener):
             return UnknownAge()
         return datetime.datetime.utcnow() - build_time
 
+    def __build_api_url(self, url, job):
+        """ Return the API url of the last completed or stable build of the job. """
+        return url.format(job=job['name']) + self.api_postfix
+
     def __has_builds(self, job):
         """ Return whether the job has builds or not. """
         return len(self._api(self.__builds_api_url.format(job=job['name']))['builds'])
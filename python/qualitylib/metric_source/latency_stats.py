@@ -0,0 +1,92 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import json
+import logging
+import os
+import re
+import threading
+
+
+class LatencyStats(object):
+    """ Latencies measured during previous runs, kept between runs so that the slowest work can be started first.
+        Latencies are recorded per kind, e.g. per url pattern, as a moving average in seconds.
+        Unknown keys are expected to take no time. """
+
+    weight = 0.3  # Weight of a new measurement in the moving average
+
+    def __init__(self, filename=None):
+        self.__filename = filename
+        self.__lock = threading.Lock()
+        self.__latencies = self.__load()
+
+    def record(self, kind, key, seconds):
+        """ Record the latency of the key. """
+        with self.__lock:
+            latencies = self.__latencies.setdefault(kind, dict())
+            previous = latencies.get(key)
+            latencies[key] = seconds if previous is None else (1 - self.weight) * previous + self.weight * seconds
+
+    def expected(self, kind, key):
+        """ Return the expected latency of the key. """
+        with self.__lock:
+            return self.__latencies.get(kind, dict()).get(key, 0.)
+
+    def slowest_first(self, kind, keys, key=lambda item: item):
+        """ Return the keys sorted by expected latency, slowest first. Keys with the same expected latency keep their
+            order. """
+        return sorted(keys, key=lambda item: -self.expected(kind, key(item)))
+
+    def save(self):
+        """ Write the latencies to the file. """
+        if not self.__filename:
+            return
+        with self.__lock:
+            contents = json.dumps(self.__latencies, indent=1, sort_keys=True)
+        tmp_filename = self.__filename + '.tmp'
+        with open(tmp_filename, 'w') as latency_file:
+            latency_file.write(contents)
+        os.rename(tmp_filename, self.__filename)
+
+    def __load(self):
+        """ Read the latencies from the file. """
+        if self.__filename and os.path.exists(self.__filename):
+            try:
+                with open(self.__filename) as latency_file:
+                    return json.load(latency_file)
+            except (IOError, ValueError) as reason:
+                logging.warning("Couldn't read the latencies %s: %s", self.__filename, reason)
+        return dict()
+
+
+def url_pattern(url):
+    """ Return the pattern of the url, with numbers such as build numbers replaced, so urls that differ only in
+        their numbers share their latency. """
+    return re.sub(r'\d+', '#', url)
+
+
+_DEFAULT_LATENCY_STATS = [None]
+
+
+def default_latency_stats():
+    """ Return the latency stats used by all url openers, if any. """
+    return _DEFAULT_LATENCY_STATS[0]
+
+
+def set_default_latency_stats(latency_stats):
+    """ Set the latency stats used by all url openers. """
+    _DEFAULT_LATENCY_STATS[0] = latency_stats
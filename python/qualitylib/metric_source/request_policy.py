@@ -0,0 +1,179 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import email.utils
+import httplib
+import logging
+import random
+import socket
+import threading
+import time
+import urllib2
+
+from .host_limiter import HostLimiter
+from .run_budget import BudgetExhausted
+
+TOO_MANY_REQUESTS = 429
+
+
+class CircuitOpen(urllib2.URLError):
+    """ Raised when a url is not opened because its host failed too often during the run. """
+    pass
+
+
+class RequestPolicy(object):
+    """ Timeouts, retries, circuit breakers, and load limits for opening urls. GET requests that fail because the
+        host can't be reached or replies with a temporary server error are retried after a jittered, exponentially
+        growing delay, or after the delay the host asks for with a Retry-After header. Hosts that fail a number of
+        times in a row are not asked anything anymore for the rest of the run. The number of concurrent requests and
+        the number of requests per second can be limited per host; the most restrictive limits configured for the
+        metric source classes that open urls of a host apply to all requests to the host. The connect_timeout,
+        read_timeout, retries, failure_threshold, max_connections and requests_per_second can be set per metric
+        source class. """
+
+    defaults = dict(connect_timeout=10, read_timeout=120, retries=2, failure_threshold=5, max_connections=8,
+                    requests_per_second=None)
+    retry_codes = (TOO_MANY_REQUESTS, httplib.BAD_GATEWAY, httplib.SERVICE_UNAVAILABLE, httplib.GATEWAY_TIMEOUT)
+
+    def __init__(self, settings=None, backoff=1., max_backoff=10., max_retry_after=60., sleep=time.sleep,
+                 jitter=random.uniform, clock=time.time):
+        # pylint: disable=too-many-arguments
+        self.__settings = settings or dict()
+        self.__backoff = backoff
+        self.__max_backoff = max_backoff
+        self.__max_retry_after = max_retry_after
+        self.__sleep = sleep
+        self.__jitter = jitter
+        self.__clock = clock
+        self.__host_limiter = HostLimiter(clock, sleep, self.defaults['max_connections'])
+        self.__lock = threading.Lock()
+        self.__failures = dict()  # Number of consecutive failures per host
+        self.__open_circuits = set()  # Hosts that failed too often
+
+    def setting(self, url_opener, name):
+        """ Return the setting of the most specific metric source class of the url opener that has the setting, or
+            the default. """
+        value = self.__configured_setting(url_opener, name)
+        return self.defaults[name] if value is None else value
+
+    def is_open(self, host):
+        """ Return whether the circuit breaker of the host is open. """
+        with self.__lock:
+            return host in self.__open_circuits
+
+    def open(self, url_opener, request, open_request, max_timeout=None):
+        """ Open the request with the open request function, applying the timeouts, retries and circuit breaker that
+            apply to the url opener. If a maximum timeout is passed, the connect and read timeouts are at most that
+            long. """
+        if isinstance(request, basestring):
+            request = urllib2.Request(request)
+        request.connect_timeout = self.setting(url_opener, 'connect_timeout')
+        request.read_timeout = self.setting(url_opener, 'read_timeout')
+        if max_timeout is not None:
+            request.connect_timeout = min(request.connect_timeout, max_timeout)
+            request.read_timeout = min(request.read_timeout, max_timeout)
+        host = request.get_host()
+        retries = self.setting(url_opener, 'retries') if request.get_method() == 'GET' else 0
+        attempt = 0
+        while True:
+            self.__check_circuit(host)
+            retry_after = None
+            try:
+                with self.__host_limiter.limit(host, self.__configured_setting(url_opener, 'max_connections'),
+                                               self.__configured_setting(url_opener, 'requests_per_second')):
+                    response = open_request(request)
+            except (BudgetExhausted, CircuitOpen):
+                raise
+            except urllib2.HTTPError as reason:
+                if reason.code not in self.retry_codes:
+                    self.__record_success(host)  # The host answered, so it is available
+                    raise
+                retry_after = self.__retry_after(reason)
+                # Being asked to slow down doesn't mean the host is failing
+                is_failure = reason.code != TOO_MANY_REQUESTS
+                if (retry_after is not None and retry_after > self.__max_retry_after) or \
+                        not self.__retry(url_opener, host, attempt, retries, is_failure):
+                    raise
+            except (urllib2.URLError, socket.error, httplib.HTTPException):
+                if not self.__retry(url_opener, host, attempt, retries):
+                    raise
+            else:
+                self.__record_success(host)
+                return response
+            if retry_after is None:
+                self.__sleep(self.__jitter(0, min(self.__max_backoff, self.__backoff * 2 ** attempt)))
+            else:
+                self.__host_limiter.pause(host, retry_after)
+            attempt += 1
+            logging.info('Retrying %s (attempt %d of %d)', request.get_full_url(), attempt, retries)
+
+    def __configured_setting(self, url_opener, name):
+        """ Return the setting of the most specific metric source class of the url opener that has the setting, or
+            None if the setting isn't configured for the url opener. """
+        for metric_source_class in url_opener.__class__.__mro__:
+            if name in self.__settings.get(metric_source_class, dict()):
+                return self.__settings[metric_source_class][name]
+        return None
+
+    def __retry(self, url_opener, host, attempt, retries, is_failure=True):
+        """ Count the failure of the host, if it is one, and return whether the request should be tried again. """
+        if is_failure:
+            self.__record_failure(url_opener, host)
+        return attempt < retries and not self.is_open(host)
+
+    def __retry_after(self, http_error):
+        """ Return the number of seconds the host asks to wait with the Retry-After header of the HTTP error, or None
+            if the HTTP error has no valid Retry-After header. The header contains either seconds or a date. """
+        headers = http_error.info()
+        value = headers.getheader('Retry-After', '').strip() if headers else ''
+        if value.isdigit():
+            return float(value)
+        date = email.utils.parsedate_tz(value) if value else None
+        return max(0., email.utils.mktime_tz(date) - self.__clock()) if date else None
+
+    def __check_circuit(self, host):
+        """ Raise an exception if the circuit breaker of the host is open. """
+        if self.is_open(host):
+            raise CircuitOpen('{0} failed too often during this run'.format(host))
+
+    def __record_success(self, host):
+        """ Reset the number of consecutive failures of the host. """
+        with self.__lock:
+            self.__failures[host] = 0
+
+    def __record_failure(self, url_opener, host):
+        """ Count the failure of the host and open its circuit breaker if the host failed too often in a row. """
+        with self.__lock:
+            self.__failures[host] = self.__failures.get(host, 0) + 1
+            if self.__failures[host] >= self.setting(url_opener, 'failure_threshold') and \
+                    host not in self.__open_circuits:
+                logging.warning('Not opening urls of %s for the rest of the run after %d failures in a row', host,
+                                self.__failures[host])
+                self.__open_circuits.add(host)
+
+
+_DEFAULT_REQUEST_POLICY = [None]
+
+
+def default_request_policy():
+    """ Return the request policy used by all url openers, if any. """
+    return _DEFAULT_REQUEST_POLICY[0]
+
+
+def set_default_request_policy(request_policy):
+    """ Set the request policy used by all url openers. """
+    _DEFAULT_REQUEST_POLICY[0] = request_policy
@@ -0,0 +1,236 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import contextlib
+import cPickle
+import hashlib
+import httplib
+import logging
+import os
+import StringIO
+import threading
+import time
+import urllib
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # pylint: disable=invalid-name
+
+
+class ResponseCache(object):
+    """ Cache of responses and parse results that is kept between runs. Responses with an ETag or Last-Modified
+        header are cached so they can be revalidated with a conditional request. Responses with a time to live are
+        cached so they can be used without request until they expire. Parse results are cached by the
+        contents they were parsed from, so unchanged contents don't need to be parsed again. Entries are kept when
+        the cache is saved, also if they weren't used during the run, so a run that doesn't need a url doesn't make
+        the next run retrieve it again. If the cache file is shared by multiple processes, saving merges the entries
+        used by this process with the entries saved by the other processes. If the cached responses are larger than
+        the maximum size (in bytes), the least recently used responses are dropped when the cache is saved, as are
+        parse results that haven't been used for the maximum parse result age (in seconds). During a run, the cache
+        also keeps track of urls that are being prefetched, so the first request for such a url can use the
+        prefetched response. """
+
+    def __init__(self, filename=None, shared=False, max_size=100 * 1024 * 1024,
+                 max_parse_result_age=7 * 24 * 60 * 60, clock=time.time):
+        # pylint: disable=too-many-arguments
+        self.__filename = filename
+        self.__shared = shared
+        self.__max_size = max_size
+        self.__max_parse_result_age = max_parse_result_age
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__responses, self.__parse_results = self.__load()
+        self.__used_responses, self.__used_parse_results = set(), set()
+        self.__prefetched = dict()
+
+    def validators(self, url):
+        """ Return the headers to make the request for the url conditional, if the response to the url is cached. """
+        with self.__lock:
+            response = self.__responses.get(url)
+        headers = dict()
+        if response:
+            if response['etag']:
+                headers['If-None-Match'] = response['etag']
+            if response['last_modified']:
+                headers['If-Modified-Since'] = response['last_modified']
+        return headers
+
+    def not_modified(self, url):
+        """ Return the cached response for the url, because the server replied it hasn't been modified. """
+        with self.__lock:
+            response = self.__responses[url]
+            response['date'] = response['last_used'] = self.__clock()
+            self.__used_responses.add(url)
+        logging.info('Reusing the cached response for %s', url)
+        return self.__cached_response(url, response)
+
+    def fresh(self, url, ttl):
+        """ Return the cached response for the url if it was retrieved or revalidated less than ttl seconds ago,
+            otherwise None. """
+        now = self.__clock()
+        with self.__lock:
+            response = self.__responses.get(url)
+            if not response or now - response.get('date', 0) >= ttl:
+                return None
+            response['last_used'] = now
+            self.__used_responses.add(url)
+        logging.info('Using the cached response for %s without revalidating it', url)
+        return self.__cached_response(url, response)
+
+    def cached(self, url):
+        """ Return the cached response for the url without revalidating it, or None if the url isn't cached. """
+        with self.__lock:
+            response = self.__responses.get(url)
+        return self.__cached_response(url, response) if response else None
+
+    def store(self, url, response, ttl=0):
+        """ Read the response and cache it if it can be revalidated or has a time to live. Return a response with the
+            contents read. Responses without headers are returned as is. """
+        if not hasattr(response, 'info'):
+            return response
+        contents = response.read()
+        headers = response.info()
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if etag or last_modified or ttl:
+            now = self.__clock()
+            with self.__lock:
+                self.__responses[url] = dict(etag=etag, last_modified=last_modified, headers=str(headers),
+                                             contents=contents, date=now, last_used=now)
+                self.__used_responses.add(url)
+        return urllib.addinfourl(StringIO.StringIO(contents), headers, response.geturl(), response.getcode())
+
+    def add_prefetched(self, url, pending_response):
+        """ Remember the pending response of a url that is being prefetched. """
+        with self.__lock:
+            self.__prefetched[url] = pending_response
+
+    def prefetched(self, url):
+        """ Return the pending response of the url if it was prefetched and not used yet, otherwise None. A
+            prefetched response can only be used once, because reading a response consumes it. """
+        with self.__lock:
+            return self.__prefetched.pop(url, None)
+
+    def parse(self, key, contents, parse_contents):
+        """ Return the result of parsing the contents. If the contents were parsed with the same key before, the
+            cached result is returned without calling the parse function. """
+        cache_key = (key, hashlib.sha1(contents.encode('utf-8') if isinstance(contents, unicode) else
+                                       contents).hexdigest())
+        now = self.__clock()
+        with self.__lock:
+            self.__used_parse_results.add(cache_key)
+            if cache_key in self.__parse_results:
+                parse_result = self.__parse_results[cache_key]
+                parse_result['last_used'] = now
+                return parse_result['result']
+        result = parse_contents()
+        with self.__lock:
+            self.__parse_results[cache_key] = dict(result=result, last_used=now)
+        return result
+
+    def save(self):
+        """ Write the responses and parse results to the file. If the cache file is shared, only the responses and
+            parse results used during this run are written, so entries saved by other processes are kept. """
+        if not self.__filename:
+            return
+        with self.__lock:
+            if self.__shared:
+                responses = dict((url, self.__responses[url]) for url in self.__used_responses)
+                parse_results = dict((key, self.__parse_results[key]) for key in self.__used_parse_results
+                                     if key in self.__parse_results)
+            else:
+                responses, parse_results = self.__responses.copy(), self.__parse_results.copy()
+        with self.__file_lock():
+            if self.__shared:
+                saved_responses, saved_parse_results = self.__load()
+                saved_responses.update(responses)
+                saved_parse_results.update(parse_results)
+                responses, parse_results = saved_responses, saved_parse_results
+            self.__drop_least_recently_used(responses)
+            self.__drop_unused_parse_results(parse_results)
+            tmp_filename = '{0}.{1}.tmp'.format(self.__filename, os.getpid())
+            with open(tmp_filename, 'wb') as cache_file:
+                cPickle.dump((responses, parse_results), cache_file, cPickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_filename, self.__filename)
+
+    def __drop_least_recently_used(self, responses):
+        """ Remove the least recently used responses until the total size of the responses is within bounds. """
+        total_size = sum(len(response['contents']) for response in responses.values())
+        for url in sorted(responses, key=lambda url: responses[url].get('last_used', 0)):
+            if total_size <= self.__max_size:
+                break
+            total_size -= len(responses.pop(url)['contents'])
+
+    def __drop_unused_parse_results(self, parse_results):
+        """ Remove the parse results that haven't been used for longer than the maximum parse result age. """
+        oldest_last_used = self.__clock() - self.__max_parse_result_age
+        for key in [key for key, parse_result in parse_results.items() if parse_result['last_used'] < oldest_last_used]:
+            del parse_results[key]
+
+    @staticmethod
+    def __cached_response(url, response):
+        """ Return a response with the cached contents and headers. """
+        return urllib.addinfourl(StringIO.StringIO(response['contents']),
+                                 httplib.HTTPMessage(StringIO.StringIO(response['headers'])), url, httplib.OK)
+
+    @contextlib.contextmanager
+    def __file_lock(self):
+        """ Lock the cache file against other processes while saving, if the cache file is shared. """
+        if not (self.__shared and fcntl):
+            yield
+            return
+        with open(self.__filename + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __load(self):
+        """ Read the responses and parse results from the file. """
+        if self.__filename and os.path.exists(self.__filename):
+            try:
+                with open(self.__filename, 'rb') as cache_file:
+                    return cPickle.load(cache_file)
+            except (IOError, EOFError, ValueError, cPickle.UnpicklingError) as reason:
+                logging.warning("Couldn't read the response cache %s: %s", self.__filename, reason)
+        return dict(), dict()
+
+
+_DEFAULT_RESPONSE_CACHE = [None]
+
+
+def default_response_cache():
+    """ Return the response cache used by all url openers, if any. """
+    return _DEFAULT_RESPONSE_CACHE[0]
+
+
+def set_default_response_cache(response_cache):
+    """ Set the response cache used by all url openers. """
+    _DEFAULT_RESPONSE_CACHE[0] = response_cache
+
+
+def read(response):
+    """ Return the contents of the response. Responses that are strings already are returned as is. """
+    return response.read() if hasattr(response, 'read') else response
+
+
+def parse(key, contents, parse_contents):
+    """ Return the result of parsing the contents, reusing the result of a previous run if the contents didn't
+        change. Without response cache, the contents are simply parsed. """
+    response_cache = default_response_cache()
+    return response_cache.parse(key, contents, parse_contents) if response_cache else parse_contents()
@@ -0,0 +1,69 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import time
+import urllib2
+
+
+class BudgetExhausted(urllib2.URLError):
+    """ Raised when a url is not opened because the time budget for opening it has run out. """
+    pass
+
+
+class RunBudget(object):
+    """ Time budgets of a report run: a deadline for the run as a whole and, optionally, a budget per metric source
+        class. Both are in seconds and start when the run budget is created. """
+
+    def __init__(self, deadline=None, budgets=None, clock=time.time):
+        self.__deadline = deadline
+        self.__budgets = budgets or dict()
+        self.__clock = clock
+        self.__start = clock()
+
+    def remaining(self, url_opener):
+        """ Return the number of seconds left for opening urls with the url opener, or None if there's no limit. """
+        return self.__remaining(url_opener.__class__)
+
+    def exceeded(self, metric_source_class):
+        """ Return whether the time for opening urls with metric sources of the class has run out. """
+        return self.__remaining(metric_source_class) == 0
+
+    def __remaining(self, metric_source_class):
+        """ Return the number of seconds left for metric sources of the class, or None if there's no limit. """
+        budgets = [budget for budget_class, budget in self.__budgets.items()
+                   if issubclass(metric_source_class, budget_class)]
+        if self.__deadline is not None:
+            budgets.append(self.__deadline)
+        return max(0, min(budgets) - (self.__clock() - self.__start)) if budgets else None
+
+    def check(self, url_opener):
+        """ Raise an exception if the time left for opening urls with the url opener has run out. """
+        if self.remaining(url_opener) == 0:
+            raise BudgetExhausted('the time budget of {0} has run out'.format(url_opener.__class__.__name__))
+
+
+_DEFAULT_RUN_BUDGET = [None]
+
+
+def default_run_budget():
+    """ Return the run budget used by all url openers, if any. """
+    return _DEFAULT_RUN_BUDGET[0]
+
+
+def set_default_run_budget(run_budget):
+    """ Set the run budget used by all url openers. """
+    _DEFAULT_RUN_BUDGET[0] = run_budget
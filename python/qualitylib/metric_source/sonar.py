@@ -26,6 +26,17 @@ class Sonar(domain.MetricSource, url_opener.UrlOpener):
     """ Class representing the Sonar instance. """
 
     metric_source_name = 'SonarQube'
+    # Sonar metric keys needed by the methods that can be retrieved in bulk:
+    metric_keys = dict(ncloc=('ncloc',), lines=('lines',), major_violations=('major_violations',),
+                       critical_violations=('critical_violations',), blocker_violations=('blocker_violations',),
+                       duplicated_lines=('duplicated_lines',), unittest_line_coverage=('line_coverage',),
+                       unittest_branch_coverage=('branch_coverage',), unittests=('tests',),
+                       failing_unittests=('test_failures', 'test_errors'),
+                       integration_test_line_coverage=('it_line_coverage',),
+                       integration_test_branch_coverage=('it_branch_coverage',),
+                       overall_test_line_coverage=('overall_line_coverage',),
+                       overall_test_branch_coverage=('overall_branch_coverage',),
+                       package_cycles=('package_cycles',), methods=('functions',))
 
     def __init__(self, sonar_url, *args, **kwargs):
         super(Sonar, self).__init__(url=sonar_url, *args, **kwargs)
@@ -43,6 +54,12 @@ class Sonar(domain.MetricSource, url_opener.UrlOpener):
         self.__version_number_url = sonar_url + 'api/server/index'  # Deprecated API
         self.__plugin_api_url = sonar_url + 'api/updatecenter/installed_plugins'  # Deprecated API
         self.__quality_profiles_api_url = sonar_url + 'api/profiles/list?language={language}'  # Deprecated API
+        self.__measures = dict()  # Measures retrieved in bulk, keyed by product and metric key
+
+    def refresh(self):
+        """ Override to also forget the measures retrieved in bulk. """
+        super(Sonar, self).refresh()
+        self.__measures = dict()
 
     @utils.memoized
     def version(self, product):
@@ -262,6 +279,32 @@ class Sonar(domain.MetricSource, url_opener.UrlOpener):
         datetime_string = datetime_string.split('+')[0]  # Ignore timezone
         return datetime.datetime.strptime(datetime_string, '%Y-%m-%dT%H:%M:%S')
 
+    # Bulk retrieval
+
+    def fulfil(self, calls):
+        """ Retrieve the measures needed for the calls with one request per product. Calls that don't need measures,
+            such as the violation counts, are made one by one. """
+        metric_keys_per_product = dict()
+        other_calls = []
+        for method_name, product in calls:
+            if method_name in self.metric_keys:
+                metric_keys_per_product.setdefault(product, set()).update(self.metric_keys[method_name])
+            else:
+                other_calls.append((method_name, product))
+        for product, metric_keys in metric_keys_per_product.items():
+            if self.has_project(product):
+                self.__retrieve_measures(product, sorted(metric_keys))
+        super(Sonar, self).fulfil(other_calls)
+
+    def __retrieve_measures(self, product, metric_keys):
+        """ Retrieve the measures of the metric keys for the product with one request. """
+        url = self.__measures_api_url.format(component=product, metric=','.join(metric_keys))
+        try:
+            for measure in self.__get_json(url)['component']['measures']:
+                self.__measures[(product, measure['metric'])] = float(measure['value'])
+        except self.url_open_exceptions + (TypeError, KeyError):
+            pass  # The measures will be retrieved one by one when needed
+
     # Helper methods
 
     @utils.memoized
@@ -270,6 +313,10 @@ class Sonar(domain.MetricSource, url_opener.UrlOpener):
         if not self.has_project(product):
             return -1
 
+        # Use the measure if it was retrieved in bulk:
+        if (product, metric_name) in self.__measures:
+            return self.__measures[(product, metric_name)]
+
         # First try API starting with SonarQube 5.4:
         try:
             json = self.__get_json(self.__measures_api_url.format(component=product, metric=metric_name))
@@ -0,0 +1,211 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import datetime
+import gzip
+import hashlib
+import httplib
+import json
+import os
+import re
+import StringIO
+import subprocess
+import threading
+import time
+import urllib
+import urllib2
+
+
+class SourceSnapshot(object):
+    """ Raw responses of the metric sources, stored in a snapshot folder so that a report can be created from them
+        later without opening urls or running shell commands. Each run has an index in the runs subfolder that maps
+        the urls and shell commands to their responses and outputs, and to how long they took. The contents of the
+        responses are stored compressed and content addressed in the objects subfolder: each distinct content is
+        stored once, in a file named after its SHA-1 hash, so runs share unchanged responses. When replaying with
+        latency, each response is delayed by the time it took when it was recorded. """
+
+    def __init__(self, folder, replay=False, latency=False, sleep=time.sleep):
+        self.__folder = folder
+        self.__replay = replay
+        self.__latency = latency
+        self.__sleep = sleep
+        self.__lock = threading.Lock()
+        self.__run_id = self.__latest_run_id() if replay else time.strftime('%Y%m%d-%H%M%S')
+        self.__index = self.__load() if replay else dict()
+
+    def replaying(self):
+        """ Return whether responses are read from the snapshot instead of recorded in it. """
+        return self.__replay
+
+    def run_id(self):
+        """ Return the id of the run that is recorded or replayed. """
+        return self.__run_id
+
+    def run_date(self):
+        """ Return the date and time the run that is recorded or replayed was started. """
+        return datetime.datetime.strptime(self.__run_id, '%Y%m%d-%H%M%S')
+
+    def record(self, url, response, seconds=None):
+        """ Store the response of the url and how many seconds opening the url took. Return a response with the same
+            contents, since reading the response consumes it. """
+        contents = response.read() if hasattr(response, 'read') else response
+        sha1 = self.__store_object(contents)
+        entry = dict(sha1=sha1, seconds=seconds)
+        if hasattr(response, 'info'):
+            entry.update(headers=str(response.info()), final_url=response.geturl(), code=response.getcode())
+        with self.__lock:
+            self.__index[self.__key(url)] = entry
+        return self.__response(entry, contents)
+
+    def record_error(self, url, reason, seconds=None):
+        """ Store the exception raised when opening the url, so replaying the url raises it as well. """
+        if isinstance(reason, urllib2.HTTPError):
+            entry = dict(error=str(reason.msg), code=reason.code, seconds=seconds)
+        else:
+            entry = dict(error=str(getattr(reason, 'reason', reason)), code=None, seconds=seconds)
+        with self.__lock:
+            self.__index[self.__key(url)] = entry
+
+    def response(self, url):
+        """ Return the stored response of the url, or raise the stored exception. """
+        key = self.__key(url)
+        with self.__lock:
+            entry = self.__index.get(key)
+        if entry is None:
+            raise urllib2.URLError('{0} is not in run {1} of the snapshot'.format(key, self.__run_id))
+        self.__wait(entry)
+        if 'error' in entry:
+            if entry['code']:
+                raise urllib2.HTTPError(key, entry['code'], entry['error'], None, None)
+            raise urllib2.URLError(entry['error'])
+        with gzip.open(self.__object_filename(entry['sha1']), 'rb') as object_file:
+            return self.__response(entry, object_file.read())
+
+    def record_command(self, command, folder, output, seconds=None):
+        """ Store the output of the shell command run in the folder and how many seconds running it took. Return the
+            output. """
+        entry = dict(sha1=self.__store_object(output), seconds=seconds)
+        with self.__lock:
+            self.__index[self.__command_key(command, folder)] = entry
+        return output
+
+    def record_command_error(self, command, folder, reason, seconds=None):
+        """ Store the failure of the shell command run in the folder, so replaying the command fails as well. """
+        entry = dict(error=reason.output or '', returncode=reason.returncode, seconds=seconds)
+        with self.__lock:
+            self.__index[self.__command_key(command, folder)] = entry
+
+    def command_output(self, command, folder):
+        """ Return the stored output of the shell command run in the folder, or raise the stored failure. """
+        key = self.__command_key(command, folder)
+        with self.__lock:
+            entry = self.__index.get(key)
+        if entry is None:
+            raise subprocess.CalledProcessError(-1, command, '{0} is not in run {1} of the snapshot'.format(
+                key, self.__run_id))
+        self.__wait(entry)
+        if 'error' in entry:
+            raise subprocess.CalledProcessError(entry['returncode'], command, entry['error'])
+        with gzip.open(self.__object_filename(entry['sha1']), 'rb') as object_file:
+            return object_file.read()
+
+    def save(self):
+        """ Write the index of the run. Return the number of urls in the index. """
+        runs_folder = os.path.join(self.__folder, 'runs')
+        if not os.path.exists(runs_folder):
+            os.makedirs(runs_folder)
+        with self.__lock:
+            contents = json.dumps(self.__index, indent=1, sort_keys=True)
+            nr_urls = len(self.__index)
+        with open(os.path.join(runs_folder, self.__run_id + '.json'), 'w') as index_file:
+            index_file.write(contents)
+        return nr_urls
+
+    @staticmethod
+    def __key(url):
+        """ Return the key of the url in the index. """
+        return url.get_full_url() if isinstance(url, urllib2.Request) else url
+
+    @staticmethod
+    def __command_key(command, folder):
+        """ Return the key of the shell command run in the folder in the index. The folder is relative to the
+            working directory, so a run can be replayed from another working directory. Credentials in urls are
+            masked, so they aren't stored in the index. """
+        command_line = re.sub(r'://[^/@\s]+@', '://***@', ' '.join(command))
+        return '{0}$ {1}'.format(os.path.relpath(folder) if folder else '', command_line)
+
+    def __wait(self, entry):
+        """ Wait as long as the response or output of the entry took when it was recorded, if replaying with
+            latency. """
+        if self.__latency and entry.get('seconds'):
+            self.__sleep(entry['seconds'])
+
+    @staticmethod
+    def __response(entry, contents):
+        """ Return a response with the contents and the headers of the entry, if any. """
+        if 'headers' not in entry:
+            return StringIO.StringIO(contents)
+        return urllib.addinfourl(StringIO.StringIO(contents), httplib.HTTPMessage(StringIO.StringIO(entry['headers'])),
+                                 entry['final_url'], entry['code'])
+
+    def __store_object(self, contents):
+        """ Store the contents compressed, unless they were stored before, and return their hash. """
+        sha1 = hashlib.sha1(contents.encode('utf-8') if isinstance(contents, unicode) else contents).hexdigest()
+        filename = self.__object_filename(sha1)
+        if not os.path.exists(filename):
+            folder = os.path.dirname(filename)
+            try:
+                os.makedirs(folder)
+            except OSError:
+                if not os.path.isdir(folder):
+                    raise
+            tmp_filename = '{0}.{1}.tmp'.format(filename, threading.current_thread().ident)
+            with gzip.open(tmp_filename, 'wb') as object_file:
+                object_file.write(contents.encode('utf-8') if isinstance(contents, unicode) else contents)
+            os.rename(tmp_filename, filename)
+        return sha1
+
+    def __object_filename(self, sha1):
+        """ Return the filename of the object with the hash. """
+        return os.path.join(self.__folder, 'objects', sha1[:2], sha1 + '.gz')
+
+    def __latest_run_id(self):
+        """ Return the id of the most recent run in the snapshot folder. """
+        runs_folder = os.path.join(self.__folder, 'runs')
+        run_ids = sorted(filename[:-len('.json')] for filename in os.listdir(runs_folder)
+                         if filename.endswith('.json')) if os.path.isdir(runs_folder) else []
+        if not run_ids:
+            raise ValueError('There are no runs in the snapshot folder {0}'.format(self.__folder))
+        return run_ids[-1]
+
+    def __load(self):
+        """ Read the index of the run. """
+        with open(os.path.join(self.__folder, 'runs', self.__run_id + '.json')) as index_file:
+            return json.load(index_file)
+
+
+_DEFAULT_SOURCE_SNAPSHOT = [None]
+
+
+def default_source_snapshot():
+    """ Return the source snapshot used by all url openers, if any. """
+    return _DEFAULT_SOURCE_SNAPSHOT[0]
+
+
+def set_default_source_snapshot(source_snapshot):
+    """ Set the source snapshot used by all url openers. """
+    _DEFAULT_SOURCE_SNAPSHOT[0] = source_snapshot
@@ -18,10 +18,12 @@ from __future__ import absolute_import
 import datetime
 import logging
 import time
-import urllib2
 
 from .. import utils, domain
 from ..metric_source import url_opener
+from ..metric_source.connection_pool import url_open
+from ..metric_source.fetch_plan import default_fetch_plan
+from ..metric_source.source_snapshot import default_source_snapshot
 
 
 class TrelloObject(domain.MetricSource):
@@ -29,7 +31,7 @@ class TrelloObject(domain.MetricSource):
 
     url_template = 'https://api.trello.com/1/{object_type}/{object_id}{argument}?key={appkey}&token={token}{parameters}'
 
-    def __init__(self, object_id, appkey, token, urlopen=urllib2.urlopen):
+    def __init__(self, object_id, appkey, token, urlopen=url_open):
         self._appkey = appkey
         self._token = token
         self.__urlopen = urlopen
@@ -50,12 +52,32 @@ class TrelloObject(domain.MetricSource):
         parameters.update(dict(argument=argument, parameters=extra_parameters))
         url = self.url_template.format(**parameters)
         try:
-            json_string = self.__urlopen(url).read()
+            json_string = self.__open(url).read()
         except url_opener.UrlOpener.url_open_exceptions as reason:
             logging.warn("Couldn't open %s: %s", url, reason)
             raise
         return utils.eval_json(json_string)
 
+    def __open(self, url):
+        """ Open the url. While planning, the url is recorded instead of opened. If a source snapshot is being
+            replayed, the response is read from the snapshot; if a source snapshot is being recorded, the response
+            is stored in it. """
+        fetch_plan = default_fetch_plan()
+        if fetch_plan:
+            return fetch_plan.response(self, url)
+        source_snapshot = default_source_snapshot()
+        if source_snapshot is None:
+            return self.__urlopen(url)
+        if source_snapshot.replaying():
+            return source_snapshot.response(url)
+        start = time.time()
+        try:
+            response = self.__urlopen(url)
+        except url_opener.UrlOpener.url_open_exceptions as reason:
+            source_snapshot.record_error(url, reason, time.time() - start)
+            raise
+        return source_snapshot.record(url, response, time.time() - start)
+
     def name(self):
         """ Return the name of this Trello object. """
         return self._json()['name']
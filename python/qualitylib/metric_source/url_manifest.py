@@ -0,0 +1,101 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import json
+import logging
+import os
+import re
+import threading
+
+
+class UrlManifest(object):
+    """ Manifest of the urls opened during a run, with the class of the url opener and the size of the response. At
+        the start of the next run, the urls of the previous run can be prefetched concurrently, before the metrics
+        ask for them one at a time. Urls that contain credentials, in their user info or in query parameters such
+        as the key and token of Trello, aren't recorded, so the manifest doesn't reveal them. """
+
+    credentials = re.compile(r'://[^/@\s]+@|[?&](key|token|access_token|api_?key|password|secret)=', re.IGNORECASE)
+
+    def __init__(self, filename=None):
+        self.__filename = filename
+        self.__lock = threading.Lock()
+        self.__previous_urls = self.__load()
+        self.__urls = dict()
+
+    def record(self, url_opener, url, size):
+        """ Record that the url opener opened the url and that the response had the size (in bytes). """
+        if self.credentials.search(url):
+            return
+        with self.__lock:
+            self.__urls[url] = dict(url_opener=url_opener.__class__.__name__, size=size)
+
+    def warm_up(self, url_openers):
+        """ Let the url openers start opening the urls of the previous run. Each url is opened by a url opener of the
+            class that opened it before; if there are multiple, by the one whose url the url starts with. Return the
+            number of urls being prefetched. """
+        urls_per_opener = dict()
+        for url, entry in self.__previous_urls.items():
+            url_opener = self.__url_opener(url_openers, entry['url_opener'], url)
+            if url_opener:
+                urls_per_opener.setdefault(url_opener, []).append(url)
+        for url_opener, urls in urls_per_opener.items():
+            url_opener.warm_up(sorted(urls))
+        return sum(len(urls) for urls in urls_per_opener.values())
+
+    def save(self):
+        """ Write the urls opened during this run to the file. """
+        if not self.__filename:
+            return
+        with self.__lock:
+            contents = json.dumps(self.__urls, indent=1, sort_keys=True)
+        tmp_filename = self.__filename + '.tmp'
+        with open(tmp_filename, 'w') as manifest_file:
+            manifest_file.write(contents)
+        os.rename(tmp_filename, self.__filename)
+
+    @staticmethod
+    def __url_opener(url_openers, class_name, url):
+        """ Return the url opener of the class that should open the url, if any. """
+        candidates = [url_opener for url_opener in url_openers if url_opener.__class__.__name__ == class_name]
+        for candidate in candidates:
+            candidate_url = candidate.url() if hasattr(candidate, 'url') else None
+            if candidate_url and url.startswith(candidate_url):
+                return candidate
+        return candidates[0] if candidates else None
+
+    def __load(self):
+        """ Read the urls of the previous run from the file. """
+        if self.__filename and os.path.exists(self.__filename):
+            try:
+                with open(self.__filename) as manifest_file:
+                    return json.load(manifest_file)
+            except (IOError, ValueError) as reason:
+                logging.warning("Couldn't read the url manifest %s: %s", self.__filename, reason)
+        return dict()
+
+
+_DEFAULT_URL_MANIFEST = [None]
+
+
+def default_url_manifest():
+    """ Return the url manifest used by all url openers, if any. """
+    return _DEFAULT_URL_MANIFEST[0]
+
+
+def set_default_url_manifest(url_manifest):
+    """ Set the url manifest used by all url openers. """
+    _DEFAULT_URL_MANIFEST[0] = url_manifest
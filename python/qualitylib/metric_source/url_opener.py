@@ -18,20 +18,38 @@ from __future__ import absolute_import
 import base64
 import logging
 import socket
+import time
 import urllib2
 import httplib
 
+from . import connection_pool
+from .cache_policy import default_cache_policy
+from .fetch_plan import default_fetch_plan
+from .fetcher import buffered, default_fetcher, size
+from .health_probe import default_health_probe
+from .latency_stats import default_latency_stats, url_pattern
+from .request_policy import default_request_policy
+from .response_cache import default_response_cache
+from .run_budget import default_run_budget
+from .source_snapshot import default_source_snapshot
+from .url_manifest import default_url_manifest
+
 
 class UrlOpener(object):
-    """ Class for opening urls with or without authentication. """
+    """ Class for opening urls with or without authentication. Connections are kept open and reused for
+        subsequent requests to the same host. """
 
     url_open_exceptions = (urllib2.HTTPError, urllib2.URLError, socket.error, httplib.BadStatusLine)
 
     def __init__(self, uri=None, username=None, password=None,
-                 build_opener=urllib2.build_opener, url_open=urllib2.urlopen):
+                 build_opener=connection_pool.build_opener, url_open=connection_pool.url_open, fetcher=None,
+                 response_cache=None):
+        # pylint: disable=too-many-arguments
         self.__username = username
         self.__password = password
         self.__opener = self.__create_url_opener(uri, build_opener, url_open)
+        self.__fetcher = fetcher or default_fetcher()
+        self.__response_cache = response_cache
 
     def username(self):
         """ Return the username, if any. """
@@ -62,12 +80,153 @@ class UrlOpener(object):
             return url_open
 
     def url_open(self, url):
-        """ Return an opened url, using the opener created earlier. """
+        """ Return an opened url, using the opener created earlier. The url is opened and read by the fetcher
+            shared by all url openers, unless it is being prefetched already. This method waits for the response,
+            but not longer than the run budget allows. If the server couldn't be reached at the start of the run,
+            fail immediately. While planning, the url is recorded instead of opened. """
+        fetch_plan = default_fetch_plan()
+        if fetch_plan:
+            return fetch_plan.response(self, url)
+        self.__check_health()
+        run_budget = default_run_budget()
         try:
-            return self.__opener(url)
+            if run_budget:
+                run_budget.check(self)
+            pending_response = self.__prefetched(url) or \
+                self.__fetcher.submit(self.__open_buffered, url, expected_latency=self.__expected_latency(url))
+            response = pending_response.result(timeout=run_budget.remaining(self) if run_budget else None)
         except self.url_open_exceptions as reason:
             logging.warning("Couldn't open %s: %s", url, reason)
             raise  # Let caller decide whether to ignore the exception
+        url_manifest = default_url_manifest()
+        if url_manifest and isinstance(url, basestring):
+            url_manifest.record(self, url, size(response))
+        return response
+
+    def prefetch(self, memoized_method, urls):
+        """ Call the memoized method for each of the urls without waiting for the results. Subsequent calls of the
+            memoized method get the results from its cache or wait for the call in progress. The urls that took
+            longest to open in previous runs are submitted first and served first by the fetcher. """
+        for url in self.__slowest_first(urls):
+            self.__fetcher.submit(memoized_method, url, expected_latency=self.__expected_latency(url))
+
+    def is_reachable(self, url, timeout=None):
+        """ Return whether the server of the url answers a HEAD request, even if it answers with an HTTP error. The
+            request gets the timeouts and circuit breaker of the request policy, if any, but doesn't wait longer than
+            the timeout (in seconds) to connect and to read the response. """
+        request = urllib2.Request(url)
+        request.get_method = lambda: 'HEAD'  # pragma: no branch
+        request_policy = default_request_policy()
+        try:
+            if request_policy:
+                response = request_policy.open(self, request, self.__opener, max_timeout=timeout)
+            else:
+                if timeout is not None:
+                    request.connect_timeout = request.read_timeout = timeout
+                response = self.__opener(request)
+        except urllib2.HTTPError:
+            return True
+        except self.url_open_exceptions:
+            return False
+        if hasattr(response, 'close'):
+            response.close()
+        return True
+
+    def warm_up(self, urls):
+        """ Start opening the urls without waiting for the responses, so that the first request for each url can
+            use the prefetched response. This needs a response cache to keep track of the prefetched urls. """
+        response_cache = self.__response_cache or default_response_cache()
+        if response_cache is None:
+            return
+        for url in self.__slowest_first(urls):
+            response_cache.add_prefetched(url, self.__fetcher.submit(self.__open_buffered, url,
+                                                                     expected_latency=self.__expected_latency(url)))
+
+    @staticmethod
+    def __slowest_first(urls):
+        """ Return the urls ordered so that the urls that took longest to open in previous runs come first. """
+        latency_stats = default_latency_stats()
+        return latency_stats.slowest_first('urls', urls, key=url_pattern) if latency_stats else urls
+
+    @staticmethod
+    def __expected_latency(url):
+        """ Return how long opening the url took in previous runs, so the fetcher can open the slowest urls first. """
+        latency_stats = default_latency_stats()
+        if latency_stats is None or not isinstance(url, basestring):
+            return 0.
+        return latency_stats.expected('urls', url_pattern(url))
+
+    def __check_health(self):
+        """ Raise an exception if the server of the url opener couldn't be reached at the start of the run. """
+        health_probe = default_health_probe()
+        if health_probe:
+            health_probe.check(self)
+
+    def __prefetched(self, url):
+        """ Return the pending response of the url if it is being prefetched, otherwise None. """
+        response_cache = self.__response_cache or default_response_cache()
+        return response_cache.prefetched(url) if response_cache and isinstance(url, basestring) else None
+
+    def __open_buffered(self, url):
+        """ Open the url and read the response. If a source snapshot is being replayed, the response is read from
+            the snapshot instead; if a source snapshot is being recorded, the response is stored in it, together with
+            how long it took. """
+        source_snapshot = default_source_snapshot()
+        if source_snapshot is None:
+            return self.__open_timed(url)
+        if source_snapshot.replaying():
+            return source_snapshot.response(url)
+        start = time.time()
+        try:
+            response = self.__open_timed(url)
+        except self.url_open_exceptions as reason:
+            source_snapshot.record_error(url, reason, time.time() - start)
+            raise
+        return source_snapshot.record(url, response, time.time() - start)
+
+    def __open_timed(self, url):
+        """ Open the url, read the response and record how long that took. """
+        latency_stats = default_latency_stats()
+        if latency_stats is None or not isinstance(url, basestring):
+            return self.__open_conditional(url)
+        start = time.time()
+        response = self.__open_conditional(url)
+        latency_stats.record('urls', url_pattern(url), time.time() - start)
+        return response
+
+    def __open_conditional(self, url):
+        """ Open the url and read the response. If the response to the url is cached and hasn't expired, return the
+            cached response without opening the url. If the cached response has expired, make the request
+            conditional and return the cached response when the server replies that it hasn't been modified. """
+        response_cache = self.__response_cache or default_response_cache()
+        cache_policy = default_cache_policy()
+        ttl = cache_policy.ttl(self, url) if cache_policy and isinstance(url, basestring) else 0
+        fresh_response = response_cache.fresh(url, ttl) if response_cache and ttl else None
+        if fresh_response:
+            return fresh_response
+        self.__check_health()  # Urls that are prefetched skip url_open, so check the health here as well
+        if response_cache is None or not isinstance(url, basestring):
+            return buffered(self.__open_with_policy(url))
+        try:
+            response = self.__open_with_policy(urllib2.Request(url, headers=response_cache.validators(url)))
+        except urllib2.HTTPError as reason:
+            if reason.code == httplib.NOT_MODIFIED:
+                return response_cache.not_modified(url)
+            raise
+        return buffered(response_cache.store(url, response, ttl))
+
+    def __open_with_policy(self, url):
+        """ Open the url, applying the timeouts, retries and circuit breakers of the request policy, if any. """
+        request_policy = default_request_policy()
+        return request_policy.open(self, url, self.__open_within_budget) if request_policy else \
+            self.__open_within_budget(url)
+
+    def __open_within_budget(self, url):
+        """ Open the url, unless the run budget has run out. """
+        run_budget = default_run_budget()
+        if run_budget:
+            run_budget.check(self)  # Don't start opening the url if the budget ran out while it was queued or retried
+        return self.__opener(url)
 
     def url_delete(self, url):
         """ Delete the given url. """
@@ -19,13 +19,15 @@ import datetime
 import logging
 import os
 import re
+import threading
 
 from ..abstract.version_control_system import VersionControlSystem
 from ... import utils
 
 
 class Git(VersionControlSystem):
-    """ Class representing a Git repository. """
+    """ Class representing a Git repository. The repository is cloned or pulled when it's first needed, or earlier
+        if the repository is synced explicitly. """
 
     metric_source_name = 'Git'
 
@@ -33,8 +35,23 @@ class Git(VersionControlSystem):
         self.__branch_to_checkout = kwargs.pop('branch', None)
         self.__chdir = kwargs.pop('chdir', os.chdir)
         super(Git, self).__init__(*args, **kwargs)
-        self.__repo_folder = None
-        self.__get_repo()
+        self.__repo_folder = self.__determine_repo_folder_name()
+        self.__sync_lock = threading.Lock()
+        self.__synced = False
+
+    def refresh(self):
+        """ Override to pull the repository again when it's next needed. """
+        super(Git, self).refresh()
+        with self.__sync_lock:
+            self.__synced = False
+
+    def sync(self):
+        """ Clone or pull the repository, unless that has been done since the last refresh. Threads that need the
+            repository while it's being synced wait until the sync is done. """
+        with self.__sync_lock:
+            if not self.__synced:
+                self.__get_repo()
+                self.__synced = True
 
     def check_out(self, path, folder):
         """ Check out the path into the folder. """
@@ -43,6 +60,7 @@ class Git(VersionControlSystem):
     @utils.memoized
     def last_changed_date(self, path):
         """ Return the date when the url was last changed in Git. """
+        self.sync()
         timestamp = self._run_shell_command(['git', 'log', '--format="%ct"', '-n', '1', path],
                                             folder=self.__repo_folder)
         if timestamp:
@@ -60,6 +78,7 @@ class Git(VersionControlSystem):
             """ Return whether name is a valid tag name. """
             return bool(name)
 
+        self.sync()
         tags = self._run_shell_command(['git', 'tag'], folder=self.__repo_folder)
         return [tag.strip() for tag in tags.strip().split('\n') if valid_tag_name(tag.strip())]
 
@@ -93,6 +112,7 @@ class Git(VersionControlSystem):
             """ Return whether name is a valid branch name. """
             return name and ' -> ' not in name and 'origin/master' not in name
 
+        self.sync()
         command = ['git', 'branch', '--list', '--remote', '--no-color']
         if unmerged_only:
             command.append('--no-merged')
@@ -110,7 +130,6 @@ class Git(VersionControlSystem):
 
     def __get_repo(self):
         """ Clone the repository if necessary, else pull it. """
-        self.__repo_folder = self.__determine_repo_folder_name()
         if os.path.exists(self.__repo_folder):
             logging.info('Updating Git repo %s in %s', self.url(), self.__repo_folder)
             command = ['git', 'pull', '--prune']
@@ -19,7 +19,7 @@ import logging
 import bs4
 
 from .. import domain
-from . import url_opener, beautifulsoup
+from . import url_opener, beautifulsoup, response_cache
 
 
 class ZAPScanReport(domain.MetricSource):
@@ -37,11 +37,13 @@ class ZAPScanReport(domain.MetricSource):
         nr_alerts = 0
         for url in report_urls:
             try:
-                soup = bs4.BeautifulSoup(self._url_open(url), "html.parser")
+                contents = response_cache.read(self._url_open(url))
             except url_opener.UrlOpener.url_open_exceptions:
                 return -1
             try:
-                nr_alerts += self.__parse_alerts(soup, risk_level)
+                nr_alerts += response_cache.parse(
+                    (self.__class__.__name__, risk_level), contents,
+                    lambda: self.__parse_alerts(bs4.BeautifulSoup(contents, "html.parser"), risk_level))
             except IndexError as reason:
                 logging.warn("Couldn't parse alerts with %s risk level from %s: %s", risk_level, url, reason)
                 return -1
@@ -14,4 +14,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from report import QualityReport
+from report import QualityReport, DataRequirementPlanner
+from prefetch import Prefetcher
+from repository_sync import RepositorySynchronizer
+from schedule import RefreshSchedule
+from snapshot_store import SnapshotStore, RestoredMetric
+from status_index import StatusIndex
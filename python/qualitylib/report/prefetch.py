@@ -0,0 +1,72 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import logging
+from multiprocessing.pool import ThreadPool
+
+
+class Prefetcher(object):
+    """ Evaluate the metrics of a report concurrently, so that the data the metrics need from their metric sources
+        is retrieved and memoized before the report is formatted. Metrics are grouped by their (first) metric source
+        class and each group is evaluated by its own bounded thread pool. The number of threads per metric source
+        class can be configured in the project definition with the max_workers setting. The groups run concurrently,
+        so they aren't ordered; the urls the metrics open are queued in the fetcher, which opens the urls that took
+        longest in previous runs first, so they don't become the tail of the run. """
+
+    default_max_workers = 4
+
+    def __init__(self, project, thread_pool=ThreadPool):
+        self.__project = project
+        self.__thread_pool = thread_pool
+
+    def prefetch(self, metrics):
+        """ Evaluate the metrics and wait until all evaluations are done. Metrics without metric sources, such as
+            the meta metrics, are skipped because they don't retrieve data themselves. """
+        pools = []
+        for metric_source_class, metrics_of_class in self.__group_by_metric_source_class(metrics).items():
+            nr_threads = min(self.max_workers(metric_source_class), len(metrics_of_class))
+            pool = self.__thread_pool(nr_threads)
+            logging.info('Prefetching %d metrics using %s with %d threads', len(metrics_of_class),
+                         metric_source_class.__name__, nr_threads)
+            pool.map_async(self.evaluate, metrics_of_class)
+            pools.append(pool)
+        for pool in pools:
+            pool.close()
+        for pool in pools:
+            pool.join()
+
+    def max_workers(self, metric_source_class):
+        """ Return the maximum number of threads to use for evaluating metrics that use the metric source class. """
+        return self.__project.metric_source_settings(metric_source_class).get('max_workers', self.default_max_workers)
+
+    @staticmethod
+    def evaluate(metric):
+        """ Evaluate the metric so its snapshot is memoized. Exceptions are logged and otherwise ignored; the
+            formatters will run into them again when they format the metric. """
+        try:
+            metric.snapshot()
+        except Exception as reason:  # pylint: disable=broad-except
+            logging.warning("Couldn't prefetch %s: %s", metric.stable_id(), reason)
+
+    @staticmethod
+    def __group_by_metric_source_class(metrics):
+        """ Return a dictionary with the metric source classes as keys and the metrics that use them as values. """
+        groups = dict()
+        for metric in metrics:
+            if metric.metric_source_classes:
+                groups.setdefault(metric.metric_source_classes[0], []).append(metric)
+        return groups
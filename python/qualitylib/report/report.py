@@ -15,8 +15,10 @@ limitations under the License.
 """
 
 import datetime
+import logging
 
 from .section import Section, SectionHeader
+from .status_index import StatusIndex
 from .. import metric, metric_source, metric_info, domain, requirement
 
 
@@ -55,17 +57,22 @@ class QualityReport(domain.DomainObject):
             classes.update(set(metric_class.metric_source_classes))
         return classes
 
-    def __init__(self, project):
+    def __init__(self, project, date=None):
         # Use None as name to keep the history consistent of metrics that have the report as subject:
         super(QualityReport, self).__init__(name='None')
         self.__project = project
+        self.__date = date
         self.__title = 'Kwaliteitsrapportage {org}/{proj}'.format(org=project.organization(), proj=project.name())
         self.__products = sorted(project.products(), key=lambda product: (product.name(), product.short_name()))
         self.__teams = sorted(project.teams(), key=str)
         self.__sections = []
         self.__meta_section = None
-        self.__metrics = []
+        self.__snapshot_store = None
+        self.__evaluated_section_ids = None
+        self.__metric_classes = set()
         self.__requirements = set()
+        self.__status_index = StatusIndex(lambda: [section for section in self.sections()
+                                                   if section is not self.__meta_section])
 
     def __str__(self):
         return self.__title
@@ -78,22 +85,30 @@ class QualityReport(domain.DomainObject):
         """ Return the project this report is about. """
         return self.__project
 
-    @staticmethod
-    def date():
-        """ Return the date and time the quality report was generated. """
-        return datetime.datetime.today()
+    def date(self):
+        """ Return the date and time the quality report was generated, or the date and time its data was collected
+            if it was passed when creating the report. """
+        return self.__date or datetime.datetime.today()
 
     def sections(self):
-        """ Return the sections in the report. """
+        """ Return the sections in the report. The sections know which metrics they contain, but the metrics are
+            only created when the metrics of a section are first needed. """
         if not self.__sections:
             sections = [self.__process_section(), self.__overall_products_section(), self.__environment_section()]
             sections.extend([self.__product_section(product) for product in self.__products])
             sections.extend([self.__team_section(team) for team in self.__teams])
             self.__sections = [section for section in sections if section]
-            self.__meta_section = self.__create_meta_section(self.__sections)
+            self.__meta_section = self.__create_meta_section(self.__sections[:])
             self.__sections.append(self.__meta_section)
         return self.__sections
 
+    def restore_snapshots(self, snapshot_store, section_ids):
+        """ Let the metrics outside the sections with the section ids show their stored snapshots, so that they don't
+            need to be created. Metrics without stored snapshot and the meta metrics are created as usual. This only
+            affects metrics that haven't been created yet. """
+        self.__snapshot_store = snapshot_store
+        self.__evaluated_section_ids = set(section_ids)
+
     def get_section(self, section_id):
         """ Return the section with the specified section id. """
         for section in self.sections():
@@ -101,6 +116,11 @@ class QualityReport(domain.DomainObject):
                 return section
         return None
 
+    def section_metrics(self, section_ids):
+        """ Return the metrics in the sections with the specified section ids. """
+        return [each_metric for section in self.sections() if section.id_prefix() in section_ids
+                for each_metric in section.metrics()]
+
     def get_product_section(self, product):
         """ Return the section for a specific product. """
         return {section.product().name(): section for section in self.sections() if section.product()}[product.name()]
@@ -109,17 +129,21 @@ class QualityReport(domain.DomainObject):
         """ Return the section with the meta metrics. """
         return self.__meta_section
 
+    def status_index(self):
+        """ Return the index of the statuses of the metrics in the sections, except the meta section. """
+        return self.__status_index
+
     def dashboard(self):
         """ Return the dashboard layout. """
         return self.__project.dashboard()
 
     def metrics(self):
         """ Return all metrics we report on. """
-        return self.__metrics
+        return [each_metric for section in self.sections() for each_metric in section.metrics()]
 
     def included_metric_classes(self):
         """ Return the metric classes included in the report. """
-        return {each_metric.__class__ for each_metric in self.__metrics}
+        return self.__metric_classes.copy()
 
     def included_requirement_classes(self):
         """ Return the requirements included in the report. """
@@ -153,8 +177,7 @@ class QualityReport(domain.DomainObject):
                                                   requirement.TrackTechnicalDebt, requirement.TrackManualLTCs,
                                                   requirement.TrackReadyUS,
                                                   requirement.TrackSecurityAndPerformanceRisks)
-        self.__metrics.extend(metrics)
-        return Section(SectionHeader('PC', 'Proceskwaliteit algemeen'), metrics) if metrics else None
+        return self.__section(SectionHeader('PC', 'Proceskwaliteit algemeen'), metrics)
 
     def __environment_section(self):
         """ Return the environment section. """
@@ -162,16 +185,14 @@ class QualityReport(domain.DomainObject):
                                                   requirement.TrackJavaConsistency,
                                                   requirement.TrackSonarVersion, requirement.Java,
                                                   requirement.CSharp, requirement.JavaScript, requirement.Web)
-        self.__metrics.extend(metrics)
-        return Section(SectionHeader('PE', 'Kwaliteit omgevingen'), metrics) if metrics else None
+        return self.__section(SectionHeader('PE', 'Kwaliteit omgevingen'), metrics)
 
     def __overall_products_section(self):
         """ Return the products overall section. """
         metrics = self.__required_subject_metrics(self.__project, requirement.TrustedProductMaintainability)
         for document in self.__project.documents():
             metrics.extend(self.__required_subject_metrics(document, requirement.TrackDocumentAge))
-        self.__metrics.extend(metrics)
-        return Section(SectionHeader('PD', 'Productkwaliteit algemeen'), metrics) if metrics else None
+        return self.__section(SectionHeader('PD', 'Productkwaliteit algemeen'), metrics)
 
     def __product_section(self, product):
         """ Return the section for the product. """
@@ -183,29 +204,49 @@ class QualityReport(domain.DomainObject):
         metrics.extend(self.__art_metrics(product.art()))
         metrics.extend(self.__jsf_metrics(product.jsf()))
         metrics.extend(self.__required_subject_metrics(product, requirement.TrackBranches))
-        self.__metrics.extend(metrics)
-        return Section(SectionHeader(product.short_name(), product.name(), self.__latest_product_version(product)),
-                       metrics, product=product) if metrics else None
+        return self.__section(SectionHeader(product.short_name(), product.name(),
+                                            lambda: self.__latest_product_version(product)), metrics, product=product)
 
     def __team_section(self, team):
         """ Return a report section for the team. """
         metrics = self.__required_subject_metrics(team, requirement.ScrumTeam, requirement.TrackSpirit,
                                                   requirement.TrackAbsence)
-        self.__metrics.extend(metrics)
-        return Section(SectionHeader(team.short_name(), 'Team ' + team.name()), metrics) if metrics else None
+        return self.__section(SectionHeader(team.short_name(), 'Team ' + team.name()), metrics)
 
     def __create_meta_section(self, sections):
-        """ Create and return the meta section. """
-        metrics = []
-        for section in sections:
-            metrics.extend(section.metrics())
-        meta_metrics = [meta_metric_class(metrics, project=self.__project) for
-                        meta_metric_class in (metric.GreenMetaMetric, metric.RedMetaMetric, metric.YellowMetaMetric,
-                                              metric.GreyMetaMetric, metric.MissingMetaMetric)]
-        self.__metrics.extend(meta_metrics)
-        return Section(SectionHeader('MM', 'Meta metrieken'), meta_metrics,
+        """ Create and return the meta section. The meta metrics summarize the metrics of all other sections, so
+            creating the meta metrics creates the metrics of all other sections. """
+        meta_metric_classes = (metric.GreenMetaMetric, metric.RedMetaMetric, metric.YellowMetaMetric,
+                               metric.GreyMetaMetric, metric.MissingMetaMetric)
+        self.__metric_classes.update(meta_metric_classes)
+
+        def create_meta_metrics():
+            """ Create the meta metrics. """
+            metrics = [each_metric for section in sections for each_metric in section.metrics()]
+            return [meta_metric_class(metrics, project=self.__project, status_index=self.__status_index)
+                    for meta_metric_class in meta_metric_classes]
+        return Section(SectionHeader('MM', 'Meta metrieken'), create_meta_metrics,
                        history=self.__project.metric_source(metric_source.History))
 
+    def __section(self, header, metrics, **kwargs):
+        """ Return a section with the header that creates the metrics when needed, or None if there are no metrics
+            for the section. """
+        def create_metrics():
+            """ Create the metrics from their classes and subjects. """
+            return [self.__create_metric(metric_class, subject, header, index)
+                    for index, (metric_class, subject) in enumerate(metrics)]
+        return Section(header, create_metrics, status_index=self.__status_index, **kwargs) if metrics else None
+
+    def __create_metric(self, metric_class, subject, header, index):
+        """ Create the metric at the index in the section with the header, or return a stand-in for the metric that
+            shows its stored snapshot if the stored snapshots of the section are restored. """
+        if self.__snapshot_store and header.id_prefix() not in self.__evaluated_section_ids:
+            restored_metric = self.__snapshot_store.restored_metric(metric_class.subject_stable_id(subject),
+                                                                    header.metric_id_string(index))
+            if restored_metric:
+                return restored_metric
+        return metric_class(subject, project=self.__project)
+
     def __art_metrics(self, art):
         """ Return a list of Automated Regression Test metrics for the (ART) product. """
         return self.__required_subject_metrics(art, requirement.CodeQuality, requirement.ARTCoverage,
@@ -216,11 +257,44 @@ class QualityReport(domain.DomainObject):
         return self.__required_subject_metrics(jsf, requirement.JSFCodeQuality) if jsf else []
 
     def __required_subject_metrics(self, subject, *requirements):
-        """ Return a list of metrics for the subject that should be measured and are applicable. """
+        """ Return a list of metrics for the subject that should be measured and are applicable. The metrics are
+            returned as (metric class, subject) tuples, so the metrics can be created when needed. """
         metrics = []
         for req in requirements:
             for metric_class in req.metric_classes():
                 if metric_class.should_be_measured(subject) and metric_class.is_applicable(subject):
                     self.__requirements.add(req)
-                    metrics.append(metric_class(subject, project=self.__project))
+                    self.__metric_classes.add(metric_class)
+                    metrics.append((metric_class, subject))
         return metrics
+
+
+class DataRequirementPlanner(object):
+    """ Collect the data requirements of the metrics in a report, remove duplicates and let each metric source
+        retrieve the data for all its calls in one batch. """
+
+    def __init__(self, metrics):
+        self.__plan = dict()
+        for each_metric in metrics:
+            for metric_source_instance, call, metric_source_id in each_metric.data_requirements():
+                self.__plan.setdefault(metric_source_instance, set()).add((call, metric_source_id))
+
+    def plan(self):
+        """ Return the planned calls, as a dictionary with metric sources as keys and sets of (method name, metric
+            source id) tuples as values. """
+        return self.__plan
+
+    def nr_calls(self):
+        """ Return the total number of planned calls. """
+        return sum(len(calls) for calls in self.__plan.values())
+
+    def execute(self):
+        """ Let each metric source fulfil its planned calls. """
+        logging.info('Planned %d calls to %d metric sources', self.nr_calls(), len(self.__plan))
+        for metric_source_instance, calls in self.__plan.items():
+            logging.info('Planned %d calls to %s', len(calls), metric_source_instance.metric_source_name)
+            try:
+                metric_source_instance.fulfil(sorted(calls))
+            except Exception as reason:  # pylint: disable=broad-except
+                logging.warning("Couldn't fulfil the planned calls to %s: %s",
+                                metric_source_instance.metric_source_name, reason)
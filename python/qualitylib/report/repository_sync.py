@@ -0,0 +1,77 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import logging
+from multiprocessing.pool import ThreadPool
+
+from .. import metric_source
+
+
+class RepositorySynchronizer(object):
+    """ Clone or pull the Git repositories of a project in the background, using a bounded thread pool, so that
+        syncing the repositories overlaps with retrieving the data of the other metric sources. Metrics that need a
+        repository wait until that repository is synced. The number of threads can be configured in the project
+        definition with the max_workers setting of the Git metric source class. """
+
+    default_max_workers = 4
+
+    def __init__(self, project, thread_pool=ThreadPool):
+        self.__project = project
+        self.__thread_pool = thread_pool
+        self.__pool = None
+
+    def start(self):
+        """ Start syncing the repositories without waiting for the syncs to be done. Return the number of
+            repositories being synced. """
+        repositories = self.repositories()
+        if repositories:
+            nr_threads = min(self.max_workers(), len(repositories))
+            logging.info('Syncing %d repositories with %d threads', len(repositories), nr_threads)
+            self.__pool = self.__thread_pool(nr_threads)
+            self.__pool.map_async(self.sync, repositories)
+            self.__pool.close()
+        return len(repositories)
+
+    def wait(self):
+        """ Wait until the syncs are done. """
+        if self.__pool:
+            self.__pool.join()
+            self.__pool = None
+
+    def max_workers(self):
+        """ Return the maximum number of threads to use for syncing repositories. """
+        return self.__project.metric_source_settings(metric_source.Git).get('max_workers', self.default_max_workers)
+
+    def repositories(self):
+        """ Return the Git repositories of the project. """
+        repositories, seen = [], set()
+        for metric_source_class in self.__project.metric_source_classes():
+            instances = self.__project.metric_source(metric_source_class)
+            for instance in instances if isinstance(instances, list) else [instances]:
+                if isinstance(instance, metric_source.Git) and id(instance) not in seen:
+                    seen.add(id(instance))
+                    repositories.append(instance)
+        return repositories
+
+    @staticmethod
+    def sync(repository):
+        """ Sync the repository. Exceptions are logged and otherwise ignored; the metrics that need the repository
+            will try to sync it again. """
+        try:
+            repository.sync()
+        except Exception as reason:  # pylint: disable=broad-except
+            logging.warning("Couldn't sync %s: %s", repository.url(), reason)
@@ -0,0 +1,61 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import logging
+import time
+
+
+class RefreshSchedule(object):
+    """ Keep track of when the metric sources of a project were last refreshed and refresh the metric sources whose
+        data has expired. By default, the data of a metric source expires after the interval; the time to live of
+        the data of a metric source class can be configured in the project definition with the ttl setting
+        (in seconds). """
+
+    def __init__(self, project, interval, clock=time.time):
+        self.__project = project
+        self.__interval = interval
+        self.__clock = clock
+        self.__last_refresh = dict()
+        self.__started = clock()
+
+    def ttl(self, metric_source_class):
+        """ Return the number of seconds the data of metric sources of the class stays valid. """
+        return self.__project.metric_source_settings(metric_source_class).get('ttl', self.__interval)
+
+    def refresh_expired_metric_sources(self):
+        """ Refresh the metric sources whose data has expired and return them. """
+        now = self.__clock()
+        refreshed = []
+        for metric_source_class, metric_source in self.__metric_sources():
+            last_refresh = self.__last_refresh.get(id(metric_source), self.__started)
+            if now - last_refresh >= self.ttl(metric_source_class):
+                logging.info('Refreshing %s', metric_source.name())
+                metric_source.refresh()
+                self.__last_refresh[id(metric_source)] = now
+                refreshed.append(metric_source)
+        return refreshed
+
+    def __metric_sources(self):
+        """ Return the metric source instances of the project, together with their class. """
+        metric_sources, seen = [], set()
+        for metric_source_class in self.__project.metric_source_classes():
+            instances = self.__project.metric_source(metric_source_class)
+            for instance in instances if isinstance(instances, list) else [instances]:
+                if id(instance) not in seen:
+                    seen.add(id(instance))
+                    metric_sources.append((metric_source_class, instance))
+        return metric_sources
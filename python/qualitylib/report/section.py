@@ -18,7 +18,8 @@ from .. import utils
 
 
 class SectionHeader(object):
-    """ Header for a section, consisting of two-letter prefix, title and an optional subtitle. """
+    """ Header for a section, consisting of two-letter prefix, title and an optional subtitle. The subtitle can be
+        passed as a function, so that it's only determined when needed. """
 
     def __init__(self, id_prefix, title, subtitle=''):
         self.__id_prefix = id_prefix
@@ -31,34 +32,43 @@ class SectionHeader(object):
 
     def subtitle(self):
         """ Return the subtitle of the section. """
+        if callable(self.__subtitle):
+            self.__subtitle = self.__subtitle()
         return self.__subtitle
 
     def id_prefix(self):
         """ Return the id prefix of the section, a two letter string. """
         return self.__id_prefix
 
+    def metric_id_string(self, index):
+        """ Return the id string of the metric at the index, counting from zero, in the section. """
+        return '{pref}-{nr}'.format(pref=self.__id_prefix, nr=index + 1)
+
 
 # Section implements __getitem__ but not the complete Container protocol
 
 class Section(object):
-    """ Section within a report. """
+    """ Section within a report. The metrics can be passed as a function that creates them, so that the metrics are
+        only created when the section's metrics are first needed. """
 
     ORDERED_STATUSES = ('missing', 'missing_source', 'red', 'yellow', 'grey', 'green', 'perfect')
     STATUS_TO_COLOR_MAPPING = dict(missing='red', missing_source='red', perfect='green')
 
-    def __init__(self, header, metrics, history=None, product=None):
+    def __init__(self, header, metrics, history=None, product=None, status_index=None):
         self.__header = header
-        self.__metrics = metrics
+        self.__status_index = status_index
+        self.__create_metrics = metrics if callable(metrics) else lambda: metrics
+        self.__metrics = None
         self.__history = history
         self.__product = product
-        for index, each_metric in enumerate(self.__metrics):
-            each_metric.set_id_string('{pref}-{nr}'.format(pref=self.__header.id_prefix(), nr=index + 1))
+        if not callable(metrics):
+            self.metrics()
 
     def __str__(self):
         return self.title()
 
     def __getitem__(self, index):
-        return self.__metrics[index]
+        return self.metrics()[index]
 
     def title(self):
         """ Return the title of this section. """
@@ -73,13 +83,18 @@ class Section(object):
         return self.__header.id_prefix()
 
     def metrics(self):
-        """ Return the metrics in this section. """
+        """ Return the metrics in this section, creating and numbering them if they haven't been created yet. """
+        if self.__metrics is None:
+            self.__metrics = self.__create_metrics()
+            for index, each_metric in enumerate(self.__metrics):
+                each_metric.set_id_string(self.__header.metric_id_string(index))
         return self.__metrics
 
     @utils.memoized
     def color(self):
         """ Return the color of this section. """
-        metric_statuses = set(each_metric.status() for each_metric in self)
+        metric_statuses = set(self.__status_index.statuses(self.id_prefix())) if self.__status_index else \
+            set(each_metric.snapshot().status() for each_metric in self)
         for status_color in self.ORDERED_STATUSES:  # pragma: no branch
             if status_color in metric_statuses:
                 color = status_color
@@ -0,0 +1,138 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import cPickle
+import datetime
+import logging
+import os
+import threading
+
+
+class RestoredMetric(object):
+    """ Stand-in for a metric that shows its stored snapshot. The metric itself isn't created, so its metric sources,
+        history and metric source ids aren't looked up. """
+
+    def __init__(self, id_string, snapshot):
+        self.__id_string = id_string
+        self.__snapshot = snapshot
+
+    def stable_id(self):
+        """ Return the stable id of the metric. """
+        return self.__snapshot.stable_id()
+
+    def set_id_string(self, id_string):
+        """ Set the identification string. """
+        self.__id_string = id_string
+
+    def id_string(self):
+        """ Return the identification string of the metric. """
+        return self.__id_string
+
+    def snapshot(self):
+        """ Return the stored snapshot. """
+        return self.__snapshot
+
+
+class SnapshotStore(object):
+    """ Store of the metric snapshots of the previous reports, together with the date they were measured. When only
+        some sections of the report are created again, the metrics in the other sections are replaced by stand-ins
+        that show their stored snapshots, so they don't need to be created or evaluated. Metrics that can't be
+        evaluated in time can show their stored snapshot, marked as stale. """
+
+    def __init__(self, filename, clock=datetime.datetime.now):
+        self.__filename = filename
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__snapshots = None
+        self.__measurement_dates = dict()  # Measurement dates of restored snapshots, keyed by id of the metric
+
+    def restored_metric(self, stable_id, id_string):
+        """ Return a stand-in for the metric with the stable id and id string that shows the stored snapshot of the
+            metric. Return None if the metric has no stored snapshot, for example because it is new or moved to
+            another position in the report. """
+        with self.__lock:
+            snapshot, measurement_date = self.__stored_snapshots().get(id_string, (None, None))
+            if not snapshot or snapshot.stable_id() != stable_id:
+                return None
+            restored_metric = RestoredMetric(id_string, snapshot)
+            self.__measurement_dates[id(restored_metric)] = measurement_date
+            return restored_metric
+
+    def restore_stale(self, metrics):
+        """ Let the metrics show their stored snapshots, marked as stale. Return the metrics that have a stored
+            snapshot. """
+        restored = []
+        with self.__lock:
+            snapshots = self.__stored_snapshots()
+            for metric in metrics:
+                snapshot, measurement_date = snapshots.get(metric.id_string(), (None, None))
+                if snapshot and snapshot.stable_id() == metric.stable_id():
+                    metric.restore_snapshot(snapshot.stale(measurement_date))
+                    self.__measurement_dates[id(metric)] = measurement_date
+                    restored.append(metric)
+        return restored
+
+    def save(self, metrics):
+        """ Write the snapshots of the metrics to the file. Restored snapshots keep their measurement date; the
+            other snapshots get the current date. """
+        now = self.__clock()
+        with self.__lock:
+            snapshots = dict((metric.id_string(), (metric.snapshot(), self.__measurement_dates.get(id(metric), now)))
+                             for metric in metrics)
+            self.__write(snapshots)
+            # Forget the restored snapshots, so metrics of the next report that happen to get the same id don't
+            # inherit their measurement dates.
+            self.__measurement_dates.clear()
+
+    def update(self, metrics):
+        """ Replace the stored snapshots of the metrics with their current snapshots and write them to the file. """
+        now = self.__clock()
+        with self.__lock:
+            snapshots = self.__stored_snapshots().copy()
+            for metric in metrics:
+                snapshots[metric.id_string()] = (metric.snapshot(), now)
+                self.__measurement_dates.pop(id(metric), None)
+            self.__write(snapshots)
+
+    def __write(self, snapshots):
+        """ Write the snapshots and their measurement dates to the file. """
+        tmp_filename = self.__filename + '.tmp'
+        with open(tmp_filename, 'wb') as snapshot_file:
+            cPickle.dump(snapshots, snapshot_file, cPickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_filename, self.__filename)
+        self.__snapshots = snapshots
+
+    def __stored_snapshots(self):
+        """ Return the stored snapshots and their measurement dates, keyed by the id string of their metric. """
+        if self.__snapshots is None:
+            self.__snapshots = self.__load()
+        return self.__snapshots
+
+    def __load(self):
+        """ Read the snapshots from the file. Files written by previous versions, without measurement dates, are
+            ignored. """
+        if os.path.exists(self.__filename):
+            try:
+                with open(self.__filename, 'rb') as snapshot_file:
+                    snapshots = cPickle.load(snapshot_file)
+            except (IOError, EOFError, ValueError, cPickle.UnpicklingError) as reason:
+                logging.warning("Couldn't read the metric snapshots %s: %s", self.__filename, reason)
+            else:
+                if all(isinstance(value, tuple) for value in snapshots.values()):
+                    return snapshots
+                logging.warning('Ignoring the metric snapshots %s written by a previous version', self.__filename)
+        return dict()
@@ -0,0 +1,77 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from __future__ import absolute_import
+
+import threading
+
+
+class StatusIndex(object):
+    """ Index of the statuses of the metrics in the sections of a report. The index is filled in once, when first
+        needed, so the meta metrics, the section colors and the dashboard don't each need to check the status of
+        every metric. Per section and for the sections together, the index keeps the ids of the metrics per status.
+        The sections are passed as a function that returns them, so the index can be created before the sections. """
+
+    def __init__(self, sections):
+        self.__sections = sections
+        self.__lock = threading.Lock()
+        self.__metric_ids = None  # Metric ids per status per section id; the key None is used for all sections
+        self.__section_ids = None  # Section ids per product name
+
+    def statuses(self, section_id=None):
+        """ Return the number of metrics per status in the section, or in all sections if no section id is passed.
+            Statuses without metrics are left out. """
+        return dict((status, len(metric_ids)) for status, metric_ids in self.__index(section_id).items())
+
+    def product_statuses(self, product):
+        """ Return the number of metrics per status in the section of the product. """
+        return self.statuses(self.__product_section_id(product))
+
+    def count(self, statuses, section_id=None):
+        """ Return the number of metrics with one of the statuses in the section, or in all sections if no section
+            id is passed. """
+        index = self.__index(section_id)
+        return sum(len(index.get(status, [])) for status in statuses)
+
+    def metric_ids(self, status, section_id=None):
+        """ Return the ids of the metrics with the status in the section, or in all sections if no section id is
+            passed. """
+        return list(self.__index(section_id).get(status, []))
+
+    def __product_section_id(self, product):
+        """ Return the id of the section of the product. """
+        self.__index()
+        return self.__section_ids.get(product.name())
+
+    def __index(self, section_id=None):
+        """ Return the metric ids per status of the section, filling in the index if necessary. """
+        with self.__lock:
+            if self.__metric_ids is None:
+                self.__metric_ids, self.__section_ids = self.__fill()
+        return self.__metric_ids.get(section_id, dict())
+
+    def __fill(self):
+        """ Check the status of each metric once and return the metric ids per status per section id, and the
+            section ids per product name. """
+        metric_ids, section_ids = {None: dict()}, dict()
+        for section in self.__sections():
+            section_metric_ids = metric_ids.setdefault(section.id_prefix(), dict())
+            if section.product():
+                section_ids[section.product().name()] = section.id_prefix()
+            for metric in section.metrics():
+                status = metric.snapshot().status()
+                section_metric_ids.setdefault(status, []).append(metric.id_string())
+                metric_ids[None].setdefault(status, []).append(metric.id_string())
+        return metric_ids, section_ids
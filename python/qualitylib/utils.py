@@ -23,6 +23,8 @@ import os
 import shutil
 import json
 import re
+import threading
+import time
 
 
 MONTHS = {
@@ -213,38 +215,130 @@ def workdays_in_period(start_date, end_date):
                if datetime.date.fromordinal(ordinal).isoweekday() <= 5)
 
 
+MEMOIZED_CACHE_ATTRIBUTE = '_memoized_cache_and_locks'
+
+
+class _KeyLock(object):
+    """ Reentrant lock that can be acquired with a timeout. """
+
+    def __init__(self):
+        self.__condition = threading.Condition(threading.Lock())
+        self.__owner = None
+        self.__count = 0
+
+    def acquire(self, timeout=None):
+        """ Acquire the lock, waiting at most timeout seconds while another thread holds it. Return whether the
+            lock was acquired. """
+        current_thread = threading.current_thread()
+        end = None if timeout is None else time.time() + timeout
+        with self.__condition:
+            while self.__owner not in (None, current_thread):
+                remaining = None if end is None else end - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.__condition.wait(remaining)
+            self.__owner = current_thread
+            self.__count += 1
+            return True
+
+    def release(self):
+        """ Release the lock. """
+        with self.__condition:
+            self.__count -= 1
+            if not self.__count:
+                self.__owner = None
+                self.__condition.notify()
+
+
 class memoized(object):  # pylint: disable=invalid-name,too-few-public-methods
     """ Decorator. Caches a function's return value each time it is called.
         If called later with the same arguments, the cached value is returned
-        (not reevaluated). """
+        (not reevaluated). The cache is safe to use from multiple threads: concurrent calls with the same
+        arguments are evaluated once and all callers get the same value. Callers that wait for the evaluation by
+        another thread wait no longer than the time budget of the instance allows. """
 
     def __init__(self, func):
         self.__func = func
-        self.__instance = None
         self.__cache = {}
+        self.__locks = {}
+        self.__locks_lock = threading.Lock()
 
     def __get__(self, instance, cls=None):
-        self.__instance = instance
-        return self
+        return _MemoizedMethod(self, instance)
 
     def __call__(self, *args, **kwargs):
-        key = (id(self.__instance),) + args + tuple([kwargs[key] for key in sorted(kwargs)])
+        return self.call(None, *args, **kwargs)
+
+    def call(self, instance, *args, **kwargs):
+        """ Return the cached value for the instance and arguments, evaluating the function if necessary. """
+        key = (self.__func,) + args + tuple([kwargs[key] for key in sorted(kwargs)])
         try:
-            return self.__cache[key]
-        except KeyError:
-            value = self.__func(self.__instance, *args, **kwargs)
-            self.__cache[key] = value
-            return value
+            hash(key)
         except TypeError:
             # Not cacheable -- for instance, passing a list as an argument.
             # Better to not cache than to blow up entirely.
-            return self.__func(self.__instance, *args, **kwargs)
+            return self.__func(instance, *args, **kwargs)
+        cache, locks = self.__cache_and_locks(instance)
+        lock = self.__lock(locks, key)
+        self.__acquire(lock, instance)
+        try:
+            return cache[key]
+        except KeyError:
+            value = self.__func(instance, *args, **kwargs)
+            cache[key] = value
+            return value
+        finally:
+            lock.release()
+
+    def __cache_and_locks(self, instance):
+        """ Return the cache and the locks for the instance. The cache is kept in the instance itself so that cached
+            values live exactly as long as the instance does. """
+        if instance is None:
+            return self.__cache, self.__locks
+        return instance.__dict__.setdefault(MEMOIZED_CACHE_ATTRIBUTE, ({}, {}))
+
+    def __lock(self, locks, key):
+        """ Return the lock for the key. Each key has its own lock so that slow evaluations of one key don't
+            block the evaluation of other keys. """
+        with self.__locks_lock:
+            return locks.setdefault(key, _KeyLock())
+
+    def __acquire(self, lock, instance):
+        """ Acquire the lock, waiting at most the time left in the run budget of the instance if another thread is
+            evaluating the same key. """
+        if lock.acquire(timeout=0):
+            return
+        from .metric_source import run_budget  # Run time import to prevent circular dependency.
+        budget = run_budget.default_run_budget()
+        timeout = budget.remaining(instance) if budget and instance is not None else None
+        if not lock.acquire(timeout):
+            raise run_budget.BudgetExhausted('the time budget of {0} has run out while waiting for {1}'.format(
+                instance.__class__.__name__, self.__func.__name__))
 
     def __repr__(self):
         """ Return the function's docstring. """
         return self.__func.__doc__
 
 
+class _MemoizedMethod(object):  # pylint: disable=too-few-public-methods
+    """ A memoized function bound to an instance. """
+
+    def __init__(self, memoized_function, instance):
+        self.__memoized_function = memoized_function
+        self.__instance = instance
+
+    def __call__(self, *args, **kwargs):
+        return self.__memoized_function.call(self.__instance, *args, **kwargs)
+
+    def __repr__(self):
+        return repr(self.__memoized_function)
+
+
+def clear_memoized(instance):
+    """ Forget the memoized values of the instance, so they will be evaluated again. """
+    instance.__dict__.pop(MEMOIZED_CACHE_ATTRIBUTE, None)
+
+
 def rmtree(folder, remove_tree=shutil.rmtree, exists=os.path.exists):
     """ Remove folder recursively. """
     if exists(folder):
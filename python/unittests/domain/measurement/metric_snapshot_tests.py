@@ -0,0 +1,63 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import datetime
+import unittest
+
+from qualitylib.domain.measurement.metric_snapshot import MetricSnapshot
+
+
+class MetricSnapshotTest(unittest.TestCase):
+    """ Unit tests for the metric snapshot. """
+
+    def setUp(self):
+        self.__snapshot = MetricSnapshot(
+            stable_id='MetricProduct', id_string='PD-1', status='red', numerical_value=10,
+            status_start_date=datetime.datetime(2016, 1, 1), report='report', norm='norm',
+            url={'Sonar': 'http://sonar'}, url_label='label', comment='comment', comment_urls={}, comment_url_label='',
+            recent_history=[8, 10], y_axis_range=(7, 11))
+
+    def test_values(self):
+        """ Test that the snapshot returns the values it was created with. """
+        self.assertEqual(('MetricProduct', 'PD-1', 'red', 10, datetime.datetime(2016, 1, 1), 'report', 'norm',
+                          {'Sonar': 'http://sonar'}, 'label', 'comment', {}, '', [8, 10], (7, 11)),
+                         (self.__snapshot.stable_id(), self.__snapshot.id_string(), self.__snapshot.status(),
+                          self.__snapshot.numerical_value(), self.__snapshot.status_start_date(),
+                          self.__snapshot.report(), self.__snapshot.norm(), self.__snapshot.url(),
+                          self.__snapshot.url_label(), self.__snapshot.comment(), self.__snapshot.comment_urls(),
+                          self.__snapshot.comment_url_label(), self.__snapshot.recent_history(),
+                          self.__snapshot.y_axis_range()))
+
+    def test_immutable(self):
+        """ Test that values can't be added to the snapshot. """
+        self.assertRaises(AttributeError, setattr, self.__snapshot, 'status', 'green')
+
+    def test_urls_are_copied(self):
+        """ Test that changing the returned urls doesn't change the snapshot. """
+        self.__snapshot.url()['Jenkins'] = 'http://jenkins'
+        self.assertEqual({'Sonar': 'http://sonar'}, self.__snapshot.url())
+
+    def test_not_stale(self):
+        """ Test that a new snapshot isn't stale. """
+        self.assertEqual(None, self.__snapshot.stale_since())
+
+    def test_stale(self):
+        """ Test that a stale copy of the snapshot has the same values and remembers when it was measured. """
+        measurement_date = datetime.datetime(2016, 2, 1)
+        stale_snapshot = self.__snapshot.stale(measurement_date)
+        self.assertEqual(measurement_date, stale_snapshot.stale_since())
+        self.assertEqual(self.__snapshot.report(), stale_snapshot.report())
+        self.assertEqual(None, self.__snapshot.stale_since())
@@ -16,7 +16,7 @@ limitations under the License.
 
 import unittest
 
-from qualitylib import domain
+from qualitylib import domain, utils
 
 
 class MetricSourceTests(unittest.TestCase):
@@ -33,6 +33,38 @@ class MetricSourceTests(unittest.TestCase):
         """ Test that the metric source id is returned as url. """
         self.assertEqual(['http://url/to/subject'], domain.MetricSource().metric_source_urls('http://url/to/subject'))
 
+    def test_fulfil(self):
+        """ Test that the default implementation of fulfil makes the calls. """
+
+        class FakeMetricSource(domain.MetricSource):
+            """ Record the calls made. """
+            calls = []
+
+            def method(self, metric_source_id):
+                """ Record the call. """
+                self.calls.append(metric_source_id)
+
+        FakeMetricSource().fulfil([('method', 'id1'), ('method', 'id2')])
+        self.assertEqual(['id1', 'id2'], FakeMetricSource.calls)
+
+    def test_refresh(self):
+        """ Test that refreshing the metric source forgets the memoized data. """
+
+        class FakeMetricSource(domain.MetricSource):
+            """ Count the calls made. """
+            calls = 0
+
+            @utils.memoized
+            def method(self):
+                """ Count the call. """
+                FakeMetricSource.calls += 1
+
+        fake_metric_source = FakeMetricSource()
+        fake_metric_source.method()
+        fake_metric_source.refresh()
+        fake_metric_source.method()
+        self.assertEqual(2, FakeMetricSource.calls)
+
 
 class MissingMetricSourceTests(unittest.TestCase):
     """ Unit tests for the missing metric source domain class. """
@@ -44,3 +76,63 @@ class MissingMetricSourceTests(unittest.TestCase):
     def test_url(self):
         """ Test that the missing metric source has no url. """
         self.assertEqual(None, domain.MissingMetricSource().url())
+
+
+class SharedMetricSourcesTest(unittest.TestCase):
+    """ Unit tests for sharing metric source instances. """
+
+    def test_not_shared_by_default(self):
+        """ Test that metric sources aren't shared by default. """
+        self.assertFalse(domain.MetricSource(url='http://url') is domain.MetricSource(url='http://url'))
+
+    def test_shared(self):
+        """ Test that metric sources created with the same arguments are shared. """
+        with domain.shared_metric_sources():
+            self.assertTrue(domain.MetricSource(url='http://url') is domain.MetricSource(url='http://url'))
+
+    def test_different_arguments(self):
+        """ Test that metric sources created with different arguments aren't shared. """
+        with domain.shared_metric_sources():
+            self.assertFalse(domain.MetricSource(url='http://url') is domain.MetricSource(url='http://other'))
+
+    def test_same_argument_values(self):
+        """ Test that metric sources created with equal container arguments are shared. """
+        with domain.shared_metric_sources():
+            self.assertTrue(domain.MetricSource(url=['http://url', {'b': 1}]) is
+                            domain.MetricSource(url=['http://url', {'b': 1}]))
+
+    def test_different_objects_with_same_repr(self):
+        """ Test that metric sources created with different objects that have the same representation aren't
+            shared. """
+        class Argument(object):  # pylint: disable=too-few-public-methods
+            """ Argument without its own equality. """
+            def __repr__(self):
+                return 'Argument'
+        with domain.shared_metric_sources():
+            self.assertFalse(domain.MetricSource(url=Argument()) is domain.MetricSource(url=Argument()))
+
+    def test_same_object_argument(self):
+        """ Test that metric sources created with the same object as argument are shared. """
+        argument = object()
+        with domain.shared_metric_sources():
+            self.assertTrue(domain.MetricSource(url=argument) is domain.MetricSource(url=argument))
+
+    def test_unhashable_argument(self):
+        """ Test that metric sources created with arguments that can't be compared aren't shared. """
+        class Unhashable(object):  # pylint: disable=too-few-public-methods
+            """ Argument that can't be hashed. """
+            __hash__ = None
+        argument = Unhashable()
+        with domain.shared_metric_sources():
+            self.assertFalse(domain.MetricSource(url=argument) is domain.MetricSource(url=argument))
+
+    def test_different_classes(self):
+        """ Test that metric sources of different classes aren't shared. """
+        with domain.shared_metric_sources():
+            self.assertFalse(domain.MetricSource() is domain.MissingMetricSource())
+
+    def test_sharing_stops(self):
+        """ Test that metric sources aren't shared after leaving the context. """
+        with domain.shared_metric_sources():
+            metric_source = domain.MetricSource(url='http://url')
+        self.assertFalse(metric_source is domain.MetricSource(url='http://url'))
@@ -54,6 +54,39 @@ class MetricTest(unittest.TestCase):
         """ Test that the stable id doesn't include the subject if the subject is a list. """
         self.assertEqual('Metric', domain.Metric([], project=domain.Project()).stable_id())
 
+    def test_no_data_requirements(self):
+        """ Test that the metric has no data requirements by default. """
+        self.assertEqual(set(), self.__metric.data_requirements())
+
+    def test_data_requirements(self):
+        """ Test that the metric requires data for each metric source call. """
+        MetricUnderTest.metric_source_classes = [metric_source.Birt]
+        MetricUnderTest.metric_source_calls = ('nr_ltcs', 'date')
+        project = domain.Project(metric_sources={metric_source.Birt: 'Birt1'})
+        product = domain.Product(project, metric_source_ids={'Birt1': 'birt id'})
+        self.assertEqual({('Birt1', 'nr_ltcs', 'birt id'), ('Birt1', 'date', 'birt id')},
+                         MetricUnderTest(project=project, subject=product).data_requirements())
+        MetricUnderTest.metric_source_classes = []
+        MetricUnderTest.metric_source_calls = ()
+
+    def test_snapshot(self):
+        """ Test that the snapshot has the same values as the metric. """
+        snapshot = self.__metric.snapshot()
+        self.assertEqual((self.__metric.stable_id(), self.__metric.status(), self.__metric.report(),
+                          self.__metric.norm(), self.__metric.status_start_date(), self.__metric.y_axis_range()),
+                         (snapshot.stable_id(), snapshot.status(), snapshot.report(), snapshot.norm(),
+                          snapshot.status_start_date(), snapshot.y_axis_range()))
+
+    def test_snapshot_is_memoized(self):
+        """ Test that the snapshot is created once. """
+        self.assertTrue(self.__metric.snapshot() is self.__metric.snapshot())
+
+    def test_restored_snapshot(self):
+        """ Test that a restored snapshot is used instead of evaluating the metric. """
+        snapshot = MetricUnderTest(self.__subject, project=self.__project).snapshot()
+        self.__metric.restore_snapshot(snapshot)
+        self.assertTrue(snapshot is self.__metric.snapshot())
+
     def test_set_id_string(self):
         """ Test that the id string can be changed. """
         self.__metric.set_id_string('id string')
@@ -91,7 +124,8 @@ class MetricTest(unittest.TestCase):
         MetricUnderTest.metric_source_classes = []
 
     def test_missing_metric_sources_status(self):
-        """ Test that the status is missing metric sources when the project doesn't have the required metric source. """
+        """ Test that the status is missing metric sources when the project doesn't have the required metric
+            source. """
         # pylint: disable=attribute-defined-outside-init
         self.__metric.metric_source_classes = [metric_source.VersionControlSystem]
         self.assertEqual('missing_source', self.__metric.status())
@@ -250,7 +284,8 @@ class MetricTest(unittest.TestCase):
         """ Test that the metric gets the comment from the subject when the subject has a reduced technical
             debt target. """
         self.__subject.debt_target = domain.TechnicalDebtTarget(10, 'Comment')
-        self.assertEqual('De op dit moment geaccepteerde technische schuld is 10 foo. Comment', self.__metric.comment())
+        self.assertEqual('De op dit moment geaccepteerde technische schuld is 10 foo. Comment',
+                         self.__metric.comment())
 
     def test_comment_technical_debt_url(self):
         """ Test that the metric has no comment url when the subject has a reduced technical debt target because
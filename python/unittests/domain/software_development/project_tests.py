@@ -115,3 +115,28 @@ class ProjectTest(unittest.TestCase):
     def test_default_metric_source_classes(self):
         """ Test that the project returns a list of all metric source classes. """
         self.assertEqual([], domain.Project().metric_source_classes())
+
+    def test_metric_source_settings(self):
+        """ Test that the project returns the settings for a metric source class. """
+        project = domain.Project(metric_source_settings={''.__class__: dict(max_workers=2)})
+        self.assertEqual(dict(max_workers=2), project.metric_source_settings(''.__class__))
+
+    def test_deadline(self):
+        """ Test that the project has a deadline for retrieving the data for the report. """
+        self.assertEqual(600, domain.Project(deadline=600).deadline())
+
+    def test_no_deadline(self):
+        """ Test that the project has no deadline by default. """
+        self.assertEqual(None, self.__project.deadline())
+
+    def test_fetch_workers(self):
+        """ Test that the project can specify the number of threads that retrieve data. """
+        self.assertEqual(32, domain.Project(fetch_workers=32).fetch_workers())
+
+    def test_no_fetch_workers(self):
+        """ Test that the project doesn't specify the number of threads that retrieve data by default. """
+        self.assertEqual(None, self.__project.fetch_workers())
+
+    def test_default_metric_source_settings(self):
+        """ Test that the project returns empty settings for a metric source class by default. """
+        self.assertEqual(dict(), self.__project.metric_source_settings(''.__class__))
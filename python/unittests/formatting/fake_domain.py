@@ -56,9 +56,15 @@ class Product(object):
 class Metric(object):
     """ Fake a metric class. """
 
-    def __init__(self, id_string='id_string-1', status_start_date=datetime.datetime(2012, 1, 1, 12, 0, 0)):
+    def __init__(self, id_string='id_string-1', status_start_date=datetime.datetime(2012, 1, 1, 12, 0, 0),
+                 stale_since=None):
         self.__id_string = id_string
         self.__status_start_date = status_start_date
+        self.__stale_since = stale_since
+
+    def snapshot(self):
+        """ Return the snapshot of the metric. """
+        return self
 
     @staticmethod
     def stable_id():
@@ -117,3 +123,7 @@ class Metric(object):
     def comment_url_label():
         """ Return the label for the urls. """
         return ''
+
+    def stale_since(self):
+        """ Return the date the metric was measured, if the metric is stale. """
+        return self.__stale_since
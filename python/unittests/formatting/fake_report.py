@@ -165,6 +165,18 @@ class Report(object):
         """ Return the metrics in the report. """
         return self.__metrics + self.__meta_metrics
 
+    @staticmethod
+    def status_index():
+        """ Return a fake status index. """
+        class FakeStatusIndex(object):  # pylint: disable=too-few-public-methods
+            """ Fake a status index. """
+            @staticmethod
+            def statuses(section_id):  # pylint: disable=unused-argument
+                """ Return the number of metrics per status. """
+                return dict(green=1)
+
+        return FakeStatusIndex()
+
     @staticmethod
     def dashboard():
         """ Return the columns and rows of the dashboard. """
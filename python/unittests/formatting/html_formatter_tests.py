@@ -33,6 +33,11 @@ class HTMLFormatterTest(unittest.TestCase):
         self.assertTrue('<title>Report title</title>' in
                         self.__formatter.prefix(fake_report.Report([fake_domain.Product()])))
 
+    def test_section_summaries_in_prefix(self):
+        """ Test that the number of metrics per status per section is passed to the dashboard. """
+        prefix = self.__formatter.prefix(fake_report.Report([fake_domain.Product()]))
+        self.assertTrue('{"id": {"green": 1}})' in prefix)
+
     def test_postfix(self):
         """ Test that the postfix closes the html tag. """
         self.assertTrue(self.__formatter.postfix().strip().endswith('</html>'))
@@ -86,6 +91,17 @@ class HTMLFormatterTest(unittest.TestCase):
         self.assertTrue('title="Direct actie vereist: norm niet gehaald of '
                         'meting te oud (sinds {})'.format(expected_formatted_date) in html)
 
+    def test_stale_metric(self):
+        """ Test that the text of a stale metric says how old the value is. """
+        stale_since = datetime.datetime.now() - datetime.timedelta(hours=2, minutes=1)
+        html = self.__formatter.process(fake_report.Report(metrics=[fake_domain.Metric(stale_since=stale_since)]))
+        self.assertTrue('[Verouderd: gemeten 2 uur geleden' in html)
+
+    def test_metric_not_stale(self):
+        """ Test that the text of a metric that isn't stale has no staleness marker. """
+        html = self.__formatter.process(fake_report.Report(metrics=[fake_domain.Metric()]))
+        self.assertFalse('Verouderd' in html)
+
     def test_history(self):
         """ Test that the report contains the history of the meta metrics. """
         html = self.__formatter.process(fake_report.Report())
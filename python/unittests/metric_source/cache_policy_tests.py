@@ -0,0 +1,55 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib.metric_source import cache_policy, url_opener
+
+
+class SlowlyChangingUrlOpener(url_opener.UrlOpener):
+    """ Url opener class with a time to live of its own. """
+    pass
+
+
+class CachePolicyTest(unittest.TestCase):
+    """ Unit tests for the cache policy. """
+
+    def setUp(self):
+        self.__policy = cache_policy.CachePolicy(
+            ttls={url_opener.UrlOpener: 60, SlowlyChangingUrlOpener: 3600},
+            url_ttls={url_opener.UrlOpener: {r'/api/profiles/': 86400}})
+
+    def test_no_ttl(self):
+        """ Test that there's no time to live without settings. """
+        self.assertEqual(0, cache_policy.CachePolicy().ttl(url_opener.UrlOpener(), 'http://url'))
+
+    def test_class_ttl(self):
+        """ Test that the time to live of the url opener class is used. """
+        self.assertEqual(60, self.__policy.ttl(url_opener.UrlOpener(), 'http://url'))
+
+    def test_subclass_ttl(self):
+        """ Test that the time to live of the most specific class is used. """
+        self.assertEqual(3600, self.__policy.ttl(SlowlyChangingUrlOpener(), 'http://url'))
+
+    def test_url_ttl(self):
+        """ Test that the time to live of a matching url pattern takes precedence. """
+        self.assertEqual(86400, self.__policy.ttl(SlowlyChangingUrlOpener(), 'http://sonar/api/profiles/list'))
+
+    def test_default_cache_policy(self):
+        """ Test that the default cache policy can be set. """
+        cache_policy.set_default_cache_policy(self.__policy)
+        self.assertTrue(self.__policy is cache_policy.default_cache_policy())
+        cache_policy.set_default_cache_policy(None)
@@ -0,0 +1,256 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import httplib
+import socket
+import StringIO
+import unittest
+import urllib2
+import zlib
+
+from qualitylib.metric_source import connection_pool
+
+
+class FakeHTTPResponse(object):  # pylint: disable=too-few-public-methods
+    """ Fake a response read by a HTTP connection. """
+
+    def __init__(self, contents='contents', will_close=False, headers=''):
+        self.msg = httplib.HTTPMessage(StringIO.StringIO('Content-Type: text/plain\r\n' + headers + '\r\n'))
+        self.status = httplib.OK
+        self.reason = 'OK'
+        self.will_close = will_close
+        self.__contents = StringIO.StringIO(contents)
+
+    def getheader(self, name):
+        """ Return the header. """
+        return self.msg.getheader(name)
+
+    def read(self, size=-1):
+        """ Return the (rest of the) contents. """
+        return self.__contents.read(size)
+
+
+class FakeSocket(object):  # pylint: disable=too-few-public-methods
+    """ Fake a socket. """
+
+    def __init__(self):
+        self.timeout = None
+
+    def settimeout(self, timeout):
+        """ Set the timeout. """
+        self.timeout = timeout
+
+
+class FakeConnection(object):
+    """ Fake a HTTP connection. """
+
+    def __init__(self, response=None, error=None):
+        self.requests = []
+        self.closed = False
+        self.sock = FakeSocket()
+        self.__response = response or FakeHTTPResponse()
+        self.__error = error
+
+    def request(self, method, selector, data, headers):
+        """ Record the request. """
+        if self.__error:
+            raise self.__error  # pylint: disable=raising-bad-type
+        self.requests.append((method, selector, data, headers))
+
+    def getresponse(self):
+        """ Return the response. """
+        return self.__response
+
+    def close(self):
+        """ Close the connection. """
+        self.closed = True
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    """ Unit tests for the connection pool. """
+
+    def setUp(self):
+        self.__pool = connection_pool.ConnectionPool()
+
+    def test_new_connection(self):
+        """ Test that a new connection is created when there's no idle connection. """
+        connection = FakeConnection()
+        self.assertEqual((connection, False), self.__pool.acquire('host', lambda: connection))
+
+    def test_reuse_connection(self):
+        """ Test that a released connection is reused for the same host. """
+        connection = FakeConnection()
+        self.__pool.release('host', self.__pool.acquire('host', lambda: connection)[0])
+        self.assertEqual((connection, True), self.__pool.acquire('host', FakeConnection))
+
+    def test_other_host(self):
+        """ Test that a released connection isn't reused for another host. """
+        self.__pool.release('host', self.__pool.acquire('host', FakeConnection)[0])
+        self.assertFalse(self.__pool.acquire('other host', FakeConnection)[1])
+
+    def test_release_unusable_connection(self):
+        """ Test that a released connection that can't be reused is closed. """
+        connection = self.__pool.acquire('host', FakeConnection)[0]
+        self.__pool.release('host', connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertFalse(self.__pool.acquire('host', FakeConnection)[1])
+
+    def test_close(self):
+        """ Test that closing the pool closes the idle connections. """
+        connection = self.__pool.acquire('host', FakeConnection)[0]
+        self.__pool.release('host', connection)
+        self.__pool.close()
+        self.assertTrue(connection.closed)
+
+    def test_failing_connect(self):
+        """ Test that the exception of a connection that can't be created is raised. """
+        def connect():
+            """ Fail to connect. """
+            raise socket.error('connection refused')
+        self.assertRaises(socket.error, self.__pool.acquire, 'host', connect)
+
+    def test_idle_connections(self):
+        """ Test that all connections in use at the same time are kept as idle connections. """
+        connections = [self.__pool.acquire('host', FakeConnection)[0] for _ in range(3)]
+        for connection in connections:
+            self.__pool.release('host', connection)
+        self.assertEqual([True] * 3, [self.__pool.acquire('host', FakeConnection)[1] for _ in range(3)])
+
+
+class KeepAliveHandlerTest(unittest.TestCase):
+    """ Unit tests for the keep-alive url handler. """
+
+    def setUp(self):
+        self.__pool = connection_pool.ConnectionPool()
+        self.__opener = urllib2.build_opener(connection_pool.KeepAliveHandler(self.__pool))
+
+    def __add_idle_connections(self, *connections):
+        """ Add the connections to the pool as idle connections for the host. The last one is used first. """
+        key = (httplib.HTTPConnection, 'host')
+        for connection in connections:
+            self.__pool.acquire(key, lambda connection=connection: connection)
+        for connection in connections:
+            self.__pool.release(key, connection)
+
+    def test_open(self):
+        """ Test that the request is sent over the idle connection and the response is returned. """
+        connection = FakeConnection()
+        self.__add_idle_connections(connection)
+        response = self.__opener.open('http://host/path')
+        self.assertEqual('contents', response.read())
+        self.assertEqual(200, response.getcode())
+        self.assertEqual('/path', connection.requests[0][1])
+        self.assertEqual('keep-alive', connection.requests[0][3]['Connection'])
+
+    def test_read_timeout(self):
+        """ Test that the read timeout of the request is applied to the connection. """
+        connection = FakeConnection()
+        self.__add_idle_connections(connection)
+        request = urllib2.Request('http://host/path')
+        request.read_timeout = 30
+        self.__opener.open(request)
+        self.assertEqual(30, connection.sock.timeout)
+
+    def test_accept_encoding(self):
+        """ Test that the server is told it may compress the response. """
+        connection = FakeConnection()
+        self.__add_idle_connections(connection)
+        self.__opener.open('http://host/path')
+        self.assertEqual('gzip, deflate', connection.requests[0][3]['Accept-Encoding'])
+
+    def test_gzip(self):
+        """ Test that a gzip encoded response is decompressed. """
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        contents = compressor.compress('contents' * 100) + compressor.flush()
+        self.__add_idle_connections(FakeConnection(
+            response=FakeHTTPResponse(contents, headers='Content-Encoding: gzip\r\n')))
+        response = self.__opener.open('http://host/path')
+        self.assertEqual('contents' * 100, response.read())
+        self.assertEqual(None, response.info().getheader('Content-Encoding'))
+
+    def test_connection_is_reused(self):
+        """ Test that the connection is given back to the pool after the response is read. """
+        connection = FakeConnection()
+        self.__add_idle_connections(connection)
+        self.__opener.open('http://host/1')
+        self.__opener.open('http://host/2')
+        self.assertEqual(2, len(connection.requests))
+
+    def test_connection_closed_by_server(self):
+        """ Test that a connection the server wants to close isn't reused. """
+        connection = FakeConnection(response=FakeHTTPResponse(will_close=True))
+        self.__add_idle_connections(connection)
+        self.__opener.open('http://host/path')
+        self.assertTrue(connection.closed)
+
+    def test_resend_on_stale_connection(self):
+        """ Test that the request is sent again if the idle connection turns out to be closed. """
+        stale_connection = FakeConnection(error=httplib.BadStatusLine(''))
+        connection = FakeConnection()
+        self.__add_idle_connections(connection, stale_connection)
+        self.assertEqual('contents', self.__opener.open('http://host/path').read())
+        self.assertTrue(stale_connection.closed)
+
+    def test_no_resend_after_timeout(self):
+        """ Test that the request isn't sent again if it timed out. """
+        self.__add_idle_connections(FakeConnection(), FakeConnection(error=socket.timeout('timed out')))
+        self.assertRaises(urllib2.URLError, self.__opener.open, 'http://host/path')
+
+    def test_unexpected_exception(self):
+        """ Test that the connection is closed and given back to the pool if sending the request fails
+            unexpectedly. """
+        connection = FakeConnection(error=ValueError('unexpected'))
+        self.__add_idle_connections(connection)
+        self.assertRaises(ValueError, self.__opener.open, 'http://host/path')
+        self.assertTrue(connection.closed)
+        self.assertFalse(self.__pool.acquire((httplib.HTTPConnection, 'host'), FakeConnection)[1])
+
+    def test_http_error(self):
+        """ Test that HTTP errors are raised as usual. """
+        response = FakeHTTPResponse()
+        response.status, response.reason = httplib.NOT_FOUND, 'Not Found'
+        self.__add_idle_connections(FakeConnection(response=response))
+        self.assertRaises(urllib2.HTTPError, self.__opener.open, 'http://host/path')
+
+
+class ReadDecompressedTest(unittest.TestCase):
+    """ Unit tests for reading compressed responses. """
+
+    def test_uncompressed(self):
+        """ Test that an uncompressed response is read as is. """
+        self.assertEqual('contents', connection_pool.read_decompressed(FakeHTTPResponse('contents')))
+
+    def test_deflate(self):
+        """ Test that a deflate encoded response is decompressed, in chunks. """
+        response = FakeHTTPResponse(zlib.compress('contents' * 100), headers='Content-Encoding: deflate\r\n')
+        self.assertEqual('contents' * 100, connection_pool.read_decompressed(response, chunk_size=10))
+
+    def test_raw_deflate(self):
+        """ Test that a deflate encoded response without zlib header is decompressed. """
+        response = FakeHTTPResponse(zlib.compress('contents')[2:-4], headers='Content-Encoding: deflate\r\n')
+        self.assertEqual('contents', connection_pool.read_decompressed(response))
+
+    def test_headers(self):
+        """ Test that the headers of a decompressed response don't mention the encoding and compressed length. """
+        response = FakeHTTPResponse(zlib.compress('contents'),
+                                    headers='Content-Encoding: deflate\r\nContent-Length: 16\r\n')
+        connection_pool.read_decompressed(response)
+        self.assertEqual((None, None), (response.getheader('Content-Encoding'), response.getheader('Content-Length')))
+
+    def test_invalid_contents(self):
+        """ Test that invalid compressed contents raise an exception. """
+        response = FakeHTTPResponse('not compressed', headers='Content-Encoding: gzip\r\n')
+        self.assertRaises(httplib.HTTPException, connection_pool.read_decompressed, response)
@@ -0,0 +1,86 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import httplib
+import StringIO
+import subprocess
+import unittest
+import urllib
+import urllib2
+
+from qualitylib.metric_source import fetch_plan, latency_stats, response_cache
+
+
+class FakeSource(object):  # pylint: disable=too-few-public-methods
+    """ Metric source class to record calls for. """
+    pass
+
+
+class FetchPlanTest(unittest.TestCase):
+    """ Unit tests for the fetch plan. """
+
+    def setUp(self):
+        self.__cache = response_cache.ResponseCache()
+        self.__stats = latency_stats.LatencyStats()
+        self.__plan = fetch_plan.FetchPlan(self.__cache, self.__stats)
+
+    def test_no_calls(self):
+        """ Test the report without calls. """
+        self.assertEqual('Total: 0 calls, estimated 0.0 seconds\n', self.__plan.report())
+
+    def test_url_not_opened(self):
+        """ Test that urls without cached response aren't opened. """
+        self.assertRaises(urllib2.URLError, self.__plan.response, FakeSource(), 'http://url')
+
+    def test_cached_response(self):
+        """ Test that the cached response is returned. """
+        self.__cache.store('http://url', urllib.addinfourl(
+            StringIO.StringIO('contents'), httplib.HTTPMessage(StringIO.StringIO('ETag: "1"\r\n')), 'http://url', 200))
+        self.assertEqual('contents', self.__plan.response(FakeSource(), 'http://url').read())
+
+    def test_request(self):
+        """ Test that requests are recorded by their url. """
+        self.assertRaises(urllib2.URLError, self.__plan.response, FakeSource(), urllib2.Request('http://url'))
+        self.assertTrue('1 x http://url\n' in self.__plan.report())
+
+    def test_shell_command(self):
+        """ Test that shell commands are recorded and fail without being run. """
+        self.assertRaises(subprocess.CalledProcessError, self.__plan.shell_command, FakeSource(), ['git', 'pull'])
+        self.assertTrue('1 x git pull\n' in self.__plan.report())
+
+    def test_report(self):
+        """ Test that calls are grouped by metric source class and url pattern, with the urls per pattern. """
+        for url in 'http://url/job/1', 'http://url/job/2', 'http://url/job/1', 'http://url':
+            self.assertRaises(urllib2.URLError, self.__plan.response, FakeSource(), url)
+        self.assertEqual('FakeSource: 4 calls to 3 urls or commands, estimated 0.0 seconds\n'
+                         '     2 x http://url/job/#\n'
+                         '           http://url/job/1\n'
+                         '           http://url/job/2\n'
+                         '     1 x http://url\n'
+                         'Total: 4 calls, estimated 0.0 seconds\n', self.__plan.report())
+
+    def test_estimated_duration(self):
+        """ Test that the duration is estimated with the recorded latencies, counting repeated calls once. """
+        self.__stats.record('urls', 'http://url/job/#', 1.5)
+        for url in 'http://url/job/1', 'http://url/job/2', 'http://url/job/2':
+            self.assertRaises(urllib2.URLError, self.__plan.response, FakeSource(), url)
+        self.assertTrue(self.__plan.report().endswith('Total: 3 calls, estimated 3.0 seconds\n'))
+
+    def test_without_latencies(self):
+        """ Test that the duration isn't estimated without latencies. """
+        plan = fetch_plan.FetchPlan()
+        self.assertRaises(urllib2.URLError, plan.response, FakeSource(), 'http://url')
+        self.assertTrue(plan.report().endswith('Total: 1 calls, estimated 0.0 seconds\n'))
@@ -0,0 +1,169 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import socket
+import StringIO
+import threading
+import unittest
+import urllib
+import urllib2
+
+from qualitylib.metric_source import fetcher
+
+
+class FetcherTest(unittest.TestCase):
+    """ Unit tests for the fetcher. """
+
+    def setUp(self):
+        self.__fetcher = fetcher.Fetcher(nr_workers=2)
+
+    def test_nr_workers(self):
+        """ Test the number of workers. """
+        self.assertEqual(2, self.__fetcher.nr_workers())
+
+    def test_more_workers(self):
+        """ Test that more functions can run simultaneously after increasing the number of workers. """
+        self.__fetcher.run(lambda: None)
+        self.__fetcher.set_nr_workers(3)
+        release = threading.Event()
+        started = [threading.Event() for _ in range(3)]
+
+        def wait(index):
+            """ Signal that the function started and wait to be released. """
+            started[index].set()
+            release.wait()
+        for index in range(3):
+            self.__fetcher.submit(wait, index)
+        self.assertTrue(all(event.wait(5) for event in started))
+        release.set()
+        self.assertEqual(3, self.__fetcher.nr_workers())
+
+    def test_fewer_workers(self):
+        """ Test that superfluous workers stop after decreasing the number of workers. """
+        self.__fetcher.run(lambda: None)
+        self.__fetcher.set_nr_workers(1)
+        release = threading.Event()
+        first = self.__fetcher.submit(release.wait)
+        second = self.__fetcher.submit(lambda: 'done')
+        self.assertRaises(socket.timeout, second.result, timeout=0.05)
+        release.set()
+        self.assertTrue(first.result(timeout=5))
+        self.assertEqual('done', second.result(timeout=5))
+
+    def test_run(self):
+        """ Test that the fetcher runs the function and returns the result. """
+        self.assertEqual('http://url', self.__fetcher.run(lambda url: url, 'http://url'))
+
+    def test_run_in_worker(self):
+        """ Test that the function is run by a worker thread. """
+        self.assertNotEqual(threading.current_thread(), self.__fetcher.run(threading.current_thread))
+
+    def test_exception(self):
+        """ Test that the exception raised by the function is raised by run. """
+        def raise_error(url):
+            """ Raise an exception. """
+            raise urllib2.URLError(url)
+        self.assertRaises(urllib2.URLError, self.__fetcher.run, raise_error, 'http://url')
+
+    def test_result_timeout(self):
+        """ Test that waiting for a result that isn't done within the timeout raises a timeout exception. """
+        release = threading.Event()
+        pending = self.__fetcher.submit(release.wait)
+        self.assertRaises(socket.timeout, pending.result, timeout=0.01)
+        release.set()
+        self.assertTrue(pending.result(timeout=5))
+
+    def test_submit(self):
+        """ Test that many functions can be submitted and are all done. """
+        pending_results = [self.__fetcher.submit(lambda index: index * 2, index) for index in range(100)]
+        self.assertEqual([index * 2 for index in range(100)], [pending.result() for pending in pending_results])
+        self.assertTrue(all(pending.done() for pending in pending_results))
+
+    def test_bounded(self):
+        """ Test that no more functions are run simultaneously than there are workers. """
+        lock = threading.Lock()
+        running = [0, 0]  # Current and maximum number of simultaneous runs
+
+        def run():
+            """ Keep track of the number of simultaneous runs. """
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            threading.Event().wait(0.01)
+            with lock:
+                running[0] -= 1
+
+        for pending in [self.__fetcher.submit(run) for _ in range(10)]:
+            pending.result()
+        self.assertEqual(2, running[1])
+
+    def test_slowest_first(self):
+        """ Test that queued functions with the highest expected latency are started first. """
+        single_worker_fetcher = fetcher.Fetcher(nr_workers=1)
+        release = threading.Event()
+        single_worker_fetcher.submit(release.wait)  # Keep the worker busy while the other functions are queued
+        started = []
+        pending_results = [single_worker_fetcher.submit(started.append, name, expected_latency=latency)
+                           for name, latency in (('fast', 0.1), ('unknown', 0.), ('slow', 10.), ('medium', 1.))]
+        release.set()
+        for pending in pending_results:
+            pending.result(timeout=5)
+        self.assertEqual(['slow', 'medium', 'fast', 'unknown'], started)
+
+    def test_nested_submit(self):
+        """ Test that functions submitted by a worker are run immediately instead of waiting for a free worker. """
+        fetcher_with_one_worker = fetcher.Fetcher(nr_workers=1)
+        self.assertEqual('nested', fetcher_with_one_worker.run(lambda: fetcher_with_one_worker.run(lambda: 'nested')))
+
+
+class BufferedTest(unittest.TestCase):
+    """ Unit tests for reading responses into memory. """
+
+    def test_without_read(self):
+        """ Test that responses without read method are returned as is. """
+        self.assertEqual('contents', fetcher.buffered('contents'))
+
+    def test_file_like(self):
+        """ Test that the contents of file like responses are read. """
+        self.assertEqual('contents', fetcher.buffered(StringIO.StringIO('contents')).read())
+
+    def test_response(self):
+        """ Test that the headers, url and status code of responses are kept. """
+        response = urllib.addinfourl(StringIO.StringIO('contents'), {'ETag': '1'}, 'http://url', 200)
+        buffered_response = fetcher.buffered(response)
+        self.assertEqual(('contents', {'ETag': '1'}, 'http://url', 200),
+                         (buffered_response.read(), buffered_response.info(), buffered_response.geturl(),
+                          buffered_response.getcode()))
+
+
+class SizeTest(unittest.TestCase):
+    """ Unit tests for the size of buffered responses. """
+
+    def test_size(self):
+        """ Test the size of a buffered response. """
+        self.assertEqual(8, fetcher.size(fetcher.buffered(StringIO.StringIO('contents'))))
+
+    def test_unknown_size(self):
+        """ Test that the size of other responses is unknown. """
+        self.assertEqual(None, fetcher.size('contents'))
+
+
+class DefaultFetcherTest(unittest.TestCase):
+    """ Unit tests for the default fetcher. """
+
+    def test_shared(self):
+        """ Test that the default fetcher is shared. """
+        self.assertTrue(fetcher.default_fetcher() is fetcher.default_fetcher())
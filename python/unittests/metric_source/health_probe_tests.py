@@ -0,0 +1,89 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import unittest
+
+from qualitylib.metric_source import fetcher, health_probe
+
+
+class FakeUrlOpener(object):
+    """ Fake a url opener that is reachable or not. """
+
+    def __init__(self, url='http://url', reachable=True, release=None):
+        self.__url = url
+        self.__reachable = reachable
+        self.__release = release
+
+    def url(self):
+        """ Return the url of the url opener. """
+        return self.__url
+
+    def is_reachable(self, url, timeout=None):  # pylint: disable=unused-argument
+        """ Return whether the url opener is reachable, after the release event is set, if any. """
+        self.timeout = timeout  # pylint: disable=attribute-defined-outside-init
+        if self.__release:
+            self.__release.wait(5)
+        return self.__reachable
+
+
+class HealthProbeTest(unittest.TestCase):
+    """ Unit tests for the health probe. """
+
+    def setUp(self):
+        self.__probe = health_probe.HealthProbe(fetcher=fetcher.Fetcher(nr_workers=2))
+
+    def test_reachable(self):
+        """ Test that reachable url openers are available. """
+        url_opener = FakeUrlOpener()
+        self.assertEqual([], self.__probe.probe([url_opener]))
+        self.__probe.check(url_opener)
+
+    def test_unreachable(self):
+        """ Test that url openers that can't be reached are unavailable. """
+        url_opener = FakeUrlOpener(reachable=False)
+        self.assertEqual([url_opener], self.__probe.probe([url_opener]))
+        self.assertRaises(health_probe.SourceUnavailable, self.__probe.check, url_opener)
+
+    def test_timeout_passed_to_url_opener(self):
+        """ Test that the url openers get the timeout of the probe, so they don't keep trying longer. """
+        url_opener = FakeUrlOpener()
+        health_probe.HealthProbe(timeout=3, fetcher=fetcher.Fetcher(nr_workers=1)).probe([url_opener])
+        self.assertEqual(3, url_opener.timeout)
+
+    def test_without_url(self):
+        """ Test that url openers without url aren't probed. """
+        url_opener = FakeUrlOpener(url='', reachable=False)
+        self.assertEqual([], self.__probe.probe([url_opener]))
+        self.__probe.check(url_opener)
+
+    def test_unprobed(self):
+        """ Test that url openers that weren't probed are available. """
+        self.__probe.check(FakeUrlOpener())
+
+    def test_timeout(self):
+        """ Test that url openers that don't answer within the timeout are unavailable. """
+        release = threading.Event()
+        url_opener = FakeUrlOpener(release=release)
+        probe = health_probe.HealthProbe(timeout=0.01, fetcher=fetcher.Fetcher(nr_workers=1))
+        self.assertEqual([url_opener], probe.probe([url_opener]))
+        release.set()
+
+    def test_default_health_probe(self):
+        """ Test that the default health probe can be set. """
+        health_probe.set_default_health_probe(self.__probe)
+        self.assertTrue(self.__probe is health_probe.default_health_probe())
+        health_probe.set_default_health_probe(None)
@@ -0,0 +1,180 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+import unittest
+
+from qualitylib.metric_source import host_limiter
+
+
+class FakeClock(object):  # pylint: disable=too-few-public-methods
+    """ Fake a clock that is advanced by sleeping. """
+
+    def __init__(self):
+        self.now = 1000.
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """ Advance the clock. """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+    """ Unit tests for the token bucket. """
+
+    def setUp(self):
+        self.__clock = FakeClock()
+        self.__bucket = host_limiter.TokenBucket(2, clock=self.__clock)
+
+    def test_burst(self):
+        """ Test that one second worth of requests doesn't have to wait. """
+        self.assertEqual([0., 0.], [self.__bucket.delay(), self.__bucket.delay()])
+
+    def test_rate(self):
+        """ Test that requests exceeding the rate wait in order. """
+        self.__bucket.delay()
+        self.__bucket.delay()
+        self.assertEqual([0.5, 1.], [self.__bucket.delay(), self.__bucket.delay()])
+
+    def test_refill(self):
+        """ Test that tokens become available again as time passes. """
+        self.__bucket.delay()
+        self.__bucket.delay()
+        self.__clock.now += 0.5
+        self.assertEqual(0., self.__bucket.delay())
+
+    def test_slow_rate(self):
+        """ Test that a rate below one request per second allows one request at a time. """
+        bucket = host_limiter.TokenBucket(0.5, clock=self.__clock)
+        self.assertEqual([0., 2.], [bucket.delay(), bucket.delay()])
+
+
+class HostLimiterTest(unittest.TestCase):
+    """ Unit tests for the host limiter. """
+
+    def setUp(self):
+        self.__clock = FakeClock()
+        self.__limiter = host_limiter.HostLimiter(clock=self.__clock, sleep=self.__clock.sleep)
+
+    def test_no_limits(self):
+        """ Test that requests don't wait without limits. """
+        for _ in range(3):
+            with self.__limiter.limit('host'):
+                pass
+        self.assertEqual([], self.__clock.sleeps)
+
+    def test_requests_per_second(self):
+        """ Test that requests wait for the rate limit of the host. """
+        for _ in range(2):
+            with self.__limiter.limit('host', requests_per_second=1):
+                pass
+        self.assertEqual([1.], self.__clock.sleeps)
+
+    def test_rate_per_host(self):
+        """ Test that the rate limit applies per host. """
+        for host in 'host', 'other':
+            with self.__limiter.limit(host, requests_per_second=1):
+                pass
+        self.assertEqual([], self.__clock.sleeps)
+
+    def test_pause(self):
+        """ Test that requests wait until the pause of the host is over. """
+        self.__limiter.pause('host', 30)
+        with self.__limiter.limit('host'):
+            pass
+        self.assertEqual([30.], self.__clock.sleeps)
+
+    def test_wait_before_taking_connection(self):
+        """ Test that a request waiting for the pause of its host doesn't hold a connection meanwhile. """
+        sleeping, release, entered = threading.Event(), threading.Event(), threading.Event()
+        entered_while_paused = []
+
+        def sleep(seconds):  # pylint: disable=unused-argument
+            """ Block until released. """
+            sleeping.set()
+            release.wait(5)
+
+        limiter = host_limiter.HostLimiter(clock=self.__clock, sleep=sleep)
+        limiter.pause('host', 30)
+
+        def request(event=None):
+            """ Make a request and signal the event, if any, when the request is in progress. """
+            with limiter.limit('host', max_connections=1):
+                if event:
+                    event.set()
+
+        paused_request = threading.Thread(target=request)
+        paused_request.start()
+        try:
+            sleeping.wait(5)
+            self.__clock.now += 30  # The pause is over for requests that start now
+            other_request = threading.Thread(target=request, args=(entered,))
+            other_request.start()
+            entered_while_paused.append(entered.wait(1))
+        finally:
+            release.set()
+        paused_request.join()
+        other_request.join()
+        self.assertEqual([True], entered_while_paused)
+
+    def test_most_restrictive_rate(self):
+        """ Test that the lowest rate limit used for a host applies. """
+        for requests_per_second in None, 1, 2, None:
+            with self.__limiter.limit('host', requests_per_second=requests_per_second):
+                pass
+        self.assertEqual([1., 1.], self.__clock.sleeps)
+
+    def test_default_max_connections(self):
+        """ Test that the default maximum number of connections applies to hosts without maximum. """
+        limiter = host_limiter.HostLimiter(default_max_connections=1)
+        entered = threading.Event()
+
+        def request():
+            """ Make a request. """
+            with limiter.limit('host'):
+                entered.set()
+
+        with limiter.limit('host'):
+            thread = threading.Thread(target=request)
+            thread.start()
+            self.assertFalse(entered.wait(0.1))
+        thread.join()
+        self.assertTrue(entered.is_set())
+
+    def test_max_connections(self):
+        """ Test that the number of concurrent requests per host is limited. """
+        limiter = host_limiter.HostLimiter()
+        in_progress, entered = threading.Event(), threading.Event()
+        done = threading.Event()
+
+        def request():
+            """ Make a request while another request is in progress. """
+            in_progress.wait()
+            with limiter.limit('host', max_connections=1):
+                entered.set()
+
+        with limiter.limit('host', max_connections=1):
+            thread = threading.Thread(target=request)
+            thread.start()
+            in_progress.set()
+            done.wait(0.1)
+            self.assertFalse(entered.is_set())
+        thread.join()
+        self.assertTrue(entered.is_set())
@@ -0,0 +1,82 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from qualitylib.metric_source import latency_stats
+
+
+class LatencyStatsTest(unittest.TestCase):
+    """ Unit tests for the latency stats. """
+
+    def setUp(self):
+        self.__folder = tempfile.mkdtemp()
+        self.__filename = os.path.join(self.__folder, 'latencies.json')
+        self.__stats = latency_stats.LatencyStats(self.__filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.__folder)
+
+    def test_unknown_key(self):
+        """ Test that unknown keys are expected to take no time. """
+        self.assertEqual(0., self.__stats.expected('urls', 'http://url'))
+
+    def test_record(self):
+        """ Test that the first recorded latency is the expected latency. """
+        self.__stats.record('urls', 'http://url', 2.)
+        self.assertEqual(2., self.__stats.expected('urls', 'http://url'))
+
+    def test_moving_average(self):
+        """ Test that later latencies are averaged with the previous latencies. """
+        self.__stats.record('urls', 'http://url', 2.)
+        self.__stats.record('urls', 'http://url', 12.)
+        self.assertAlmostEqual(5., self.__stats.expected('urls', 'http://url'))
+
+    def test_kinds(self):
+        """ Test that latencies of different kinds are kept apart. """
+        self.__stats.record('urls', 'key', 2.)
+        self.assertEqual(0., self.__stats.expected('metric_sources', 'key'))
+
+    def test_slowest_first(self):
+        """ Test that keys are sorted by expected latency, slowest first, and that unknown keys keep their order. """
+        self.__stats.record('urls', 'slow', 2.)
+        self.assertEqual(['slow', 'a', 'b'], self.__stats.slowest_first('urls', ['a', 'slow', 'b']))
+
+    def test_save_and_load(self):
+        """ Test that the latencies are kept between runs. """
+        self.__stats.record('urls', 'http://url', 2.)
+        self.__stats.save()
+        self.assertEqual(2., latency_stats.LatencyStats(self.__filename).expected('urls', 'http://url'))
+        self.assertEqual(['latencies.json'], os.listdir(self.__folder))
+
+    def test_save_without_filename(self):
+        """ Test that latencies without filename aren't saved. """
+        latency_stats.LatencyStats().save()
+        self.assertEqual([], os.listdir(self.__folder))
+
+    def test_corrupt_file(self):
+        """ Test that a corrupt file is ignored. """
+        with open(self.__filename, 'w') as latency_file:
+            latency_file.write('corrupt')
+        self.assertEqual(0., latency_stats.LatencyStats(self.__filename).expected('urls', 'http://url'))
+
+    def test_url_pattern(self):
+        """ Test that numbers in urls are replaced. """
+        self.assertEqual('http://jenkins/job/a/#/api/python',
+                         latency_stats.url_pattern('http://jenkins/job/a/42/api/python'))
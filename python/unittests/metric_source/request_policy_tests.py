@@ -0,0 +1,263 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import email.utils
+import httplib
+import socket
+import StringIO
+import threading
+import time
+import unittest
+import urllib2
+
+from qualitylib.metric_source import request_policy, run_budget, url_opener
+
+
+class PatientUrlOpener(url_opener.UrlOpener):
+    """ Url opener class with settings of its own. """
+    pass
+
+
+class FakeHost(object):  # pylint: disable=too-few-public-methods
+    """ Fake a host that fails a number of times before it answers. """
+
+    def __init__(self, failures=0, exception=None):
+        self.requests = []
+        self.__failures = failures
+        self.__exception = exception or socket.error('connection reset')
+
+    def open(self, request):
+        """ Fail or return the response. """
+        self.requests.append(request)
+        if len(self.requests) <= self.__failures:
+            raise self.__exception
+        return 'response'
+
+
+class FakeClock(object):  # pylint: disable=too-few-public-methods
+    """ Fake a clock that is advanced by sleeping. """
+
+    def __init__(self):
+        self.now = 1000.
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """ Advance the clock. """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def http_error(code, headers):
+    """ Create an HTTP error with the code and headers. """
+    return urllib2.HTTPError('http://host/path', code, 'Error', httplib.HTTPMessage(StringIO.StringIO(headers)), None)
+
+
+class RequestPolicyTest(unittest.TestCase):
+    """ Unit tests for the request policy. """
+
+    def setUp(self):
+        self.__delays = []
+        self.__policy = request_policy.RequestPolicy(
+            settings={PatientUrlOpener: dict(retries=4, read_timeout=300)}, sleep=self.__delays.append,
+            jitter=lambda low, high: high)
+
+    def test_defaults(self):
+        """ Test that the defaults are used for url openers without settings. """
+        self.assertEqual(2, self.__policy.setting(url_opener.UrlOpener(), 'retries'))
+        self.assertEqual(8, self.__policy.setting(url_opener.UrlOpener(), 'max_connections'))
+
+    def test_settings(self):
+        """ Test that the settings of the url opener class are used. """
+        self.assertEqual(4, self.__policy.setting(PatientUrlOpener(), 'retries'))
+
+    def test_timeouts(self):
+        """ Test that the request gets the timeouts of the url opener. """
+        host = FakeHost()
+        self.__policy.open(PatientUrlOpener(), 'http://host/path', host.open)
+        self.assertEqual((10, 300), (host.requests[0].connect_timeout, host.requests[0].read_timeout))
+
+    def test_max_timeout(self):
+        """ Test that the timeouts of the request are at most the maximum timeout. """
+        host = FakeHost()
+        self.__policy.open(PatientUrlOpener(), 'http://host/path', host.open, max_timeout=5)
+        self.assertEqual((5, 5), (host.requests[0].connect_timeout, host.requests[0].read_timeout))
+
+    def test_success(self):
+        """ Test that the response is returned. """
+        self.assertEqual('response', self.__policy.open(url_opener.UrlOpener(), 'http://host/path', FakeHost().open))
+
+    def test_retry(self):
+        """ Test that a failing request is retried with exponential backoff. """
+        host = FakeHost(failures=2)
+        self.assertEqual('response', self.__policy.open(url_opener.UrlOpener(), 'http://host/path', host.open))
+        self.assertEqual([1., 2.], self.__delays)
+
+    def test_max_backoff(self):
+        """ Test that the backoff is bounded. """
+        host = FakeHost(failures=4)
+        self.__policy.open(PatientUrlOpener(), 'http://host/path', host.open)
+        self.assertEqual([1., 2., 4., 8.], self.__delays)
+        self.__delays[:] = []
+        request_policy.RequestPolicy(settings={PatientUrlOpener: dict(retries=4)}, max_backoff=3.,
+                                     sleep=self.__delays.append, jitter=lambda low, high: high).open(
+                                         PatientUrlOpener(), 'http://host/path', FakeHost(failures=4).open)
+        self.assertEqual([1., 2., 3., 3.], self.__delays)
+
+    def test_retries_exhausted(self):
+        """ Test that the exception is raised when the retries are exhausted. """
+        host = FakeHost(failures=3)
+        self.assertRaises(socket.error, self.__policy.open, url_opener.UrlOpener(), 'http://host/path', host.open)
+        self.assertEqual(3, len(host.requests))
+
+    def test_retry_temporary_server_error(self):
+        """ Test that a request that fails with a temporary server error is retried. """
+        host = FakeHost(failures=1, exception=urllib2.HTTPError('http://host/path', 503, 'Unavailable', None, None))
+        self.assertEqual('response', self.__policy.open(url_opener.UrlOpener(), 'http://host/path', host.open))
+
+    def test_no_retry_on_client_error(self):
+        """ Test that a request that fails with a client error isn't retried. """
+        host = FakeHost(failures=1, exception=urllib2.HTTPError('http://host/path', 404, 'Not Found', None, None))
+        self.assertRaises(urllib2.HTTPError, self.__policy.open, url_opener.UrlOpener(), 'http://host/path',
+                          host.open)
+        self.assertEqual(1, len(host.requests))
+
+    def test_no_retry_when_budget_exhausted(self):
+        """ Test that a request isn't retried when the run budget ran out. """
+        host = FakeHost(failures=1, exception=run_budget.BudgetExhausted('out of time'))
+        self.assertRaises(run_budget.BudgetExhausted, self.__policy.open, url_opener.UrlOpener(),
+                          'http://host/path', host.open)
+        self.assertEqual(1, len(host.requests))
+
+    def test_no_retry_of_delete(self):
+        """ Test that requests other than GET aren't retried. """
+        host = FakeHost(failures=1)
+        request = urllib2.Request('http://host/path')
+        request.get_method = lambda: 'DELETE'
+        self.assertRaises(socket.error, self.__policy.open, url_opener.UrlOpener(), request, host.open)
+        self.assertEqual(1, len(host.requests))
+
+    def test_retry_after_seconds(self):
+        """ Test that a request is retried after the number of seconds the host asks for. """
+        clock = FakeClock()
+        policy = request_policy.RequestPolicy(sleep=clock.sleep, clock=clock)
+        host = FakeHost(failures=1, exception=http_error(429, 'Retry-After: 30\r\n'))
+        self.assertEqual('response', policy.open(url_opener.UrlOpener(), 'http://host/path', host.open))
+        self.assertEqual([30.], clock.sleeps)
+
+    def test_retry_after_date(self):
+        """ Test that a request is retried after the date the host asks for. """
+        clock = FakeClock()
+        clock.now = email.utils.mktime_tz(email.utils.parsedate_tz('Mon, 01 Feb 2016 10:00:00 GMT'))
+        policy = request_policy.RequestPolicy(sleep=clock.sleep, clock=clock)
+        host = FakeHost(failures=1, exception=http_error(503, 'Retry-After: Mon, 01 Feb 2016 10:00:20 GMT\r\n'))
+        policy.open(url_opener.UrlOpener(), 'http://host/path', host.open)
+        self.assertEqual([20.], clock.sleeps)
+
+    def test_retry_after_too_long(self):
+        """ Test that a request isn't retried if the host asks to wait too long. """
+        host = FakeHost(failures=1, exception=http_error(429, 'Retry-After: 3600\r\n'))
+        self.assertRaises(urllib2.HTTPError, self.__policy.open, url_opener.UrlOpener(), 'http://host/path',
+                          host.open)
+        self.assertEqual(1, len(host.requests))
+
+    def test_too_many_requests_is_no_failure(self):
+        """ Test that a host that asks to slow down doesn't open the circuit breaker. """
+        policy = request_policy.RequestPolicy(settings={url_opener.UrlOpener: dict(retries=0, failure_threshold=1)})
+        self.assertRaises(urllib2.HTTPError, policy.open, url_opener.UrlOpener(), 'http://host/path',
+                          FakeHost(failures=1, exception=http_error(429, '')).open)
+        self.assertFalse(policy.is_open('host'))
+
+    def test_requests_per_second(self):
+        """ Test that the requests per second of the url opener limit the requests to the host. """
+        clock = FakeClock()
+        policy = request_policy.RequestPolicy(settings={url_opener.UrlOpener: dict(requests_per_second=2)},
+                                              sleep=clock.sleep, clock=clock)
+        for _ in range(3):
+            policy.open(url_opener.UrlOpener(), 'http://host/path', FakeHost().open)
+        self.assertEqual([0.5], clock.sleeps)
+
+    def test_most_restrictive_rate(self):
+        """ Test that the lowest requests per second configured for a host apply, also to requests of url openers
+            without settings, even if such a url opener opens a url of the host first. """
+        clock = FakeClock()
+        policy = request_policy.RequestPolicy(settings={PatientUrlOpener: dict(requests_per_second=1)},
+                                              sleep=clock.sleep, clock=clock)
+        for opener in url_opener.UrlOpener(), PatientUrlOpener(), PatientUrlOpener(), url_opener.UrlOpener():
+            policy.open(opener, 'http://host/path', FakeHost().open)
+        self.assertEqual([1., 1.], clock.sleeps)
+
+    def test_most_restrictive_max_connections(self):
+        """ Test that the lowest maximum number of connections configured for a host applies, even if a url opener
+            without settings opens a url of the host first. """
+        policy = request_policy.RequestPolicy(settings={PatientUrlOpener: dict(max_connections=2)})
+        policy.open(url_opener.UrlOpener(), 'http://host/path', FakeHost().open)
+        lock = threading.Lock()
+        connections = [0]
+        max_connections = [0]
+
+        def open_request(request):  # pylint: disable=unused-argument
+            """ Keep track of the number of concurrent requests. """
+            with lock:
+                connections[0] += 1
+                max_connections[0] = max(max_connections[0], connections[0])
+            time.sleep(0.05)
+            with lock:
+                connections[0] -= 1
+            return 'response'
+
+        threads = [threading.Thread(target=policy.open, args=(PatientUrlOpener(), 'http://host/path', open_request))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(2, max_connections[0])
+
+    def test_circuit_breaker(self):
+        """ Test that a host isn't asked anything anymore after it failed too often in a row. """
+        host = FakeHost(failures=5)
+        for _ in range(2):
+            self.assertRaises(socket.error, self.__policy.open, url_opener.UrlOpener(), 'http://host/path',
+                              host.open)
+        self.assertRaises(request_policy.CircuitOpen, self.__policy.open, url_opener.UrlOpener(), 'http://host/path',
+                          host.open)
+        self.assertTrue(self.__policy.is_open('host'))
+        self.assertEqual(5, len(host.requests))
+
+    def test_circuit_breaker_per_host(self):
+        """ Test that the circuit breaker of one host doesn't affect other hosts. """
+        policy = request_policy.RequestPolicy(settings={url_opener.UrlOpener: dict(retries=0, failure_threshold=1)})
+        self.assertRaises(socket.error, policy.open, url_opener.UrlOpener(), 'http://host/path',
+                          FakeHost(failures=1).open)
+        self.assertEqual('response', policy.open(url_opener.UrlOpener(), 'http://other/path', FakeHost().open))
+
+    def test_success_resets_failures(self):
+        """ Test that only consecutive failures count for the circuit breaker. """
+        policy = request_policy.RequestPolicy(settings={url_opener.UrlOpener: dict(retries=0, failure_threshold=2)})
+        for _ in range(3):
+            self.assertRaises(socket.error, policy.open, url_opener.UrlOpener(), 'http://host/path',
+                              FakeHost(failures=1).open)
+            policy.open(url_opener.UrlOpener(), 'http://host/path', FakeHost().open)
+        self.assertFalse(policy.is_open('host'))
+
+    def test_default_request_policy(self):
+        """ Test that the default request policy can be set. """
+        request_policy.set_default_request_policy(self.__policy)
+        self.assertTrue(self.__policy is request_policy.default_request_policy())
+        request_policy.set_default_request_policy(None)
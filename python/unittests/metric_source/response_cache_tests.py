@@ -0,0 +1,273 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import httplib
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+import urllib
+
+from qualitylib.metric_source import response_cache
+
+
+def response(contents='contents', headers='ETag: "1"\r\nLast-Modified: Mon, 01 Feb 2016 10:00:00 GMT\r\n'):
+    """ Create a response with the contents and headers. """
+    return urllib.addinfourl(StringIO.StringIO(contents), httplib.HTTPMessage(StringIO.StringIO(headers)),
+                             'http://url', 200)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """ Unit tests for the response cache. """
+
+    def setUp(self):
+        self.__folder = tempfile.mkdtemp()
+        self.__filename = os.path.join(self.__folder, 'response_cache.pickle')
+        self.__cache = response_cache.ResponseCache(self.__filename)
+        self.__now = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.__folder)
+
+    def test_no_validators(self):
+        """ Test that there are no validators for urls that haven't been cached. """
+        self.assertEqual({}, self.__cache.validators('http://url'))
+
+    def test_validators(self):
+        """ Test that the ETag and Last-Modified headers are returned as conditional request headers. """
+        self.__cache.store('http://url', response())
+        self.assertEqual({'If-None-Match': '"1"', 'If-Modified-Since': 'Mon, 01 Feb 2016 10:00:00 GMT'},
+                         self.__cache.validators('http://url'))
+
+    def test_store_returns_response(self):
+        """ Test that storing the response returns a response with the same contents. """
+        self.assertEqual('contents', self.__cache.store('http://url', response()).read())
+
+    def test_store_without_validators(self):
+        """ Test that responses without validators aren't cached. """
+        self.__cache.store('http://url', response(headers=''))
+        self.assertEqual({}, self.__cache.validators('http://url'))
+
+    def test_store_without_headers(self):
+        """ Test that responses without headers are returned as is. """
+        self.assertEqual('contents', self.__cache.store('http://url', 'contents'))
+
+    def test_not_modified(self):
+        """ Test that the cached response is returned when the url wasn't modified. """
+        self.__cache.store('http://url', response())
+        cached_response = self.__cache.not_modified('http://url')
+        self.assertEqual(('contents', '"1"'), (cached_response.read(), cached_response.info().get('ETag')))
+
+    def test_cached(self):
+        """ Test that the cached response can be returned without revalidating it. """
+        self.__cache.store('http://url', response())
+        self.assertEqual('contents', self.__cache.cached('http://url').read())
+
+    def test_not_cached(self):
+        """ Test that there's no cached response for urls that aren't cached. """
+        self.assertEqual(None, self.__cache.cached('http://url'))
+
+    def test_no_prefetched_response(self):
+        """ Test that there's no prefetched response for urls that aren't prefetched. """
+        self.assertEqual(None, self.__cache.prefetched('http://url'))
+
+    def test_prefetched_response(self):
+        """ Test that a prefetched response can be used once. """
+        self.__cache.add_prefetched('http://url', 'pending response')
+        self.assertEqual('pending response', self.__cache.prefetched('http://url'))
+        self.assertEqual(None, self.__cache.prefetched('http://url'))
+
+    def test_parse(self):
+        """ Test that the contents are parsed. """
+        self.assertEqual(8, self.__cache.parse('key', 'contents', lambda: 8))
+
+    def test_parse_once(self):
+        """ Test that the parse result is reused when the contents are the same. """
+        self.__cache.parse('key', 'contents', lambda: 8)
+        self.assertEqual(8, self.__cache.parse('key', 'contents', lambda: 9))
+
+    def test_parse_changed_contents(self):
+        """ Test that changed contents are parsed again. """
+        self.__cache.parse('key', 'contents', lambda: 8)
+        self.assertEqual(9, self.__cache.parse('key', 'new contents', lambda: 9))
+
+    def test_parse_unicode(self):
+        """ Test that unicode contents can be parsed. """
+        self.assertEqual(8, self.__cache.parse('key', u'contents \u20ac', lambda: 8))
+
+    def test_save_and_load(self):
+        """ Test that the cache is kept between runs. """
+        self.__cache.store('http://url', response())
+        self.__cache.parse('key', 'contents', lambda: 8)
+        self.__cache.save()
+        cache = response_cache.ResponseCache(self.__filename)
+        self.assertEqual('"1"', cache.validators('http://url')['If-None-Match'])
+        self.assertEqual(8, cache.parse('key', 'contents', lambda: 9))
+
+    def test_save_keeps_unused_entries(self):
+        """ Test that entries that weren't used during the run are saved again. """
+        self.__cache.store('http://url', response())
+        self.__cache.save()
+        response_cache.ResponseCache(self.__filename).save()
+        self.assertEqual('"1"', response_cache.ResponseCache(self.__filename).validators('http://url')['If-None-Match'])
+
+    def test_unused_response_stays_fresh(self):
+        """ Test that a response with a time to live stays fresh after a run that didn't use it. """
+        cache = response_cache.ResponseCache(self.__filename, clock=lambda: self.__now)
+        self.__now = 1000
+        cache.store('http://url', response(headers=''), ttl=3600)
+        cache.save()
+        self.__now = 2000
+        response_cache.ResponseCache(self.__filename, clock=lambda: self.__now).save()
+        self.__now = 3000
+        cache = response_cache.ResponseCache(self.__filename, clock=lambda: self.__now)
+        self.assertEqual('contents', cache.fresh('http://url', 3600).read())
+
+    def test_save_drops_least_recently_used_unused_responses(self):
+        """ Test that the least recently used responses are dropped when the cache is too large, also if they
+            weren't used during the run. """
+        cache = response_cache.ResponseCache(self.__filename, max_size=10, clock=lambda: self.__now)
+        self.__now = 1000
+        cache.store('http://old', response(contents='12345678'))
+        cache.save()
+        cache = response_cache.ResponseCache(self.__filename, max_size=10, clock=lambda: self.__now)
+        self.__now = 2000
+        cache.store('http://new', response(contents='12345678'))
+        cache.save()
+        cache = response_cache.ResponseCache(self.__filename)
+        self.assertEqual({}, cache.validators('http://old'))
+        self.assertEqual('"1"', cache.validators('http://new')['If-None-Match'])
+
+    def test_fresh(self):
+        """ Test that a cached response is fresh until its time to live has passed. """
+        cache = response_cache.ResponseCache(clock=lambda: self.__now)
+        self.__now = 1000
+        cache.store('http://url', response())
+        self.__now = 1059
+        self.assertEqual('contents', cache.fresh('http://url', 60).read())
+        self.__now = 1060
+        self.assertEqual(None, cache.fresh('http://url', 60))
+
+    def test_not_modified_renews(self):
+        """ Test that a cached response is fresh again after the server replied it wasn't modified. """
+        cache = response_cache.ResponseCache(clock=lambda: self.__now)
+        self.__now = 1000
+        cache.store('http://url', response())
+        self.__now = 2000
+        cache.not_modified('http://url')
+        self.assertEqual('contents', cache.fresh('http://url', 60).read())
+
+    def test_not_fresh_without_response(self):
+        """ Test that there's no fresh response for urls that haven't been cached. """
+        self.assertEqual(None, self.__cache.fresh('http://url', 60))
+
+    def test_store_with_ttl(self):
+        """ Test that responses without validators are cached if they have a time to live. """
+        self.__cache.store('http://url', response(headers=''), ttl=60)
+        self.assertEqual('contents', self.__cache.fresh('http://url', 60).read())
+
+    def test_save_drops_least_recently_used(self):
+        """ Test that the least recently used responses are dropped when the cache is too large. """
+        cache = response_cache.ResponseCache(self.__filename, max_size=10, clock=lambda: self.__now)
+        self.__now = 1000
+        cache.store('http://old', response(contents='12345678'))
+        self.__now = 2000
+        cache.store('http://new', response(contents='12345678'))
+        cache.save()
+        cache = response_cache.ResponseCache(self.__filename)
+        self.assertEqual({}, cache.validators('http://old'))
+        self.assertEqual('"1"', cache.validators('http://new')['If-None-Match'])
+
+    def test_shared_save_drops_unused_parse_results(self):
+        """ Test that parse results of other processes are dropped when they haven't been used for too long. """
+        other_cache = response_cache.ResponseCache(self.__filename, shared=True, max_parse_result_age=100,
+                                                   clock=lambda: self.__now)
+        cache = response_cache.ResponseCache(self.__filename, shared=True, max_parse_result_age=100,
+                                             clock=lambda: self.__now)
+        self.__now = 1000
+        other_cache.parse('old', 'contents', lambda: 8)
+        other_cache.save()
+        self.__now = 1050
+        cache.parse('new', 'contents', lambda: 9)
+        self.__now = 1101
+        cache.save()
+        cache = response_cache.ResponseCache(self.__filename)
+        self.assertEqual(None, cache.parse('old', 'contents', lambda: None))
+        self.assertEqual(9, cache.parse('new', 'contents', lambda: None))
+
+    def test_parse_result_use_renews(self):
+        """ Test that reusing a parse result keeps it in the cache. """
+        cache = response_cache.ResponseCache(self.__filename, shared=True, max_parse_result_age=100,
+                                             clock=lambda: self.__now)
+        self.__now = 1000
+        cache.parse('key', 'contents', lambda: 8)
+        self.__now = 1050
+        cache.parse('key', 'contents', lambda: 9)
+        self.__now = 1101
+        cache.save()
+        self.assertEqual(8, response_cache.ResponseCache(self.__filename).parse('key', 'contents', lambda: None))
+
+    def test_save_without_filename(self):
+        """ Test that a cache without filename isn't saved. """
+        response_cache.ResponseCache().save()
+        self.assertEqual([], os.listdir(self.__folder))
+
+    def test_shared_save_merges(self):
+        """ Test that saving a shared cache keeps the entries saved by other processes. """
+        other_cache = response_cache.ResponseCache(self.__filename, shared=True)
+        cache = response_cache.ResponseCache(self.__filename, shared=True)
+        other_cache.store('http://other', response())
+        other_cache.save()
+        cache.store('http://url', response())
+        cache.save()
+        cache = response_cache.ResponseCache(self.__filename)
+        self.assertEqual('"1"', cache.validators('http://other')['If-None-Match'])
+        self.assertEqual('"1"', cache.validators('http://url')['If-None-Match'])
+
+    def test_shared_save_removes_tmp_file(self):
+        """ Test that saving a shared cache leaves only the cache file and its lock file. """
+        response_cache.ResponseCache(self.__filename, shared=True).save()
+        self.assertEqual(['response_cache.pickle'], [filename for filename in os.listdir(self.__folder)
+                                                     if not filename.endswith('.lock')])
+
+    def test_corrupt_file(self):
+        """ Test that a corrupt cache file is ignored. """
+        with open(self.__filename, 'w') as cache_file:
+            cache_file.write('corrupt')
+        self.assertEqual({}, response_cache.ResponseCache(self.__filename).validators('http://url'))
+
+
+class ParseTest(unittest.TestCase):
+    """ Unit tests for the parse function. """
+
+    def tearDown(self):
+        response_cache.set_default_response_cache(None)
+
+    def test_without_cache(self):
+        """ Test that the contents are parsed when there's no default response cache. """
+        self.assertEqual(8, response_cache.parse('key', 'contents', lambda: 8))
+
+    def test_with_cache(self):
+        """ Test that the default response cache is used. """
+        response_cache.set_default_response_cache(response_cache.ResponseCache())
+        response_cache.parse('key', 'contents', lambda: 8)
+        self.assertEqual(8, response_cache.parse('key', 'contents', lambda: 9))
+
+    def test_read(self):
+        """ Test that responses are read and strings are returned as is. """
+        self.assertEqual(('contents', 'contents'),
+                         (response_cache.read(StringIO.StringIO('contents')), response_cache.read('contents')))
@@ -0,0 +1,86 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib.metric_source import run_budget, url_opener
+
+
+class SlowUrlOpener(url_opener.UrlOpener):
+    """ Url opener class with its own budget. """
+    pass
+
+
+class FakeClock(object):  # pylint: disable=too-few-public-methods
+    """ Fake a clock that can be advanced. """
+
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+
+class RunBudgetTest(unittest.TestCase):
+    """ Unit tests for the run budget. """
+
+    def setUp(self):
+        self.__clock = FakeClock()
+        self.__run_budget = run_budget.RunBudget(deadline=600, budgets={SlowUrlOpener: 60}, clock=self.__clock)
+
+    def test_no_limit(self):
+        """ Test that there's no limit without deadline and budgets. """
+        self.assertEqual(None, run_budget.RunBudget().remaining(url_opener.UrlOpener()))
+
+    def test_deadline(self):
+        """ Test that the deadline limits url openers without budget of their own. """
+        self.__clock.now += 100
+        self.assertEqual(500, self.__run_budget.remaining(url_opener.UrlOpener()))
+
+    def test_budget(self):
+        """ Test that the budget of the url opener class limits its url openers. """
+        self.__clock.now += 50
+        self.assertEqual(10, self.__run_budget.remaining(SlowUrlOpener()))
+
+    def test_exhausted_budget(self):
+        """ Test that no time remains when the budget has run out. """
+        self.__clock.now += 100
+        self.assertEqual(0, self.__run_budget.remaining(SlowUrlOpener()))
+
+    def test_check(self):
+        """ Test that checking an exhausted budget raises an exception. """
+        self.__clock.now += 100
+        self.assertRaises(run_budget.BudgetExhausted, self.__run_budget.check, SlowUrlOpener())
+
+    def test_check_remaining_budget(self):
+        """ Test that checking a budget with time left doesn't raise an exception. """
+        self.__run_budget.check(SlowUrlOpener())
+
+    def test_exceeded(self):
+        """ Test that the budget of a metric source class is exceeded when its time has run out. """
+        self.__clock.now += 100
+        self.assertTrue(self.__run_budget.exceeded(SlowUrlOpener))
+        self.assertFalse(self.__run_budget.exceeded(url_opener.UrlOpener))
+
+    def test_not_exceeded_without_limit(self):
+        """ Test that the budget isn't exceeded without deadline and budgets. """
+        self.assertFalse(run_budget.RunBudget().exceeded(SlowUrlOpener))
+
+    def test_default_run_budget(self):
+        """ Test that the default run budget can be set. """
+        run_budget.set_default_run_budget(self.__run_budget)
+        self.assertTrue(self.__run_budget is run_budget.default_run_budget())
+        run_budget.set_default_run_budget(None)
@@ -493,3 +493,54 @@ class SonarTest(unittest.TestCase):
     def test_plugins_url(self):
         """ Test that the url to the plugin updatecenter page is correct. """
         self.assertEqual('http://sonar/updatecenter/', self.__sonar.plugins_url())
+
+
+class SonarBulkUnderTest(SonarUnderTest):  # pylint: disable=too-few-public-methods
+    """ Override the url open method to record the urls opened and return measures. """
+
+    measures_json = u"""
+{"component": {"measures": [{"metric": "ncloc", "value": "200"}, {"metric": "test_failures", "value": "3"},
+                            {"metric": "test_errors", "value": "4"}, {"metric": "tests", "value": "10"}]}}"""
+
+    def __init__(self, *args, **kwargs):
+        self.urls_opened = []
+        super(SonarBulkUnderTest, self).__init__(*args, **kwargs)
+
+    def url_open(self, url):
+        """ Record the url and return the measures for measure requests. """
+        self.urls_opened.append(url)
+        if 'api/measures' in url:
+            return io.StringIO(self.measures_json)
+        return super(SonarBulkUnderTest, self).url_open(url)
+
+
+class SonarFulfilTest(unittest.TestCase):
+    """ Unit tests for retrieving data from Sonar in bulk. """
+
+    def setUp(self):
+        self.__sonar = SonarBulkUnderTest('http://sonar/')
+
+    def test_one_request_per_product(self):
+        """ Test that the measures of a product are retrieved with one request. """
+        self.__sonar.fulfil([('ncloc', 'product'), ('failing_unittests', 'product'), ('unittests', 'product')])
+        self.assertEqual(['http://sonar/api/projects/index',
+                          'http://sonar/api/measures/component?componentKey=product&'
+                          'metricKeys=ncloc,test_errors,test_failures,tests'], self.__sonar.urls_opened)
+
+    def test_use_bulk_measures(self):
+        """ Test that the measures retrieved in bulk are used. """
+        self.__sonar.fulfil([('ncloc', 'product'), ('failing_unittests', 'product')])
+        self.assertEqual(200, self.__sonar.ncloc('product'))
+        self.assertEqual(7, self.__sonar.failing_unittests('product'))
+        self.assertEqual(2, len(self.__sonar.urls_opened))
+
+    def test_missing_product(self):
+        """ Test that measures of products that Sonar doesn't have are not retrieved. """
+        self.__sonar.fulfil([('ncloc', 'missing')])
+        self.assertEqual(['http://sonar/api/projects/index'], self.__sonar.urls_opened)
+
+    def test_other_calls(self):
+        """ Test that calls that don't need measures are made one by one. """
+        self.__sonar.fulfil([('false_positives', 'product')])
+        self.assertEqual(2, len(self.__sonar.urls_opened))
+        self.assertTrue('FALSE-POSITIVE' in self.__sonar.urls_opened[1])
@@ -19,6 +19,7 @@ import io
 import unittest
 import urllib2
 
+from qualitylib.metric_source import fetch_plan
 from qualitylib.metric_source.trello import TrelloCard, TrelloBoard
 
 
@@ -76,6 +77,16 @@ class TrelloBoardTest(unittest.TestCase):
             json = u'{{"url": "{}", "name": "name"}}'.format(url)
         return io.StringIO(json)
 
+    def test_plan(self):
+        """ Test that the url is recorded instead of opened while planning. """
+        plan = fetch_plan.FetchPlan()
+        fetch_plan.set_default_fetch_plan(plan)
+        try:
+            self.assertEqual('http://trello.com', self.__trello_board.url())
+        finally:
+            fetch_plan.set_default_fetch_plan(None)
+        self.assertTrue('TrelloBoard: 1 calls' in plan.report())
+
     def test_url(self):
         """ Test the url of the Trello board. """
         self.assertEqual('https://api.trello.com/1/board/object_id?key=appkey&token=token', self.__trello_board.url())
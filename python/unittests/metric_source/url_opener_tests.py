@@ -14,10 +14,20 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import httplib
+import io
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
 import unittest
+import urllib
 import urllib2
 
-from qualitylib.metric_source import url_opener
+from qualitylib.metric_source import cache_policy, fetch_plan, fetcher, health_probe, latency_stats, request_policy, \
+    response_cache, run_budget, source_snapshot, url_manifest, url_opener
 
 
 class FakeBuildOpener(object):  # pylint: disable=too-few-public-methods
@@ -37,6 +47,19 @@ class FakeBuildOpener(object):  # pylint: disable=too-few-public-methods
             return 'url contents'
 
 
+class FakeFetcher(object):  # pylint: disable=too-few-public-methods
+    """ Fake a fetcher that records the submitted arguments. """
+
+    def __init__(self):
+        self.submitted = []
+        self.expected_latencies = []
+
+    def submit(self, function, *args, **kwargs):  # pylint: disable=unused-argument
+        """ Record the first argument and the expected latency. """
+        self.submitted.append(args[0])
+        self.expected_latencies.append(kwargs.get('expected_latency'))
+
+
 class UrlOpenerTest(unittest.TestCase):
     """ Unit tests for the URL opener class. """
 
@@ -77,3 +100,318 @@ class UrlOpenerTest(unittest.TestCase):
         """ Test that a url can be deleted. """
         opener = url_opener.UrlOpener(url_open=FakeBuildOpener.open)
         self.assertEqual('url contents', opener.url_delete('http://bla'))
+
+
+    def test_fetcher(self):
+        """ Test that the url is opened by the fetcher. """
+        opener = url_opener.UrlOpener(url_open=FakeBuildOpener.open, fetcher=fetcher.Fetcher(nr_workers=1))
+        self.assertEqual('url contents', opener.url_open('http://bla'))
+
+    def test_read_by_fetcher(self):
+        """ Test that the response is read by the fetcher. """
+        opener = url_opener.UrlOpener(url_open=lambda url: io.BytesIO('url contents'))
+        self.assertEqual('url contents', opener.url_open('http://bla').read())
+
+    def test_prefetch(self):
+        """ Test that the memoized method is called for each url. """
+        urls = []
+        done = threading.Event()
+
+        def memoized_method(url):
+            """ Keep track of the urls. """
+            urls.append(url)
+            if len(urls) == 2:
+                done.set()
+
+        opener = url_opener.UrlOpener(url_open=FakeBuildOpener.open)
+        opener.prefetch(memoized_method, ['http://bla', 'http://foo'])
+        done.wait(5)
+        self.assertEqual(set(['http://bla', 'http://foo']), set(urls))
+
+
+class HealthTest(unittest.TestCase):
+    """ Unit tests for checking whether the server of a url opener can be reached. """
+
+    def tearDown(self):
+        FakeBuildOpener.raise_exception = False
+        health_probe.set_default_health_probe(None)
+
+    def test_reachable(self):
+        """ Test that a server that answers is reachable. """
+        self.assertTrue(url_opener.UrlOpener(url_open=FakeBuildOpener.open).is_reachable('http://bla'))
+
+    def test_reachable_with_http_error(self):
+        """ Test that a server that answers with an HTTP error is reachable. """
+        FakeBuildOpener.raise_exception = True
+        self.assertTrue(url_opener.UrlOpener(url_open=FakeBuildOpener.open).is_reachable('http://bla'))
+
+    def test_unreachable(self):
+        """ Test that a server that can't be connected to is unreachable. """
+        def url_open(url):
+            """ Fail to connect. """
+            raise urllib2.URLError(url)
+        self.assertFalse(url_opener.UrlOpener(url_open=url_open).is_reachable('http://bla'))
+
+    def test_reachable_with_head_request(self):
+        """ Test that the server is asked for the headers only. """
+        requests = []
+        url_opener.UrlOpener(url_open=requests.append).is_reachable('http://bla')
+        self.assertEqual('HEAD', requests[0].get_method())
+
+    def test_reachable_with_request_policy(self):
+        """ Test that the request policy caps its timeouts at the timeout of the probe. """
+        requests = []
+        request_policy.set_default_request_policy(request_policy.RequestPolicy())
+        try:
+            url_opener.UrlOpener(url_open=requests.append).is_reachable('http://bla', timeout=3)
+        finally:
+            request_policy.set_default_request_policy(None)
+        self.assertEqual((3, 3), (requests[0].connect_timeout, requests[0].read_timeout))
+
+    def test_server_that_doesnt_answer(self):
+        """ Test that probing a server that accepts connections but never answers gives up after the timeout, so
+            it doesn't keep the fetcher worker busy. """
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        single_worker_fetcher = fetcher.Fetcher(nr_workers=1)
+        try:
+            url = 'http://127.0.0.1:{0}/'.format(server.getsockname()[1])
+            probe = single_worker_fetcher.submit(url_opener.UrlOpener().is_reachable, url, 0.1)
+            self.assertFalse(probe.result(timeout=5))
+            self.assertEqual('done', single_worker_fetcher.submit(lambda: 'done').result(timeout=5))
+        finally:
+            server.close()
+
+    def test_unavailable(self):
+        """ Test that urls of url openers that couldn't be reached at the start of the run aren't opened. """
+        urls = []
+        opener = url_opener.UrlOpener(url_open=urls.append)
+        opener.url = lambda: 'http://bla'
+        opener.is_reachable = lambda url, timeout: False
+        probe = health_probe.HealthProbe()
+        probe.probe([opener])
+        health_probe.set_default_health_probe(probe)
+        self.assertRaises(health_probe.SourceUnavailable, opener.url_open, 'http://bla/api')
+        self.assertEqual([], urls)
+
+
+class FetchPlanTest(unittest.TestCase):
+    """ Unit tests for recording urls in a fetch plan instead of opening them. """
+
+    def tearDown(self):
+        fetch_plan.set_default_fetch_plan(None)
+
+    def test_plan(self):
+        """ Test that urls are recorded instead of opened while planning. """
+        urls = []
+        plan = fetch_plan.FetchPlan()
+        fetch_plan.set_default_fetch_plan(plan)
+        self.assertRaises(urllib2.URLError, url_opener.UrlOpener(url_open=urls.append).url_open, 'http://bla')
+        self.assertEqual([], urls)
+        self.assertTrue('UrlOpener: 1 calls' in plan.report())
+
+
+class RunBudgetTest(unittest.TestCase):
+    """ Unit tests for opening urls within the run budget. """
+
+    def tearDown(self):
+        run_budget.set_default_run_budget(None)
+
+    def test_within_budget(self):
+        """ Test that the url is opened when there's time left. """
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=60))
+        opener = url_opener.UrlOpener(url_open=FakeBuildOpener.open)
+        self.assertEqual('url contents', opener.url_open('http://bla'))
+
+    def test_exhausted_budget(self):
+        """ Test that the url isn't opened when the budget has run out. """
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=0))
+        urls = []
+        opener = url_opener.UrlOpener(url_open=urls.append)
+        self.assertRaises(run_budget.BudgetExhausted, opener.url_open, 'http://bla')
+        self.assertEqual([], urls)
+
+    def test_budget_runs_out_while_waiting(self):
+        """ Test that opening the url is given up when the budget runs out while waiting for the response. """
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=0.01))
+        release = threading.Event()
+        opener = url_opener.UrlOpener(url_open=lambda url: release.wait(), fetcher=fetcher.Fetcher(nr_workers=1))
+        self.assertRaises(url_opener.UrlOpener.url_open_exceptions, opener.url_open, 'http://bla')
+        release.set()
+
+
+class LatencyTest(unittest.TestCase):
+    """ Unit tests for recording and using the latency of urls. """
+
+    def setUp(self):
+        self.__latency_stats = latency_stats.LatencyStats()
+        latency_stats.set_default_latency_stats(self.__latency_stats)
+
+    def tearDown(self):
+        latency_stats.set_default_latency_stats(None)
+
+    def test_record_latency(self):
+        """ Test that the latency of the url pattern is recorded. """
+        self.__latency_stats.record('urls', 'http://bla/#', 10.)
+        url_opener.UrlOpener(url_open=FakeBuildOpener.open).url_open('http://bla/1')
+        self.assertTrue(self.__latency_stats.expected('urls', 'http://bla/#') < 10.)
+
+    def test_prefetch_slowest_first(self):
+        """ Test that the urls that took longest in previous runs are prefetched first. """
+        self.__latency_stats.record('urls', 'http://slow', 10.)
+        fake_fetcher = FakeFetcher()
+        url_opener.UrlOpener(fetcher=fake_fetcher).prefetch(lambda url: url, ['http://fast', 'http://slow'])
+        self.assertEqual(['http://slow', 'http://fast'], fake_fetcher.submitted)
+        self.assertEqual([10., 0.], fake_fetcher.expected_latencies)
+
+    def test_open_slowest_first(self):
+        """ Test that the fetcher gets the latency of the url in previous runs, so it can open slow urls first. """
+        self.__latency_stats.record('urls', 'http://slow/#', 10.)
+        single_worker_fetcher = fetcher.Fetcher(nr_workers=1)
+        release = threading.Event()
+        single_worker_fetcher.submit(release.wait)  # Keep the worker busy while the urls are queued
+        opened = []
+        opener = url_opener.UrlOpener(url_open=opened.append, fetcher=single_worker_fetcher)
+        threads = [threading.Thread(target=opener.url_open, args=(url,)) for url in ('http://fast', 'http://slow/1')]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)  # Give the thread time to queue its url
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(['http://slow/1', 'http://fast'], opened)
+
+
+class WarmUpTest(unittest.TestCase):
+    """ Unit tests for prefetching urls of the previous run. """
+
+    def setUp(self):
+        self.__urls = []
+        self.__opener = url_opener.UrlOpener(url_open=self.__url_open, response_cache=response_cache.ResponseCache())
+
+    def __url_open(self, url):
+        """ Record the url and return its contents. """
+        self.__urls.append(url)
+        return io.BytesIO('url contents')
+
+    def test_use_prefetched_response(self):
+        """ Test that opening a prefetched url uses the prefetched response. """
+        self.__opener.warm_up(['http://bla'])
+        self.assertEqual('url contents', self.__opener.url_open('http://bla').read())
+        self.assertEqual(1, len(self.__urls))
+
+    def test_prefetched_response_is_used_once(self):
+        """ Test that a prefetched url is opened again the second time. """
+        self.__opener.warm_up(['http://bla'])
+        self.__opener.url_open('http://bla')
+        self.assertEqual('url contents', self.__opener.url_open('http://bla').read())
+        self.assertEqual(2, len(self.__urls))
+
+    def test_warm_up_without_response_cache(self):
+        """ Test that nothing is prefetched without response cache. """
+        url_opener.UrlOpener(url_open=self.__url_open).warm_up(['http://bla'])
+        self.assertEqual([], self.__urls)
+
+    def test_record_in_manifest(self):
+        """ Test that opened urls are recorded in the url manifest. """
+        filename = tempfile.mktemp()
+        url_manifest.set_default_url_manifest(url_manifest.UrlManifest(filename))
+        try:
+            self.__opener.url_open('http://bla')
+            url_manifest.default_url_manifest().save()
+            self.assertEqual(1, url_manifest.UrlManifest(filename).warm_up([self.__opener]))
+        finally:
+            url_manifest.set_default_url_manifest(None)
+            os.remove(filename)
+
+
+class SourceSnapshotTest(unittest.TestCase):
+    """ Unit tests for recording and replaying responses with a source snapshot. """
+
+    def setUp(self):
+        self.__folder = tempfile.mkdtemp()
+        self.__urls = []
+
+    def tearDown(self):
+        source_snapshot.set_default_source_snapshot(None)
+        shutil.rmtree(self.__folder)
+
+    def __url_open(self, url):
+        """ Record the url and return its contents, or fail for unknown urls. """
+        self.__urls.append(url)
+        if 'unknown' in url:
+            raise urllib2.URLError('unknown host')
+        return io.BytesIO('url contents')
+
+    def __record(self, *urls):
+        """ Record the urls in the snapshot folder. """
+        snapshot = source_snapshot.SourceSnapshot(self.__folder)
+        source_snapshot.set_default_source_snapshot(snapshot)
+        opener = url_opener.UrlOpener(url_open=self.__url_open)
+        for url in urls:
+            try:
+                opener.url_open(url)
+            except urllib2.URLError:
+                pass
+        snapshot.save()
+        source_snapshot.set_default_source_snapshot(source_snapshot.SourceSnapshot(self.__folder, replay=True))
+        return opener
+
+    def test_replay(self):
+        """ Test that a replayed url isn't opened again. """
+        opener = self.__record('http://bla')
+        self.assertEqual('url contents', opener.url_open('http://bla').read())
+        self.assertEqual(['http://bla'], self.__urls)
+
+    def test_replay_error(self):
+        """ Test that a url that couldn't be opened while recording can't be opened while replaying. """
+        opener = self.__record('http://unknown')
+        self.assertRaises(urllib2.URLError, opener.url_open, 'http://unknown')
+        self.assertEqual(['http://unknown'], self.__urls)
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    """ Unit tests for conditional requests using the response cache. """
+
+    def setUp(self):
+        self.__requests = []
+        self.__not_modified = False
+        self.__opener = url_opener.UrlOpener(url_open=self.__url_open, response_cache=response_cache.ResponseCache())
+
+    def __url_open(self, request):
+        """ Return a response with an ETag, or raise Not Modified if the request has the current ETag. """
+        self.__requests.append(request)
+        if self.__not_modified and request.get_header('If-none-match') == '"1"':
+            raise urllib2.HTTPError(request.get_full_url(), 304, 'Not Modified', None, None)
+        return urllib.addinfourl(io.BytesIO('url contents'), httplib.HTTPMessage(io.BytesIO('ETag: "1"\r\n')),
+                                 request.get_full_url(), 200)
+
+    def test_first_request(self):
+        """ Test that the first request isn't conditional. """
+        self.assertEqual('url contents', self.__opener.url_open('http://bla').read())
+        self.assertEqual(None, self.__requests[0].get_header('If-none-match'))
+
+    def test_not_modified(self):
+        """ Test that the cached response is returned when the url hasn't been modified. """
+        self.__opener.url_open('http://bla')
+        self.__not_modified = True
+        self.assertEqual('url contents', self.__opener.url_open('http://bla').read())
+        self.assertEqual('"1"', self.__requests[1].get_header('If-none-match'))
+
+    def test_fresh_response(self):
+        """ Test that a cached response that hasn't expired is used without opening the url. """
+        cache_policy.set_default_cache_policy(cache_policy.CachePolicy(ttls={url_opener.UrlOpener: 3600}))
+        try:
+            self.__opener.url_open('http://bla')
+            self.assertEqual('url contents', self.__opener.url_open('http://bla').read())
+        finally:
+            cache_policy.set_default_cache_policy(None)
+        self.assertEqual(1, len(self.__requests))
+
+    def test_other_http_errors(self):
+        """ Test that other HTTP errors are raised. """
+        opener = url_opener.UrlOpener(url_open=FakeBuildOpener.open, response_cache=response_cache.ResponseCache())
+        FakeBuildOpener.raise_exception = True
+        self.assertRaises(urllib2.HTTPError, opener.url_open, 'http://bla')
+        FakeBuildOpener.raise_exception = False
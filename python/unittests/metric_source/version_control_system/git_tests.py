@@ -15,9 +15,14 @@ limitations under the License.
 """
 
 import datetime
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 
-from qualitylib.metric_source import Git
+from qualitylib.metric_source import Git, fetch_plan, run_budget, source_snapshot
+from qualitylib.metric_source.abstract import version_control_system
 
 
 class GitUnderTest(Git):  # pylint: disable=too-few-public-methods
@@ -32,6 +37,90 @@ class GitTests(unittest.TestCase):
     def setUp(self):
         self.__git = GitUnderTest(url='http://git/')
 
+    def test_refresh(self):
+        """ Test that refreshing clones or pulls the repository again when it's synced. """
+        self.__git.sync()
+        self.__git.last_command = None
+        self.__git.refresh()
+        self.__git.sync()
+        self.assertEqual('git', self.__git.last_command[0])
+
+    def test_no_sync_on_creation(self):
+        """ Test that creating the Git instance doesn't clone or pull the repository. """
+        self.assertFalse(hasattr(self.__git, 'last_command'))
+
+    def test_sync(self):
+        """ Test that syncing clones the repository. """
+        self.__git.sync()
+        self.assertEqual(['git', 'clone', 'http://git/'], self.__git.last_command[:3])
+
+    def test_sync_once(self):
+        """ Test that the repository is only synced again after a refresh. """
+        self.__git.sync()
+        self.__git.last_command = None
+        self.__git.sync()
+        self.assertEqual(None, self.__git.last_command)
+
+    def test_sync_when_needed(self):
+        """ Test that the repository is synced before it's used. """
+        self.__git.tags('path')
+        self.assertTrue(self.__git.last_command)
+
+    def test_plan(self):
+        """ Test that shell commands are recorded instead of run while planning. """
+        commands = []
+        plan = fetch_plan.FetchPlan()
+        fetch_plan.set_default_fetch_plan(plan)
+        try:
+            Git(url='http://git/', run_shell_command=lambda command, **kwargs: commands.append(command)).sync()
+        finally:
+            fetch_plan.set_default_fetch_plan(None)
+        self.assertEqual([], commands)
+        self.assertTrue('Git: 1 calls' in plan.report())
+
+    def test_record_and_replay(self):
+        """ Test that shell commands are stored while recording and not run again while replaying. """
+        folder = tempfile.mkdtemp()
+        commands = []
+
+        def run_shell_command(command, **kwargs):  # pylint: disable=unused-argument
+            """ Fake running the shell command. """
+            commands.append(command)
+            return 'v1.0\n'
+
+        snapshot = source_snapshot.SourceSnapshot(folder)
+        source_snapshot.set_default_source_snapshot(snapshot)
+        try:
+            Git(url='http://git/', run_shell_command=run_shell_command).sync()
+            snapshot.save()
+            source_snapshot.set_default_source_snapshot(source_snapshot.SourceSnapshot(folder, replay=True))
+            Git(url='http://git/', run_shell_command=run_shell_command).sync()
+        finally:
+            source_snapshot.set_default_source_snapshot(None)
+            shutil.rmtree(folder)
+        self.assertEqual(1, len(commands))
+
+    def test_budget_exhausted(self):
+        """ Test that shell commands aren't run when the time budget has run out. """
+        commands = []
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=0))
+        try:
+            Git(url='http://git/', run_shell_command=lambda command, **kwargs: commands.append(command)).sync()
+        finally:
+            run_budget.set_default_run_budget(None)
+        self.assertEqual([], commands)
+
+    def test_budget_as_timeout(self):
+        """ Test that shell commands are run with the remaining time budget as timeout. """
+        timeouts = []
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=600))
+        try:
+            Git(url='http://git/',
+                run_shell_command=lambda command, **kwargs: timeouts.append(kwargs['timeout'])).sync()
+        finally:
+            run_budget.set_default_run_budget(None)
+        self.assertTrue(0 < timeouts[0] <= 600)
+
     def test_last_changed_date(self):
         """ Test that there is no last changed date for a missing repo. """
         self.assertEqual(datetime.datetime.min, self.__git.last_changed_date('path'))
@@ -62,5 +151,25 @@ class GitTests(unittest.TestCase):
 
     def test_checkout(self):
         """ Test the check out command. """
+        self.__git.sync()
         self.__git.check_out('http://git/master/', 'folder')
         self.assertEqual(['git', 'clone', 'http://git/'], self.__git.last_command[:3])
+
+
+class CheckOutputTest(unittest.TestCase):
+    """ Unit tests for running shell commands with a timeout. """
+
+    def test_output(self):
+        """ Test that the output of the command is returned. """
+        self.assertEqual('output', version_control_system.check_output(
+            [sys.executable, '-c', 'import sys; sys.stdout.write("output")'], timeout=60))
+
+    def test_failure(self):
+        """ Test that a failing command raises an exception. """
+        self.assertRaises(subprocess.CalledProcessError, version_control_system.check_output,
+                          [sys.executable, '-c', 'import sys; sys.exit(1)'])
+
+    def test_timeout(self):
+        """ Test that a command that takes longer than the timeout is killed. """
+        self.assertRaises(subprocess.CalledProcessError, version_control_system.check_output,
+                          [sys.executable, '-c', 'import time; time.sleep(60)'], timeout=0.05)
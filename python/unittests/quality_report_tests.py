@@ -0,0 +1,327 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import logging
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+import quality_report
+from qualitylib import domain, formatting, metric, metric_source
+
+
+class FakeReporter(object):
+    """ Fake a reporter that creates a metric source like a project definition would. """
+    failing_project_folders = set()
+
+    def __init__(self, project_folder):
+        self.project_folder = project_folder
+        self.metric_source = domain.MetricSource(url='http://sonar/')
+        self.report_folder = self.response_cache = None
+
+    def create_report(self, report_folder, response_cache=None):
+        """ Create the report, or fail if the project folder is one of the failing project folders. """
+        if self.project_folder in self.failing_project_folders:
+            raise RuntimeError('Project definition is broken')
+        self.report_folder, self.response_cache = report_folder, response_cache
+
+
+class FakePool(object):
+    """ Fake a process pool that runs the jobs in the current process. """
+
+    def __init__(self, processes):
+        self.processes = processes
+
+    @staticmethod
+    def map(function, jobs, chunksize=None):  # pylint: disable=unused-argument
+        """ Run the function for each of the jobs. """
+        return [function(job) for job in jobs]
+
+    def close(self):
+        """ Close the pool. """
+        pass
+
+    def join(self):
+        """ Wait for the pool. """
+        pass
+
+
+class ReporterTestCase(unittest.TestCase):
+    """ Base class for the unit tests of the reporters of multiple projects. """
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.project_folders = [os.path.join(self.folder, name) for name in ('project1', 'project2', 'project3')]
+        self.report_folder = os.path.join(self.folder, 'report')
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        FakeReporter.failing_project_folders = set()
+        shutil.rmtree(self.folder)
+
+
+PROJECT_DEFINITION = """import os
+from qualitylib import domain, metric_source, requirement
+PROJECT = domain.Project('organization', name='project', requirements=[requirement.TrackBugs], metric_sources={
+    metric_source.History: metric_source.History(os.path.join(os.path.dirname(__file__), 'history.json'))})
+PROJECT.add_team(domain.Team(name='team', short_name='TE', requirements=[requirement.TrackAbsence]))
+"""
+
+OUT_OF_TIME_PROJECT_DEFINITION = """import os
+import urllib2
+from qualitylib import domain, metric_source, requirement
+
+
+def url_open(url):
+    raise urllib2.URLError('offline')
+
+ZAP = metric_source.ZAPScanReport(url_open=url_open)
+PROJECT = domain.Project('organization', name='project', deadline=0, metric_sources={
+    metric_source.History: metric_source.History(os.path.join(os.path.dirname(__file__), 'history.json')),
+    metric_source.ZAPScanReport: ZAP})
+PROJECT.add_product(domain.Product(PROJECT, 'PR', name='product', requirements=[requirement.OWASPZAP],
+                                   metric_source_ids={ZAP: 'http://zap/report'}))
+"""
+
+
+def fake_url_open(url):  # pylint: disable=unused-argument
+    """ Fake opening the url of a trend image. """
+    return StringIO.StringIO(quality_report.Reporter.EMPTY_HISTORY_PNG)
+
+
+class FakeServerProxy(object):  # pylint: disable=too-few-public-methods
+    """ Fake the Python package index. """
+
+    def __init__(self, url):
+        self.url = url
+
+    @staticmethod
+    def package_releases(package):  # pylint: disable=unused-argument
+        """ Return the released versions of the package. """
+        return ['1.0']
+
+
+class ReporterTest(unittest.TestCase):
+    """ Unit tests for the reporter of one project. """
+
+    @classmethod
+    def setUpClass(cls):
+        """ Create the resource folders of the report if they are missing, because the resources are generated by
+            the build. """
+        formatting_folder = os.path.dirname(formatting.__file__)
+        cls.created_resource_folders = [os.path.join(formatting_folder, resource_type)
+                                        for resource_type in ('css', 'fonts', 'img', 'js')
+                                        if not os.path.exists(os.path.join(formatting_folder, resource_type))]
+        for resource_folder in cls.created_resource_folders:
+            os.mkdir(resource_folder)
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Remove the resource folders created for the tests. """
+        for resource_folder in cls.created_resource_folders:
+            shutil.rmtree(resource_folder)
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.project_folder = os.path.join(self.folder, 'project')
+        self.snapshot_folder = os.path.join(self.folder, 'snapshots')
+        self.report_folder = os.path.join(self.folder, 'report')
+        self.reporter = self.create_reporter()
+        logging.disable(logging.CRITICAL)
+
+    def create_reporter(self, project_definition=PROJECT_DEFINITION, **kwargs):
+        """ Write the project definition and return a reporter for the project. """
+        if not os.path.exists(self.project_folder):
+            os.mkdir(self.project_folder)
+        with open(os.path.join(self.project_folder, quality_report.Reporter.PROJECT_DEFINITION_FILENAME), 'w') as \
+                project_definition_file:
+            project_definition_file.write(project_definition)
+        return quality_report.Reporter(self.project_folder, url_open=fake_url_open, server_proxy=FakeServerProxy,
+                                       **kwargs)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.folder)
+
+    def history(self):
+        """ Return the records in the history file of the project. """
+        return metric_source.History(os.path.join(self.project_folder,
+                                                  quality_report.Reporter.HISTORY_FILENAME)).complete_history()
+
+    def test_collect_and_render(self):
+        """ Test that rendering a collected run adds one history record, dated by the collect run. """
+        self.reporter.collect(self.snapshot_folder)
+        self.reporter.render(self.snapshot_folder, self.report_folder)
+        run_date = metric_source.SourceSnapshot(self.snapshot_folder, replay=True).run_date()
+        self.assertEqual([run_date.strftime('%Y-%m-%d %H:%M:%S')], [record['date'] for record in self.history()])
+
+    def test_render_again(self):
+        """ Test that rendering a run again doesn't add another history record. """
+        self.reporter.collect(self.snapshot_folder)
+        self.reporter.render(self.snapshot_folder, self.report_folder)
+        self.reporter.render(self.snapshot_folder, self.report_folder)
+        self.assertEqual(1, len(self.history()))
+
+    def test_report_adds_history_record(self):
+        """ Test that creating the report adds a history record. """
+        self.reporter.create_report(self.report_folder)
+        self.assertEqual(1, len(self.history()))
+
+    def test_no_history_record_with_stale_values(self):
+        """ Test that a report that shows stale values doesn't add a history record. """
+        reporter = self.create_reporter(OUT_OF_TIME_PROJECT_DEFINITION, serve_stale=True)
+        reporter.create_report(self.report_folder)  # Stores the snapshots, so the next report can show them
+        reporter.create_report(self.report_folder)
+        reporter.wait_for_revalidation()
+        self.assertEqual(1, len(self.history()))
+
+    def test_partial_report(self):
+        """ Test that creating part of the report doesn't create the metrics of the other sections. """
+        self.reporter.create_report(self.report_folder)
+        created = []
+        original_init = metric.OpenBugs.__init__
+
+        def init(self, *args, **kwargs):
+            """ Record the creation of the metric. """
+            created.append(self)
+            original_init(self, *args, **kwargs)
+        metric.OpenBugs.__init__ = init
+        try:
+            self.create_reporter().create_report(self.report_folder, section_ids=['TE'])
+        finally:
+            metric.OpenBugs.__init__ = original_init
+        self.assertEqual([], created)
+        self.assertEqual(1, len(self.history()))
+
+    def test_collect_without_report(self):
+        """ Test that collecting without creating the report doesn't add a history record. """
+        self.reporter.collect(self.snapshot_folder)
+        self.assertEqual([], self.history())
+
+
+class BatchReporterTest(ReporterTestCase):
+    """ Unit tests for the batch reporter. """
+
+    def setUp(self):
+        super(BatchReporterTest, self).setUp()
+        self.__created_reporters = []
+
+        def create_reporter(project_folder):
+            """ Create a fake reporter and keep track of it. """
+            reporter = FakeReporter(project_folder)
+            self.__created_reporters.append(reporter)
+            return reporter
+        self.__batch_reporter = quality_report.BatchReporter(self.project_folders, create_reporter)
+
+    def test_shared_metric_sources(self):
+        """ Test that the projects share metric sources defined with the same arguments. """
+        self.assertTrue(all(reporter.metric_source is self.__created_reporters[0].metric_source
+                            for reporter in self.__created_reporters))
+
+    def test_metric_sources_not_shared_afterwards(self):
+        """ Test that metric sources created after creating the batch reporter aren't shared. """
+        self.assertFalse(domain.MetricSource(url='http://sonar/') is self.__created_reporters[0].metric_source)
+
+    def test_shared_response_cache(self):
+        """ Test that the projects share the response cache. """
+        self.__batch_reporter.create_reports(self.report_folder)
+        response_cache = self.__created_reporters[0].response_cache
+        self.assertTrue(response_cache)
+        self.assertTrue(all(reporter.response_cache is response_cache for reporter in self.__created_reporters))
+
+    def test_report_folders(self):
+        """ Test that each report is written to a subfolder of the report folder. """
+        self.__batch_reporter.create_reports(self.report_folder)
+        self.assertEqual([os.path.join(self.report_folder, name) for name in ('project1', 'project2', 'project3')],
+                         [reporter.report_folder for reporter in self.__created_reporters])
+
+    def test_no_failures(self):
+        """ Test that no project folders are returned when all reports are created. """
+        self.assertEqual([], self.__batch_reporter.create_reports(self.report_folder))
+
+    def test_failures(self):
+        """ Test that the project folders of failing reports are returned and the other reports are created. """
+        FakeReporter.failing_project_folders = {self.project_folders[0], self.project_folders[2]}
+        self.assertEqual([self.project_folders[0], self.project_folders[2]],
+                         self.__batch_reporter.create_reports(self.report_folder))
+        self.assertEqual(os.path.join(self.report_folder, 'project2'), self.__created_reporters[1].report_folder)
+
+
+class PortfolioReporterTest(ReporterTestCase):
+    """ Unit tests for the portfolio reporter. """
+
+    def setUp(self):
+        super(PortfolioReporterTest, self).setUp()
+        self.__jobs = []
+        self.__pools = []
+        self.__portfolio_reporter = self.__create_portfolio_reporter(processes=2)
+
+    def __create_portfolio_reporter(self, processes):
+        """ Create a portfolio reporter that uses fake pools and fakes creating the project reports. """
+        return quality_report.PortfolioReporter(self.project_folders, processes=processes, pool=self.__create_pool,
+                                                report_creator=self.__create_project_report)
+
+    def __create_pool(self, processes):
+        """ Create a fake pool and keep track of it. """
+        pool = FakePool(processes)
+        self.__pools.append(pool)
+        return pool
+
+    def __create_project_report(self, job):
+        """ Fake creating the report of a project and keep track of the job. """
+        self.__jobs.append(job)
+        project_folder = job[0]
+        return project_folder, project_folder not in FakeReporter.failing_project_folders, 0.1
+
+    def test_shared_response_cache(self):
+        """ Test that the processes share the response cache file in the folder that contains the projects. """
+        self.__portfolio_reporter.create_reports(self.report_folder)
+        self.assertEqual(set([os.path.join(self.folder, quality_report.Reporter.RESPONSE_CACHE_FILENAME)]),
+                         set(job[2] for job in self.__jobs))
+
+    def test_report_folders(self):
+        """ Test that each report is written to a subfolder of the report folder. """
+        self.__portfolio_reporter.create_reports(self.report_folder)
+        self.assertEqual([os.path.join(self.report_folder, name) for name in ('project1', 'project2', 'project3')],
+                         [job[1] for job in self.__jobs])
+
+    def test_processes(self):
+        """ Test that the pool gets the requested number of processes. """
+        self.__portfolio_reporter.create_reports(self.report_folder)
+        self.assertEqual([2], [pool.processes for pool in self.__pools])
+
+    def test_no_more_processes_than_projects(self):
+        """ Test that the pool doesn't get more processes than there are projects. """
+        self.__create_portfolio_reporter(processes=8).create_reports(self.report_folder)
+        self.assertEqual([3], [pool.processes for pool in self.__pools])
+
+    def test_no_failures(self):
+        """ Test that no project folders are returned when all reports are created. """
+        self.assertEqual([], self.__portfolio_reporter.create_reports(self.report_folder))
+
+    def test_failures(self):
+        """ Test that the project folders of failing reports are returned. """
+        FakeReporter.failing_project_folders = {self.project_folders[1]}
+        self.assertEqual([self.project_folders[1]], self.__portfolio_reporter.create_reports(self.report_folder))
+
+    def test_failing_project_report(self):
+        """ Test that creating the report of a project that fails in the process is reported as failed. """
+        project_folder, succeeded, _ = quality_report.create_project_report(
+            (os.path.join(self.folder, 'missing'), self.report_folder, os.path.join(self.folder, 'cache.pickle')))
+        self.assertEqual((os.path.join(self.folder, 'missing'), False), (project_folder, succeeded))
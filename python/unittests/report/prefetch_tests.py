@@ -0,0 +1,131 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib import domain, report
+
+
+class FakeMetricSource(object):  # pylint: disable=too-few-public-methods
+    """ Fake a metric source class. """
+    pass
+
+
+class FakeMetric(object):
+    """ Fake a metric that records how often it is evaluated. """
+    metric_source_classes = [FakeMetricSource]
+
+    def __init__(self, raise_exception=False):
+        self.evaluated = []
+        self.__raise_exception = raise_exception
+
+    def snapshot(self):
+        """ Record the evaluation of the snapshot. """
+        if self.__raise_exception:
+            raise ValueError('Oops')
+        self.evaluated.append('snapshot')
+
+    @staticmethod
+    def stable_id():
+        """ Return the id of the metric. """
+        return 'FakeMetric'
+
+
+class OtherFakeMetricSource(object):  # pylint: disable=too-few-public-methods
+    """ Fake another metric source class. """
+    pass
+
+
+class OtherFakeMetric(FakeMetric):
+    """ Fake a metric that uses the other metric source class. """
+    metric_source_classes = [OtherFakeMetricSource]
+
+
+class FakeMetaMetric(FakeMetric):
+    """ Fake a metric without metric sources. """
+    metric_source_classes = []
+
+
+class FakeThreadPool(object):
+    """ Fake a thread pool by evaluating synchronously. """
+    sizes = []
+    mapped = []
+
+    def __init__(self, size):
+        self.sizes.append(size)
+
+    def map_async(self, func, iterable):
+        """ Apply the function to all items. """
+        self.mapped.append(iterable)
+        for item in iterable:
+            func(item)
+
+    def close(self):
+        """ Close the pool. """
+        pass
+
+    def join(self):
+        """ Wait for the pool. """
+        pass
+
+
+class PrefetcherTest(unittest.TestCase):
+    """ Unit tests for the prefetcher. """
+
+    def setUp(self):
+        FakeThreadPool.sizes = []
+        FakeThreadPool.mapped = []
+
+    def test_evaluate_metrics(self):
+        """ Test that the metrics are evaluated. """
+        metrics = [FakeMetric(), FakeMetric()]
+        report.Prefetcher(domain.Project()).prefetch(metrics)
+        for metric in metrics:
+            self.assertEqual(['snapshot'], metric.evaluated)
+
+    def test_skip_metrics_without_sources(self):
+        """ Test that metrics without metric sources aren't evaluated. """
+        meta_metric = FakeMetaMetric()
+        report.Prefetcher(domain.Project()).prefetch([meta_metric])
+        self.assertEqual([], meta_metric.evaluated)
+
+    def test_ignore_exceptions(self):
+        """ Test that exceptions during evaluation are ignored. """
+        metric = FakeMetric(raise_exception=True)
+        report.Prefetcher(domain.Project()).prefetch([metric])
+        self.assertEqual([], metric.evaluated)
+
+    def test_pool_per_metric_source_class(self):
+        """ Test that the metrics of each metric source class are evaluated by their own thread pool. """
+        metric, other_metric = FakeMetric(), OtherFakeMetric()
+        report.Prefetcher(domain.Project(), thread_pool=FakeThreadPool).prefetch([metric, other_metric])
+        self.assertEqual(sorted([[metric], [other_metric]]), sorted(FakeThreadPool.mapped))
+
+    def test_default_max_workers(self):
+        """ Test the default number of threads per metric source class. """
+        self.assertEqual(report.Prefetcher.default_max_workers,
+                         report.Prefetcher(domain.Project()).max_workers(FakeMetricSource))
+
+    def test_configured_max_workers(self):
+        """ Test that the number of threads per metric source class can be configured. """
+        project = domain.Project(metric_source_settings={FakeMetricSource: dict(max_workers=2)})
+        self.assertEqual(2, report.Prefetcher(project).max_workers(FakeMetricSource))
+
+    def test_pool_size(self):
+        """ Test that the thread pool is not larger than the number of metrics. """
+        project = domain.Project(metric_source_settings={FakeMetricSource: dict(max_workers=10)})
+        report.Prefetcher(project, thread_pool=FakeThreadPool).prefetch([FakeMetric(), FakeMetric()])
+        self.assertEqual([2], FakeThreadPool.sizes)
@@ -15,6 +15,9 @@ limitations under the License.
 """
 
 import datetime
+import os
+import shutil
+import tempfile
 import unittest
 
 from qualitylib import report, domain, metric, metric_source, requirement
@@ -43,6 +46,11 @@ class QualityReportTest(unittest.TestCase):
         """ Test that the report date is now. """
         self.assertTrue(datetime.datetime.now() - self.__report.date() < datetime.timedelta(seconds=10))
 
+    def test_report_date_passed(self):
+        """ Test that the report date is the date passed when creating the report. """
+        date = datetime.datetime(2016, 1, 2, 12, 34, 56)
+        self.assertEqual(date, report.QualityReport(self.__project, date=date).date())
+
     def test_sections(self):
         """ Test that the report has one section, the meta metrics, by default. """
         self.assertEqual(1, len(self.__report.sections()))
@@ -56,6 +64,15 @@ class QualityReportTest(unittest.TestCase):
         section = self.__report.sections()[0]
         self.assertEqual(section, self.__report.get_section(section.id_prefix()))
 
+    def test_section_metrics(self):
+        """ Test that the metrics of sections can be retrieved by section id. """
+        metrics = self.__report.section_metrics(['MM'])
+        self.assertEqual(self.__report.get_meta_section().metrics(), metrics)
+
+    def test_section_metrics_with_unknown_id(self):
+        """ Test that unknown section ids have no metrics. """
+        self.assertEqual([], self.__report.section_metrics(['unknown']))
+
     def test_get_section_with_unknown_id(self):
         """ Test that a unknown id results in None returned. """
         self.assertEqual(None, self.__report.get_section('unknown'))
@@ -119,6 +136,62 @@ class QualityReportTest(unittest.TestCase):
         self.assertEqual({metric.RedMetaMetric, metric.YellowMetaMetric, metric.GreenMetaMetric,
                           metric.GreyMetaMetric, metric.MissingMetaMetric}, self.__report.included_metric_classes())
 
+    def test_metrics_created_lazily(self):
+        """ Test that the metrics of a section are only created when the metrics of the section are needed. """
+        project = domain.Project('organization', name='project title', requirements=[requirement.TrackBugs])
+        quality_report = report.QualityReport(project)
+        quality_report.sections()
+        self.assertTrue(metric.OpenBugs in quality_report.included_metric_classes())
+        created = []
+        original_init = metric.OpenBugs.__init__
+
+        def init(self, *args, **kwargs):
+            """ Record the creation of the metric. """
+            created.append(self)
+            original_init(self, *args, **kwargs)
+        metric.OpenBugs.__init__ = init
+        try:
+            self.assertEqual([], created)
+            quality_report.section_metrics(['PC'])
+            quality_report.section_metrics(['PC'])
+            self.assertEqual(3, len(created))  # The open bugs metric and its two subclasses
+        finally:
+            metric.OpenBugs.__init__ = original_init
+
+    def test_restored_metrics_not_created(self):
+        """ Test that the metrics outside the sections that are evaluated again show their stored snapshots without
+            being created. """
+        folder = tempfile.mkdtemp()
+        try:
+            project = domain.Project('organization', name='project title', requirements=[requirement.TrackBugs],
+                                     metric_sources={metric_source.History: metric_source.History('history.json')})
+            project.add_team(domain.Team(name='team', short_name='TE', requirements=[requirement.TrackAbsence]))
+            snapshot_store = report.SnapshotStore(os.path.join(folder, 'snapshots.pickle'))
+            snapshot_store.save(report.QualityReport(project).metrics())
+            quality_report = report.QualityReport(project)
+            quality_report.sections()
+            quality_report.restore_snapshots(snapshot_store, ['TE'])
+            created = []
+            original_init = metric.OpenBugs.__init__
+
+            def init(self, *args, **kwargs):
+                """ Record the creation of the metric. """
+                created.append(self)
+                original_init(self, *args, **kwargs)
+            metric.OpenBugs.__init__ = init
+            try:
+                self.assertTrue(all(isinstance(each_metric, report.RestoredMetric)
+                                    for each_metric in quality_report.get_section('PC').metrics()))
+                self.assertFalse(any(isinstance(each_metric, report.RestoredMetric)
+                                     for each_metric in quality_report.section_metrics(['TE', 'MM'])))
+                self.assertEqual(['PC-1', 'PC-2', 'PC-3'],
+                                 [each_metric.id_string() for each_metric in quality_report.get_section('PC')])
+                self.assertEqual([], created)
+            finally:
+                metric.OpenBugs.__init__ = original_init
+        finally:
+            shutil.rmtree(folder)
+
     def test_get_included_requirements(self):
         """ Test the list of included requirements. """
         self.__report.sections()
@@ -265,3 +338,53 @@ class QualityReportMetricsTest(unittest.TestCase):
         """ Test that all metric classes have a name. """
         for metric_class in report.QualityReport.metric_classes():
             self.assertNotEqual('Subclass responsibility', metric_class.name, '{} has no name'.format(metric_class))
+
+
+class FakeMetricWithRequirements(object):  # pylint: disable=too-few-public-methods
+    """ Fake a metric with data requirements. """
+    def __init__(self, *requirements):
+        self.__requirements = set(requirements)
+
+    def data_requirements(self):
+        """ Return the data requirements. """
+        return self.__requirements
+
+
+class FakeBulkMetricSource(object):  # pylint: disable=too-few-public-methods
+    """ Fake a metric source that records the batches it fulfils. """
+    metric_source_name = 'Fake'
+
+    def __init__(self):
+        self.batches = []
+
+    def fulfil(self, calls):
+        """ Record the batch. """
+        self.batches.append(calls)
+
+
+class DataRequirementPlannerTest(unittest.TestCase):
+    """ Unit tests for the data requirement planner. """
+
+    def setUp(self):
+        self.__source = FakeBulkMetricSource()
+        self.__planner = report.DataRequirementPlanner(
+            [FakeMetricWithRequirements((self.__source, 'ncloc', 'id1'), (self.__source, 'lines', 'id1')),
+             FakeMetricWithRequirements((self.__source, 'ncloc', 'id1'), (self.__source, 'ncloc', 'id2'))])
+
+    def test_plan(self):
+        """ Test that duplicate calls are removed from the plan. """
+        self.assertEqual({self.__source: {('ncloc', 'id1'), ('lines', 'id1'), ('ncloc', 'id2')}},
+                         self.__planner.plan())
+
+    def test_nr_calls(self):
+        """ Test the number of planned calls. """
+        self.assertEqual(3, self.__planner.nr_calls())
+
+    def test_execute(self):
+        """ Test that each metric source gets one batch. """
+        self.__planner.execute()
+        self.assertEqual([[('lines', 'id1'), ('ncloc', 'id1'), ('ncloc', 'id2')]], self.__source.batches)
+
+    def test_no_metrics(self):
+        """ Test that nothing is planned without metrics. """
+        self.assertEqual(0, report.DataRequirementPlanner([]).nr_calls())
@@ -0,0 +1,93 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib import domain, metric_source, report
+
+
+class FakeGit(metric_source.Git):
+    """ Fake a Git repository that records the syncs instead of running shell commands. """
+
+    def __init__(self, *args, **kwargs):
+        self.syncs = []
+        super(FakeGit, self).__init__(*args, **kwargs)
+
+    def sync(self):
+        """ Record the sync. """
+        self.syncs.append('sync')
+
+
+class FakeThreadPool(object):
+    """ Fake a thread pool by syncing synchronously. """
+    sizes = []
+
+    def __init__(self, size):
+        self.sizes.append(size)
+
+    @staticmethod
+    def map_async(func, iterable):
+        """ Apply the function to all items. """
+        for item in iterable:
+            func(item)
+
+    def close(self):
+        """ Close the pool. """
+        pass
+
+    def join(self):
+        """ Wait for the pool. """
+        pass
+
+
+class RepositorySynchronizerTest(unittest.TestCase):
+    """ Unit tests for the repository synchronizer. """
+
+    def setUp(self):
+        FakeThreadPool.sizes = []
+        self.__git = FakeGit(url='http://git/repo1')
+        self.__other_git = FakeGit(url='http://git/repo2')
+
+    def test_no_repositories(self):
+        """ Test that nothing is synced without repositories. """
+        synchronizer = report.RepositorySynchronizer(domain.Project(), thread_pool=FakeThreadPool)
+        self.assertEqual(0, synchronizer.start())
+        synchronizer.wait()
+        self.assertEqual([], FakeThreadPool.sizes)
+
+    def test_sync(self):
+        """ Test that all repositories are synced once. """
+        project = domain.Project(metric_sources={metric_source.Git: [self.__git, self.__other_git],
+                                                 metric_source.VersionControlSystem: self.__git})
+        synchronizer = report.RepositorySynchronizer(project, thread_pool=FakeThreadPool)
+        self.assertEqual(2, synchronizer.start())
+        synchronizer.wait()
+        self.assertEqual((['sync'], ['sync']), (self.__git.syncs, self.__other_git.syncs))
+
+    def test_configured_max_workers(self):
+        """ Test that the number of threads can be configured. """
+        project = domain.Project(metric_sources={metric_source.Git: [self.__git, self.__other_git]},
+                                 metric_source_settings={metric_source.Git: dict(max_workers=1)})
+        report.RepositorySynchronizer(project, thread_pool=FakeThreadPool).start()
+        self.assertEqual([1], FakeThreadPool.sizes)
+
+    def test_ignore_exceptions(self):
+        """ Test that exceptions while syncing are ignored. """
+        def sync():
+            """ Fail. """
+            raise OSError('git not found')
+        self.__git.sync = sync
+        report.RepositorySynchronizer.sync(self.__git)
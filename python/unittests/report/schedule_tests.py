@@ -0,0 +1,111 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib import domain, report
+
+
+class FakeMetricSource(domain.MetricSource):
+    """ Fake a metric source that counts how often it is refreshed. """
+
+    def __init__(self, *args, **kwargs):
+        self.refreshed = 0
+        super(FakeMetricSource, self).__init__(*args, **kwargs)
+
+    def refresh(self):
+        """ Count the refreshes. """
+        self.refreshed += 1
+
+
+class OtherFakeMetricSource(FakeMetricSource):
+    """ Fake another metric source class. """
+    needs_values_as_list = True
+
+
+class FakeClock(object):  # pylint: disable=too-few-public-methods
+    """ Fake a clock that can be advanced. """
+
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+
+class RefreshScheduleTest(unittest.TestCase):
+    """ Unit tests for the refresh schedule. """
+
+    def setUp(self):
+        self.__metric_source = FakeMetricSource()
+        self.__clock = FakeClock()
+        self.__project = domain.Project(metric_sources={FakeMetricSource: self.__metric_source})
+        self.__schedule = report.RefreshSchedule(self.__project, 900, clock=self.__clock)
+
+    def test_default_ttl(self):
+        """ Test that the default time to live is the interval. """
+        self.assertEqual(900, self.__schedule.ttl(FakeMetricSource))
+
+    def test_ttl(self):
+        """ Test that the time to live can be configured per metric source class. """
+        project = domain.Project(metric_source_settings={FakeMetricSource: dict(ttl=3600)})
+        self.assertEqual(3600, report.RefreshSchedule(project, 900).ttl(FakeMetricSource))
+
+    def test_not_expired(self):
+        """ Test that metric sources aren't refreshed before their data has expired. """
+        self.__clock.now += 899
+        self.assertEqual([], self.__schedule.refresh_expired_metric_sources())
+        self.assertEqual(0, self.__metric_source.refreshed)
+
+    def test_expired(self):
+        """ Test that metric sources are refreshed when their data has expired. """
+        self.__clock.now += 900
+        self.assertEqual([self.__metric_source], self.__schedule.refresh_expired_metric_sources())
+        self.assertEqual(1, self.__metric_source.refreshed)
+
+    def test_refresh_once_per_ttl(self):
+        """ Test that the time to live restarts after a refresh. """
+        self.__clock.now += 900
+        self.__schedule.refresh_expired_metric_sources()
+        self.__clock.now += 450
+        self.__schedule.refresh_expired_metric_sources()
+        self.assertEqual(1, self.__metric_source.refreshed)
+
+    def test_long_ttl(self):
+        """ Test that metric sources with a long time to live are refreshed less often. """
+        project = domain.Project(metric_sources={FakeMetricSource: self.__metric_source},
+                                 metric_source_settings={FakeMetricSource: dict(ttl=3600)})
+        schedule = report.RefreshSchedule(project, 900, clock=self.__clock)
+        self.__clock.now += 900
+        self.assertEqual([], schedule.refresh_expired_metric_sources())
+
+    def test_list_of_metric_sources(self):
+        """ Test that each instance of a metric source class is refreshed. """
+        metric_sources = [OtherFakeMetricSource(), OtherFakeMetricSource()]
+        project = domain.Project(metric_sources={OtherFakeMetricSource: metric_sources})
+        schedule = report.RefreshSchedule(project, 900, clock=self.__clock)
+        self.__clock.now += 900
+        schedule.refresh_expired_metric_sources()
+        self.assertEqual([1, 1], [metric_source.refreshed for metric_source in metric_sources])
+
+    def test_shared_metric_source(self):
+        """ Test that a metric source registered for multiple classes is refreshed once. """
+        project = domain.Project(metric_sources={FakeMetricSource: self.__metric_source,
+                                                 OtherFakeMetricSource: [self.__metric_source]})
+        schedule = report.RefreshSchedule(project, 900, clock=self.__clock)
+        self.__clock.now += 900
+        schedule.refresh_expired_metric_sources()
+        self.assertEqual(1, self.__metric_source.refreshed)
@@ -33,6 +33,10 @@ class FakeMetric(object):
         """ Return the preset status. """
         return self.__status
 
+    def snapshot(self):
+        """ Return the metric itself as snapshot. """
+        return self
+
 
 class SectionHeaderTest(unittest.TestCase):
     """ Unit tests for the section header class. """
@@ -52,6 +56,14 @@ class SectionHeaderTest(unittest.TestCase):
         """ Test that the id prefix is correct. """
         self.assertEqual('TE', self.__header.id_prefix())
 
+    def test_lazy_subtitle(self):
+        """ Test that a subtitle passed as function is determined once, when needed. """
+        calls = []
+        header = SectionHeader('TE', 'title', lambda: calls.append('call') or 'subtitle')
+        self.assertEqual([], calls)
+        self.assertEqual(('subtitle', 'subtitle'), (header.subtitle(), header.subtitle()))
+        self.assertEqual(['call'], calls)
+
 
 class SectionTest(unittest.TestCase):
     """ Unit tests for the section class. """
@@ -160,3 +172,12 @@ class SectionTest(unittest.TestCase):
         """ Test that the section returns the product. """
         section = Section(None, [], product='Product')
         self.assertEqual('Product', section.product())
+
+    def test_lazy_metrics(self):
+        """ Test that metrics passed as function are created once, when needed. """
+        calls = []
+        section = Section(self.__header, lambda: calls.append('call') or self.__metrics)
+        self.assertEqual([], calls)
+        self.assertEqual(self.__metrics, section.metrics())
+        self.assertEqual(self.__metrics[0], section[0])
+        self.assertEqual(['call'], calls)
@@ -0,0 +1,155 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import cPickle
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from qualitylib import report
+from qualitylib.domain.measurement.metric_snapshot import MetricSnapshot
+
+
+class FakeMetric(object):
+    """ Fake a metric that keeps track of its restored snapshot. """
+
+    def __init__(self, stable_id, id_string):
+        self.__stable_id = stable_id
+        self.__id_string = id_string
+        self.restored_snapshot = None
+
+    def stable_id(self):
+        """ Return the stable id of the metric. """
+        return self.__stable_id
+
+    def id_string(self):
+        """ Return the id string of the metric. """
+        return self.__id_string
+
+    def snapshot(self):
+        """ Return the restored snapshot or a new snapshot. """
+        return self.restored_snapshot or MetricSnapshot(
+            stable_id=self.__stable_id, id_string=self.__id_string, status='red', numerical_value=10,
+            status_start_date=datetime.datetime(2016, 1, 1), report='report', norm='norm', url={}, url_label='',
+            comment='', comment_urls={}, comment_url_label='', recent_history=[8, 10], y_axis_range=(7, 11))
+
+    def restore_snapshot(self, snapshot):
+        """ Remember the restored snapshot. """
+        self.restored_snapshot = snapshot
+
+
+class SnapshotStoreTest(unittest.TestCase):
+    """ Unit tests for the snapshot store. """
+
+    def setUp(self):
+        self.__folder = tempfile.mkdtemp()
+        self.__filename = os.path.join(self.__folder, 'metric_snapshots.pickle')
+        self.__store = report.SnapshotStore(self.__filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.__folder)
+
+    def test_restore_without_file(self):
+        """ Test that no metrics are restored when there is no snapshot file. """
+        self.assertEqual(None, self.__store.restored_metric('Metric', 'PD-1'))
+
+    def test_save_and_restore(self):
+        """ Test that saved snapshots are restored in a next run. """
+        self.__store.save([FakeMetric('Metric', 'PD-1')])
+        restored_metric = report.SnapshotStore(self.__filename).restored_metric('Metric', 'PD-1')
+        self.assertEqual(('Metric', 'PD-1', 'report'), (restored_metric.stable_id(), restored_metric.id_string(),
+                                                        restored_metric.snapshot().report()))
+
+    def test_moved_metric(self):
+        """ Test that a metric isn't restored when another metric was at its position in the previous report. """
+        self.__store.save([FakeMetric('Metric', 'PD-1')])
+        self.assertEqual(None, report.SnapshotStore(self.__filename).restored_metric('OtherMetric', 'PD-1'))
+
+    def test_save_leaves_no_tmp_file(self):
+        """ Test that saving leaves only the snapshot file. """
+        self.__store.save([FakeMetric('Metric', 'PD-1')])
+        self.assertEqual(['metric_snapshots.pickle'], os.listdir(self.__folder))
+
+    def test_restore_stale(self):
+        """ Test that stale snapshots are marked with the date they were measured. """
+        report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 2, 1)).save(
+            [FakeMetric('Metric', 'PD-1')])
+        metric = FakeMetric('Metric', 'PD-1')
+        self.assertEqual([metric], self.__store.restore_stale([metric]))
+        self.assertEqual(datetime.datetime(2016, 2, 1), metric.restored_snapshot.stale_since())
+
+    def test_restore_stale_without_snapshot(self):
+        """ Test that metrics without stored snapshot aren't restored. """
+        metric = FakeMetric('Metric', 'PD-1')
+        self.assertEqual([], self.__store.restore_stale([metric]))
+        self.assertEqual(None, metric.restored_snapshot)
+
+    def test_save_keeps_measurement_date(self):
+        """ Test that saving a restored snapshot keeps the date it was measured. """
+        report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 2, 1)).save(
+            [FakeMetric('Metric', 'PD-1')])
+        store = report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 3, 1))
+        metric = FakeMetric('Metric', 'PD-1')
+        store.restore_stale([metric])
+        store.save([metric])
+        metric = FakeMetric('Metric', 'PD-1')
+        report.SnapshotStore(self.__filename).restore_stale([metric])
+        self.assertEqual(datetime.datetime(2016, 2, 1), metric.restored_snapshot.stale_since())
+
+    def test_save_restored_snapshot_once(self):
+        """ Test that a snapshot that was restored for a previous save gets the current date when saved again. """
+        report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 2, 1)).save(
+            [FakeMetric('Metric', 'PD-1')])
+        store = report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 3, 1))
+        restored_metric = store.restored_metric('Metric', 'PD-1')
+        store.save([restored_metric])
+        store.save([restored_metric])
+        metric = FakeMetric('Metric', 'PD-1')
+        report.SnapshotStore(self.__filename).restore_stale([metric])
+        self.assertEqual(datetime.datetime(2016, 3, 1), metric.restored_snapshot.stale_since())
+
+    def test_save_keeps_measurement_date_of_restored_metric(self):
+        """ Test that saving a restored metric keeps the date its snapshot was measured. """
+        report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 2, 1)).save(
+            [FakeMetric('Metric', 'PD-1')])
+        store = report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 3, 1))
+        store.save([store.restored_metric('Metric', 'PD-1')])
+        metric = FakeMetric('Metric', 'PD-1')
+        report.SnapshotStore(self.__filename).restore_stale([metric])
+        self.assertEqual(datetime.datetime(2016, 2, 1), metric.restored_snapshot.stale_since())
+
+    def test_update(self):
+        """ Test that updating replaces the snapshots of the metrics and keeps the other snapshots. """
+        self.__store.save([FakeMetric('Metric', 'PD-1'), FakeMetric('Metric', 'PD-2')])
+        store = report.SnapshotStore(self.__filename, clock=lambda: datetime.datetime(2016, 3, 1))
+        store.update([FakeMetric('Metric', 'PD-1')])
+        metrics = [FakeMetric('Metric', 'PD-1'), FakeMetric('Metric', 'PD-2')]
+        self.assertEqual(metrics, report.SnapshotStore(self.__filename).restore_stale(metrics))
+        self.assertEqual(datetime.datetime(2016, 3, 1), metrics[0].restored_snapshot.stale_since())
+
+    def test_previous_format(self):
+        """ Test that snapshot files without measurement dates are ignored. """
+        with open(self.__filename, 'wb') as snapshot_file:
+            cPickle.dump({'PD-1': FakeMetric('Metric', 'PD-1').snapshot()}, snapshot_file, cPickle.HIGHEST_PROTOCOL)
+        self.assertEqual(None, self.__store.restored_metric('Metric', 'PD-1'))
+
+    def test_corrupt_file(self):
+        """ Test that a corrupt snapshot file is ignored. """
+        with open(self.__filename, 'w') as snapshot_file:
+            snapshot_file.write('corrupt')
+        self.assertEqual(None, self.__store.restored_metric('Metric', 'PD-1'))
@@ -0,0 +1,101 @@
+"""
+Copyright 2012-2016 Ministerie van Sociale Zaken en Werkgelegenheid
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+from qualitylib import report
+from qualitylib.report.section import Section, SectionHeader
+
+
+class FakeMetric(object):
+    """ Fake a metric with a status that counts how often its status is checked. """
+
+    def __init__(self, status):
+        self.__status = status
+        self.__id_string = None
+        self.nr_status_checks = 0
+
+    def set_id_string(self, id_string):
+        """ Set the id string of the metric. """
+        self.__id_string = id_string
+
+    def id_string(self):
+        """ Return the id string of the metric. """
+        return self.__id_string
+
+    def snapshot(self):
+        """ Return the metric itself as snapshot. """
+        return self
+
+    def status(self):
+        """ Return the status of the metric. """
+        self.nr_status_checks += 1
+        return self.__status
+
+
+class FakeProduct(object):  # pylint: disable=too-few-public-methods
+    """ Fake a product. """
+
+    @staticmethod
+    def name():
+        """ Return the name of the product. """
+        return 'Product'
+
+
+class StatusIndexTest(unittest.TestCase):
+    """ Unit tests for the status index. """
+
+    def setUp(self):
+        self.__metrics = [FakeMetric('green'), FakeMetric('red'), FakeMetric('green'), FakeMetric('perfect')]
+        self.__sections = [Section(SectionHeader('PC', 'Process'), self.__metrics[:2]),
+                           Section(SectionHeader('PR', 'Product'), self.__metrics[2:], product=FakeProduct())]
+        self.__index = report.StatusIndex(lambda: self.__sections)
+
+    def test_statuses(self):
+        """ Test the number of metrics per status in all sections. """
+        self.assertEqual(dict(green=2, red=1, perfect=1), self.__index.statuses())
+
+    def test_section_statuses(self):
+        """ Test the number of metrics per status in one section. """
+        self.assertEqual(dict(green=1, red=1), self.__index.statuses('PC'))
+
+    def test_unknown_section(self):
+        """ Test that an unknown section has no statuses. """
+        self.assertEqual(dict(), self.__index.statuses('XX'))
+
+    def test_product_statuses(self):
+        """ Test the number of metrics per status in the section of a product. """
+        self.assertEqual(dict(green=1, perfect=1), self.__index.product_statuses(FakeProduct()))
+
+    def test_count(self):
+        """ Test the number of metrics with one of the statuses. """
+        self.assertEqual(3, self.__index.count(('green', 'perfect')))
+
+    def test_metric_ids(self):
+        """ Test the ids of the metrics with a status. """
+        self.assertEqual(['PC-1', 'PR-1'], self.__index.metric_ids('green'))
+        self.assertEqual(['PR-1'], self.__index.metric_ids('green', 'PR'))
+
+    def test_status_checked_once(self):
+        """ Test that the status of each metric is checked once, however often the index is used. """
+        self.__index.statuses()
+        self.__index.count(('red',), 'PC')
+        self.assertEqual([1, 1, 1, 1], [each_metric.nr_status_checks for each_metric in self.__metrics])
+
+    def test_section_color(self):
+        """ Test that sections can use the index for their color. """
+        section = Section(SectionHeader('PC', 'Process'), self.__metrics[:2], status_index=self.__index)
+        self.assertEqual('red', section.color())
@@ -17,6 +17,8 @@ limitations under the License.
 import datetime
 import io
 import logging
+import threading
+import time
 import unittest
 
 from qualitylib import utils
@@ -260,6 +262,86 @@ class MemoizedTest(unittest.TestCase):
         self.__instance.test_func_with_args([])
         self.assertEqual(dict(unhashable=2), self.__instance.test_func_with_args_calls)
 
+    def test_cache_per_instance(self):
+        """ Test that the cache is kept per instance. """
+        other_instance = self.__instance.__class__()
+        self.__instance.test_func()
+        other_instance.test_func()
+        self.assertEqual(1, self.__instance.test_func_calls)
+        self.assertEqual(1, other_instance.test_func_calls)
+
+    def test_concurrent_calls(self):
+        """ Test that the function is only called once when called from multiple threads at the same time. """
+
+        class SlowClass(object):
+            """ Class with a slow cached method. """
+            def __init__(self):
+                self.calls = 0
+
+            @utils.memoized
+            def slow_func(self):
+                """ Record how often this method is invoked. """
+                self.calls += 1
+                time.sleep(0.01)
+                return self.calls
+
+        instance = SlowClass()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(instance.slow_func())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([1] * 5, results)
+
+    def test_recursive_call(self):
+        """ Test that the function can call itself with the same arguments without waiting for itself. """
+
+        class RecursiveClass(object):  # pylint: disable=too-few-public-methods
+            """ Class with a recursive cached method. """
+            @utils.memoized
+            def recursive_func(self, depth):
+                """ Call this method again with the same arguments, once. """
+                return self.recursive_func(False) if depth else 'done'
+
+        self.assertEqual('done', RecursiveClass().recursive_func(True))
+
+    def test_wait_within_budget(self):
+        """ Test that callers waiting for the evaluation by another thread give up when the run budget runs out. """
+        from qualitylib.metric_source import run_budget
+
+        class BlockingClass(object):  # pylint: disable=too-few-public-methods
+            """ Class with a cached method that blocks until released. """
+            release = threading.Event()
+            started = threading.Event()
+
+            @utils.memoized
+            def blocking_func(self):
+                """ Block until released. """
+                self.started.set()
+                self.release.wait()
+                return 'value'
+
+        instance = BlockingClass()
+        thread = threading.Thread(target=instance.blocking_func)
+        thread.start()
+        BlockingClass.started.wait(5)
+        run_budget.set_default_run_budget(run_budget.RunBudget(deadline=0.05))
+        try:
+            self.assertRaises(run_budget.BudgetExhausted, instance.blocking_func)
+        finally:
+            run_budget.set_default_run_budget(None)
+            BlockingClass.release.set()
+            thread.join()
+        self.assertEqual('value', instance.blocking_func())
+
+    def test_clear_memoized(self):
+        """ Test that the function is called again after the memoized values have been cleared. """
+        self.__instance.test_func()
+        utils.clear_memoized(self.__instance)
+        self.__instance.test_func()
+        self.assertEqual(2, self.__instance.test_func_calls)
+
 
 class RemoveTreeTest(unittest.TestCase):
     """ Unit tests for the remove tree method. """